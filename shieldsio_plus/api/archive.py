@@ -0,0 +1,51 @@
+from collections.abc import AsyncIterable, AsyncIterator
+from zipfile import ZIP_DEFLATED, ZipFile
+
+
+class _ChunkBuffer:
+	"""Write-only, unseekable file collecting the bytes written by `ZipFile` until drained."""
+
+	def __init__(self) -> None:
+		self.__chunks: list[bytes] = []
+
+	def write(self, data: bytes) -> int:
+		self.__chunks.append(bytes(data))
+		return len(data)
+
+	def flush(self) -> None:
+		pass
+
+	def drain(self) -> bytes:
+		data = b"".join(self.__chunks)
+		self.__chunks.clear()
+		return data
+
+
+async def stream_zip(files: AsyncIterable[tuple[str, bytes]]) -> AsyncIterator[bytes]:
+	"""
+	Stream a zip archive while its files are produced.
+
+	The output is not seekable, so every file is followed by a data descriptor instead of
+	having its header patched, and each file is yielded as soon as it is compressed. The
+	archive is closed in any case, even if the generator is closed before its end, e.g. when
+	the client disconnects.
+
+	Args:
+		files: The names and contents of the archived files.
+
+	Yields:
+		The chunks of the archive.
+	"""
+	buffer = _ChunkBuffer()
+
+	archive = ZipFile(buffer, "w", compression=ZIP_DEFLATED)
+
+	try:
+		async for name, content in files:
+			archive.writestr(name, content)
+			yield buffer.drain()
+
+	finally:
+		archive.close()
+
+	yield buffer.drain()
@@ -0,0 +1,255 @@
+import json
+import re
+from functools import cache
+from typing import Any, Optional, override
+
+from django.conf import settings
+from loguru import logger
+from rest_framework import serializers
+
+from shieldsio_plus.common.enums.font_embedding import FontEmbedding
+from shieldsio_plus.common.enums.shields_io_badge_styles import ShieldsIOBadgeStyle
+from shieldsio_plus.common.enums.web_safe_fonts import WebSafeFont
+from shieldsio_plus.common.enums.woff2_fonts import KnownWOFF2Fonts
+from shieldsio_plus.common.types.hex_code import HexColor
+from shieldsio_plus.common.types.shields_io_badge import ShieldsIOBadge
+from shieldsio_plus.common.types.svg import SVG
+from shieldsio_plus.util.catalog import BadgeCatalog, CatalogError
+from shieldsio_plus.util.manifest import ValidationError, load_badge_params, load_manifest_color
+
+_HEX_CODE = re.compile(r"#?(?:[0-9a-fA-F]{3}){1,2}")
+
+# Ids of the badges of a batch, also used as file names in archives
+_BADGE_ID = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]{0,127}")
+
+# Maximum number of badges rendered per batch
+MAX_BATCH_SIZE = 256
+
+
+@cache
+def manifest_entries() -> tuple[str, dict[str, dict[str, Any]]]:
+	"""
+	Load the manifest entries, indexed by slug, once per process.
+
+	Returns:
+		The directory holding the logo files, and the manifest entries by slug.
+	"""
+	with (settings.BASE_DIR / "assets" / "data" / "manifest.json").open(encoding="utf-8") as f:
+		manifest = json.load(f)
+
+	return str(settings.BASE_DIR / manifest["root"]) + "/", {entry["slug"]: entry for entry in manifest["data"]}
+
+
+@cache
+def badge_catalog() -> Optional[BadgeCatalog]:
+	"""
+	Open the compiled badge catalog once per process, if it was compiled from the current manifest.
+
+	Returns:
+		The catalog, or None if it is missing, of another version or out of date, in which
+		case the manifest is read instead, through `manifest_entries`.
+	"""
+	try:
+		catalog = BadgeCatalog(settings.BADGE_CATALOG)
+
+	except FileNotFoundError:
+		return None
+
+	except CatalogError as e:
+		logger.warning(f"Ignoring the badge catalog: {e}")
+		return None
+
+	if not catalog.is_current(settings.BASE_DIR / "assets" / "data" / "manifest.json"):
+		logger.warning(f"Ignoring the badge catalog {catalog.path}, compiled from another manifest")
+		catalog.close()
+		return None
+
+	return catalog
+
+
+class ColorField(serializers.CharField):
+	"""
+	A color, either a hex code (with or without `#`), a Shields.io or CSS color name, or an
+	ANSI color prefixed with `ansi:`, by palette index (`ansi:196`) or name (`ansi:bright-red`).
+	"""
+
+	@override
+	def to_internal_value(self, data: object) -> HexColor:
+		value = super().to_internal_value(data)
+
+		if value.startswith("ansi:"):
+			color_class, value = "ansi", value.removeprefix("ansi:")
+
+		else:
+			color_class = "hex" if _HEX_CODE.fullmatch(value) else "named_color"
+
+		try:
+			return load_manifest_color({"class": color_class, "value": value})
+
+		except (ValidationError, ValueError) as e:
+			raise serializers.ValidationError(f"Invalid color: {value}") from e
+
+
+class BadgeSpecSerializer(serializers.Serializer):
+	"""
+	Specification of a badge rendered by the API.
+
+	The badge is either a manifest entry, given by its slug, or built from an inline SVG
+	logo. Every other field overrides the corresponding value of the manifest entry.
+	"""
+
+	slug = serializers.CharField(required=False, help_text="Slug of a manifest entry.")
+	logo = serializers.CharField(required=False, trim_whitespace=False, help_text="Inline SVG logo markup.")
+	label = serializers.CharField(required=False, allow_blank=True, help_text="Text of the left side.")
+	message = serializers.CharField(required=False, allow_blank=True, help_text="Text of the right side.")
+	color = ColorField(required=False, help_text="Color of the right side.")
+	label_color = ColorField(required=False, help_text="Color of the left side.")
+	logo_color = ColorField(required=False, help_text="Color of the logo.")
+	style = serializers.ChoiceField(
+		choices=[style.name.lower() for style in ShieldsIOBadgeStyle.members],
+		required=False,
+		help_text="Badge style. Defaults to the `true_flat` style.",
+	)
+	font = serializers.ChoiceField(
+		choices=[font.name.lower() for font in WebSafeFont],
+		required=False,
+		help_text="Web-safe font of the badge text. Defaults to the Shields.io font.",
+	)
+	web_font = serializers.ChoiceField(
+		choices=[font.slug for font in KnownWOFF2Fonts],
+		required=False,
+		help_text="Web font of the badge text, used instead of `font`.",
+	)
+	font_embedding = serializers.ChoiceField(
+		choices=[embedding.value for embedding in FontEmbedding],
+		required=False,
+		help_text="Whether the badge embeds its web font, or only references its family, defined once by the page "
+		"(e.g. through the stylesheet of a batch). Defaults to `embedded` for single badges and `shared` in batches.",
+	)
+
+	@staticmethod
+	def validate_slug(value: str) -> str:
+		"""
+		Check that the slug is an entry of the catalog, or of the manifest.
+
+		Args:
+			value: The slug.
+
+		Raises:
+			serializers.ValidationError: If the slug is unknown.
+
+		Returns:
+			The slug.
+		"""
+		catalog = badge_catalog()
+
+		if value not in (catalog if catalog is not None else manifest_entries()[1]):
+			raise serializers.ValidationError(f"Unknown slug: {value}")
+
+		return value
+
+	@override
+	def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+		if ("slug" in attrs) == ("logo" in attrs):
+			raise serializers.ValidationError("Exactly one of `slug` and `logo` is required.")
+
+		if "logo" in attrs and not attrs.get("label"):
+			raise serializers.ValidationError({"label": "A label is required with an inline logo."})
+
+		return attrs
+
+	def to_badge(self) -> ShieldsIOBadge:
+		"""
+		Build the badge of the validated spec.
+
+		Reads the logo file of the manifest entry, so it should not run on the event loop.
+
+		Returns:
+			The badge to render.
+		"""
+		return self.build_badge(self.validated_data)
+
+	@staticmethod
+	def build_badge(validated_data: dict[str, Any]) -> ShieldsIOBadge:
+		"""
+		Build the badge of a validated spec, e.g. one validated as a nested field.
+
+		Reads the logo file of the manifest entry, so it should not run on the event loop.
+
+		Args:
+			validated_data: The validated spec.
+
+		Returns:
+			The badge to render.
+		"""
+		attrs = dict(validated_data)
+
+		if "slug" in attrs and (catalog := badge_catalog()) is not None:
+			params = catalog.badge_params(attrs["slug"])
+
+		elif "slug" in attrs:
+			root, entries = manifest_entries()
+			params = load_badge_params(entries[attrs["slug"]], root)
+
+		else:
+			params = {"slug": "inline", "logo": SVG(attrs.pop("logo"))}
+
+		if "style" in attrs:
+			attrs["style"] = ShieldsIOBadgeStyle[attrs["style"].upper()]
+
+		if "font" in attrs:
+			attrs["font"] = WebSafeFont[attrs["font"].upper()]
+
+		if "web_font" in attrs:
+			attrs["web_font"] = KnownWOFF2Fonts[attrs["web_font"].replace("-", "_").upper()]
+
+		if "font_embedding" in attrs:
+			attrs["font_embedding"] = FontEmbedding(attrs["font_embedding"])
+
+		return ShieldsIOBadge(**params | attrs)
+
+
+class BadgeSpecsField(serializers.DictField):
+	"""
+	Badge specs by id, whose size and ids are checked before any spec is validated, so an
+	oversized batch is rejected without building its badges.
+	"""
+
+	@override
+	def to_internal_value(self, data: object) -> dict[str, Any]:
+		if isinstance(data, dict):
+			if len(data) > MAX_BATCH_SIZE:
+				raise serializers.ValidationError(f"At most {MAX_BATCH_SIZE} badges are rendered per batch.")
+
+			if invalid := [str(badge_id) for badge_id in data if not _BADGE_ID.fullmatch(str(badge_id))]:
+				raise serializers.ValidationError(f"Invalid ids: {', '.join(invalid)}")
+
+		return super().to_internal_value(data)
+
+
+class BulkBadgeSerializer(serializers.Serializer):
+	"""A batch of badge specs, by caller-chosen id, and the format of the rendered batch."""
+
+	badges = BadgeSpecsField(
+		child=BadgeSpecSerializer(),
+		allow_empty=False,
+		help_text=f"Badge specs by id. Ids are used as file names in archives, and at most {MAX_BATCH_SIZE} "
+		"badges are rendered per batch.",
+	)
+	output = serializers.ChoiceField(
+		choices=["json", "zip"],
+		default="json",
+		help_text="Return a JSON map of id to SVG, or a streamed zip archive of `<id>.svg` files.",
+	)
+
+
+class BulkBadgeResponseSerializer(serializers.Serializer):
+	"""The rendered batch, as a JSON map."""
+
+	badges = serializers.DictField(child=serializers.CharField(), help_text="SVG of every rendered badge, by id.")
+	errors = serializers.DictField(child=serializers.CharField(), help_text="Error of every failed badge, by id.")
+	stylesheet = serializers.CharField(
+		required=False,
+		help_text="The `@font-face` rules of the web fonts shared by the badges, each font once. Only included "
+		"if a badge uses a shared web font.",
+	)
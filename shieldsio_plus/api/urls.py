@@ -0,0 +1,11 @@
+from django.urls import path
+from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+from shieldsio_plus.api.views import BadgeView, BulkBadgeView
+
+urlpatterns = [
+	path("badge", BadgeView.as_view(), name="badge"),
+	path("badges", BulkBadgeView.as_view(), name="badges"),
+	path("schema", SpectacularAPIView.as_view(), name="schema"),
+	path("docs", SpectacularSwaggerView.as_view(url_name="schema"), name="docs"),
+]
@@ -0,0 +1,435 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from inspect import isawaitable
+from typing import TYPE_CHECKING, Any, ClassVar, Optional, override
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from loguru import logger
+from requests import RequestException
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import AllowAny
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from shieldsio_plus.api.archive import stream_zip
+from shieldsio_plus.api.serializers import BadgeSpecSerializer, BulkBadgeResponseSerializer, BulkBadgeSerializer
+from shieldsio_plus.common.enums.font_embedding import FontEmbedding
+from shieldsio_plus.common.types.svg import SVG
+from shieldsio_plus.util.build_plan import FetchGroup, plan_fetches
+from shieldsio_plus.util.font_stylesheet import font_stylesheet
+from shieldsio_plus.util.metrics import RENDER_DURATION
+from shieldsio_plus.util.render_cache import TieredRenderCache
+
+if TYPE_CHECKING:
+	from shieldsio_plus.common.enums.woff2_fonts import KnownWOFF2Fonts
+	from shieldsio_plus.common.types.shields_io_badge import ShieldsIOBadge
+
+SVG_CONTENT_TYPE = "image/svg+xml; charset=utf-8"
+
+# Renders mostly wait on the upstream, so they get more threads than the default executor,
+# which is sized for CPU-bound work
+RENDER_WORKERS = 64
+RENDER_EXECUTOR = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="render")
+
+# Rendered badges, shared by the requests of the process and by the worker processes
+render_cache = TieredRenderCache.from_settings()
+
+
+class UpstreamUnavailable(APIException):
+	"""Shields.io failed to render the badge."""
+
+	status_code = status.HTTP_502_BAD_GATEWAY
+	default_detail = "Failed to fetch the badge from Shields.io."
+	default_code = "upstream_unavailable"
+
+
+class AsyncAPIView(APIView):
+	"""
+	APIView whose handlers are coroutines, served by the ASGI application without a thread.
+
+	Django detects the view as async from its handlers, and the request is dispatched on the
+	event loop. The authentication, permission and throttling checks may hit the database,
+	so they run in a thread, and synchronous handlers (such as `options`) are still supported.
+	"""
+
+	async def __handle(self, request: Request, *args: object, **kwargs: object) -> HttpResponse:
+		await sync_to_async(self.initial)(request, *args, **kwargs)
+
+		method = request.method.lower()
+		handler = getattr(self, method, None) if method in self.http_method_names else None
+		response = (handler or self.http_method_not_allowed)(request, *args, **kwargs)
+
+		return await response if isawaitable(response) else response
+
+	@override
+	async def dispatch(self, request: HttpRequest, *args: object, **kwargs: object) -> HttpResponse:
+		self.args = args
+		self.kwargs = kwargs
+		request = self.initialize_request(request, *args, **kwargs)
+		self.request = request
+		self.headers = self.default_response_headers
+
+		try:
+			response = await self.__handle(request, *args, **kwargs)
+
+		except Exception as exc:  # noqa: BLE001
+			response = self.handle_exception(exc)
+
+		self.response = self.finalize_response(request, response, *args, **kwargs)
+		return self.response
+
+
+class BadgeView(AsyncAPIView):
+	"""
+	Render a badge from its spec.
+
+	The upstream fetch and the local transforms are blocking, so they run in a dedicated
+	executor rather than in the thread shared by synchronous code, and concurrent requests
+	are rendered in parallel while the event loop keeps serving. Rendered badges are kept
+	in the render cache.
+	"""
+
+	authentication_classes: ClassVar = []
+	permission_classes: ClassVar = [AllowAny]
+
+	@staticmethod
+	def render_badge(serializer: BadgeSpecSerializer) -> str:
+		"""
+		Build and render the badge of a validated spec.
+
+		Args:
+			serializer: The validated badge spec.
+
+		Raises:
+			UpstreamUnavailable: If Shields.io failed to render the badge, or returned a badge
+				that could not be post-processed (e.g. with a web font that failed to load).
+
+		Returns:
+			The SVG content of the badge.
+		"""
+		badge = serializer.to_badge()
+
+		try:
+			return render_cache.get_or_render(badge.render_hash, lambda: badge.render().svg)
+
+		except (RequestException, ValueError) as e:
+			logger.error(f"Failed to render {badge.key}: {type(e).__name__}")
+			raise UpstreamUnavailable from e
+
+	async def respond(self, data: object) -> HttpResponse:
+		"""
+		Validate a badge spec and render it without blocking the event loop.
+
+		Args:
+			data: The badge spec.
+
+		Returns:
+			The SVG response.
+		"""
+		serializer = BadgeSpecSerializer(data=data)
+		serializer.is_valid(raise_exception=True)
+
+		svg_str = await sync_to_async(self.render_badge, thread_sensitive=False, executor=RENDER_EXECUTOR)(serializer)
+
+		return HttpResponse(svg_str, content_type=SVG_CONTENT_TYPE)
+
+	@extend_schema(
+		description="Render a badge from a spec given as query parameters.",
+		parameters=[BadgeSpecSerializer],
+		responses={
+			(200, "image/svg+xml"): OpenApiResponse(OpenApiTypes.STR, description="The badge SVG."),
+			400: OpenApiResponse(description="Invalid badge spec."),
+			502: OpenApiResponse(description="Shields.io failed to render the badge."),
+		},
+	)
+	async def get(self, request: Request) -> HttpResponse:
+		"""
+		Render a badge from a spec given as query parameters.
+
+		Args:
+			request: The incoming request.
+
+		Returns:
+			The SVG response.
+		"""
+		return await self.respond(request.query_params.dict())
+
+	@extend_schema(
+		description="Render a badge from a spec given as the request body.",
+		request=BadgeSpecSerializer,
+		responses={
+			(200, "image/svg+xml"): OpenApiResponse(OpenApiTypes.STR, description="The badge SVG."),
+			400: OpenApiResponse(description="Invalid badge spec."),
+			502: OpenApiResponse(description="Shields.io failed to render the badge."),
+		},
+	)
+	async def post(self, request: Request) -> HttpResponse:
+		"""
+		Render a badge from a spec given as the request body.
+
+		Args:
+			request: The incoming request.
+
+		Returns:
+			The SVG response.
+		"""
+		return await self.respond(request.data)
+
+
+@dataclass
+class BatchPlan:
+	"""
+	The renders of a batch of badges.
+
+	Attributes:
+		ids: The ids of the batch, by render hash.
+		cached: The SVG content of the badges found in the render cache, by render hash.
+		groups: The fetch groups of the other badges.
+		stylesheet: The `@font-face` rules of the web fonts shared by the badges, or None if
+			no badge uses a shared web font.
+	"""
+
+	ids: dict[str, list[str]] = field(default_factory=dict)
+	cached: dict[str, str] = field(default_factory=dict)
+	groups: list[FetchGroup] = field(default_factory=list)
+	stylesheet: Optional[str] = None
+
+
+class BulkBadgeView(AsyncAPIView):
+	"""
+	Render a batch of badges in a single round trip.
+
+	Identical specs of the batch are rendered once, badges found in the render cache are not
+	rendered at all, and the remaining badges are grouped by upstream request through
+	`plan_fetches` (e.g. the same badge in several fonts, or in the TRUE_FLAT and FLAT_SQUARE
+	styles), so every upstream URL is fetched once per batch. Groups are rendered
+	concurrently, and archives are streamed as the groups complete.
+
+	Web fonts are shared by default: badges only reference their font family, and the batch
+	comes with a single stylesheet holding every font once, rather than a copy of the font
+	files in every badge.
+	"""
+
+	authentication_classes: ClassVar = []
+	permission_classes: ClassVar = [AllowAny]
+
+	@staticmethod
+	def plan(specs: dict[str, dict[str, Any]]) -> BatchPlan:
+		"""
+		Build the badges of a batch, deduplicated, and group the uncached ones by upstream request.
+
+		Reads the logo files of the manifest entries and the shared cache, so it should not run
+		on the event loop.
+
+		Args:
+			specs: The validated badge specs, by id.
+
+		Raises:
+			UpstreamUnavailable: If a shared web font could not be downloaded.
+
+		Returns:
+			The renders of the batch.
+		"""
+		plan = BatchPlan()
+		badges: list[ShieldsIOBadge] = []
+		shared_fonts: list[KnownWOFF2Fonts] = []
+
+		for badge_id, attrs in specs.items():
+			badge = BadgeSpecSerializer.build_badge({"font_embedding": FontEmbedding.SHARED.value} | attrs)
+			key = badge.render_hash
+
+			if badge.web_font and badge.font_embedding == FontEmbedding.SHARED:
+				shared_fonts.append(badge.web_font)
+
+			if key not in plan.ids:
+				if (svg_str := render_cache.get(key)) is not None:
+					plan.cached[key] = svg_str
+
+				else:
+					badges.append(badge)
+
+			plan.ids.setdefault(key, []).append(badge_id)
+
+		plan.groups = list(plan_fetches(badges, window=max(len(badges), 1)))
+
+		if shared_fonts:
+			try:
+				plan.stylesheet = font_stylesheet(shared_fonts)
+
+			except (RequestException, ValueError) as e:
+				logger.error(f"Failed to build the font stylesheet: {type(e).__name__}")
+				raise UpstreamUnavailable("Failed to fetch the web fonts of the badges.") from e
+
+		return plan
+
+	@staticmethod
+	def render_group(group: FetchGroup) -> list[Optional[str]]:
+		"""
+		Fetch the upstream response of a group once, and render every badge of the group from it.
+
+		The shared fetch is not attributed to any badge: only the local post-processing of each
+		badge is observed in the render latency histogram of its style. A badge failing to render
+		does not fail the others, which are still rendered and cached.
+
+		Args:
+			group: The fetch group.
+
+		Raises:
+			RequestException: If the upstream response could not be fetched.
+
+		Returns:
+			The SVG content of the badges of the group, in order, or None for the badges that
+			could not be rendered.
+		"""  # noqa: DOC502
+		svg_str = SVG.fetch(group.spec.url)
+		rendered: list[Optional[str]] = []
+
+		for badge in group.badges:
+			try:
+				with RENDER_DURATION.time(style=badge.style.name.lower()):
+					badge_svg = badge.post_process(svg_str).svg
+
+			except (RequestException, ValueError) as e:
+				logger.error(f"Failed to render {badge.key}: {type(e).__name__}")
+				rendered.append(None)
+				continue
+
+			render_cache.set(badge.render_hash, badge_svg)
+			rendered.append(badge_svg)
+
+		return rendered
+
+	async def __render(self, group: FetchGroup) -> tuple[FetchGroup, list[Optional[str]]]:
+		render_group = sync_to_async(self.render_group, thread_sensitive=False, executor=RENDER_EXECUTOR)
+
+		try:
+			return group, await render_group(group)
+
+		except (RequestException, ValueError) as e:
+			logger.error(f"Failed to fetch {group.key}: {type(e).__name__}")
+			return group, [None] * len(group.badges)
+
+	async def results(self, plan: BatchPlan) -> AsyncIterator[tuple[str, Optional[str]]]:
+		"""
+		Render the fetch groups of a batch concurrently.
+
+		Args:
+			plan: The renders of the batch.
+
+		Yields:
+			The id and SVG content of every badge of the batch, cached ones first, then in
+			order of completion. The content is None if the badge failed to render, either because
+			its upstream response could not be fetched or because it could not be processed.
+		"""
+		for key, svg_str in plan.cached.items():
+			for badge_id in plan.ids[key]:
+				yield badge_id, svg_str
+
+		for completed in asyncio.as_completed([self.__render(group) for group in plan.groups]):
+			group, svgs = await completed
+
+			for index, badge in enumerate(group.badges):
+				for badge_id in plan.ids[badge.render_hash]:
+					yield badge_id, svgs[index]
+
+	async def archive(self, plan: BatchPlan) -> AsyncIterator[tuple[str, bytes]]:
+		"""
+		Produce the files of the archive of a batch.
+
+		Args:
+			plan: The renders of the batch.
+
+		Yields:
+			A `fonts.css` file if any badge uses a shared web font, an `<id>.svg` file for every
+			rendered badge, in order of completion, then an `errors.json` file if any badge failed.
+		"""
+		errors = {}
+
+		if plan.stylesheet is not None:
+			yield "fonts.css", plan.stylesheet.encode()
+
+		async for badge_id, svg_str in self.results(plan):
+			if svg_str is None:
+				errors[badge_id] = UpstreamUnavailable.default_detail
+				continue
+
+			yield f"{badge_id}.svg", svg_str.encode()
+
+		if errors:
+			yield "errors.json", json.dumps(errors, indent=4).encode()
+
+	async def stream_archive(self, plan: BatchPlan) -> AsyncIterator[bytes]:
+		"""
+		Stream the zip archive of a batch.
+
+		The files and the archive are closed as soon as the stream is, so a client disconnecting
+		does not leave them to the garbage collector.
+
+		Args:
+			plan: The renders of the batch.
+
+		Yields:
+			The chunks of the archive.
+		"""
+		# Closing the stream closes the archive, then the files, in that order
+		async with aclosing(self.archive(plan)) as files, aclosing(stream_zip(files)) as chunks:
+			async for chunk in chunks:
+				yield chunk  # noqa: ASYNC119
+
+	@extend_schema(
+		description="Render a batch of badges, as a JSON map of id to SVG or as a streamed zip archive.",
+		request=BulkBadgeSerializer,
+		responses={
+			200: BulkBadgeResponseSerializer,
+			(200, "application/zip"): OpenApiResponse(OpenApiTypes.BINARY, description="Archive of the badges."),
+			400: OpenApiResponse(description="Invalid batch."),
+			502: OpenApiResponse(description="The shared web fonts of the batch could not be downloaded."),
+		},
+	)
+	async def post(self, request: Request) -> HttpResponse:
+		"""
+		Render a batch of badges given as the request body.
+
+		Args:
+			request: The incoming request.
+
+		Returns:
+			The JSON map or the streamed archive of the badges.
+		"""
+		serializer = BulkBadgeSerializer(data=request.data)
+		serializer.is_valid(raise_exception=True)
+
+		plan = await sync_to_async(self.plan, thread_sensitive=False, executor=RENDER_EXECUTOR)(
+			serializer.validated_data["badges"],
+		)
+
+		if serializer.validated_data["output"] == "zip":
+			return StreamingHttpResponse(
+				self.stream_archive(plan),
+				content_type="application/zip",
+				headers={"Content-Disposition": 'attachment; filename="badges.zip"'},
+			)
+
+		rendered = dict([result async for result in self.results(plan)])
+		badge_ids = list(serializer.validated_data["badges"])
+
+		response = {
+			"badges": {badge_id: rendered[badge_id] for badge_id in badge_ids if rendered[badge_id] is not None},
+			"errors": {
+				badge_id: UpstreamUnavailable.default_detail for badge_id in badge_ids if rendered[badge_id] is None
+			},
+		}
+
+		if plan.stylesheet is not None:
+			response["stylesheet"] = plan.stylesheet
+
+		return Response(response)
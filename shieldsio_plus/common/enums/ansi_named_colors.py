@@ -0,0 +1,65 @@
+from shieldsio_plus.common.enums.better_enum import BetterIntEnum
+
+
+class ANSINamedColor(BetterIntEnum):
+	"""
+	Enumeration of the 16 named ANSI terminal colors, by palette index.
+
+	Indices 0 to 7 are the standard colors, set with SGR codes 30 to 37 (40 to 47 for
+	backgrounds), and 8 to 15 their bright variants, set with SGR codes 90 to 97 (100 to 107).
+
+	Elements:
+		BLACK: Black (0)
+		RED: Red (1)
+		GREEN: Green (2)
+		YELLOW: Yellow (3)
+		BLUE: Blue (4)
+		MAGENTA: Magenta (5)
+		CYAN: Cyan (6)
+		WHITE: White (7)
+		BRIGHT_BLACK: Bright black, or dark grey (8)
+		BRIGHT_RED: Bright red (9)
+		BRIGHT_GREEN: Bright green (10)
+		BRIGHT_YELLOW: Bright yellow (11)
+		BRIGHT_BLUE: Bright blue (12)
+		BRIGHT_MAGENTA: Bright magenta (13)
+		BRIGHT_CYAN: Bright cyan (14)
+		BRIGHT_WHITE: Bright white (15)
+	"""
+
+	BLACK = 0
+	RED = 1
+	GREEN = 2
+	YELLOW = 3
+	BLUE = 4
+	MAGENTA = 5
+	CYAN = 6
+	WHITE = 7
+	BRIGHT_BLACK = 8
+	BRIGHT_RED = 9
+	BRIGHT_GREEN = 10
+	BRIGHT_YELLOW = 11
+	BRIGHT_BLUE = 12
+	BRIGHT_MAGENTA = 13
+	BRIGHT_CYAN = 14
+	BRIGHT_WHITE = 15
+
+	@classmethod
+	def slugs(cls) -> list[str]:
+		"""
+		Gets a list of all the color slugs.
+
+		Returns:
+			list[str]: A list of all the color slugs, e.g. `bright-red`.
+		"""
+		return [color.slug for color in cls]
+
+	@property
+	def slug(self) -> str:
+		"""
+		Gets the slug identifier for the color.
+
+		Returns:
+			str: The slug of the color, as used in the manifest.
+		"""
+		return self.name.lower().replace("_", "-")
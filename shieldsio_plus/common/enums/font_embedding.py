@@ -0,0 +1,16 @@
+from shieldsio_plus.common.enums.better_enum import BetterStrEnum
+
+
+class FontEmbedding(BetterStrEnum):
+	"""
+	Enumeration of the ways the web font of a badge is delivered.
+
+	Elements:
+		EMBEDDED: The badge holds the `@font-face` rules of its font, with the font files inlined,
+			so it renders standalone (e.g. as an `<img>`).
+		SHARED: The badge only references the font family, and the page holds the `@font-face`
+			rules of every font once, in a shared stylesheet or `<style>` block.
+	"""
+
+	EMBEDDED = "embedded"
+	SHARED = "shared"
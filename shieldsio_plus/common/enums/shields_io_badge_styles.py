@@ -36,3 +36,12 @@ class ShieldsIOBadgeStyle(BetterStrEnum):
 	def styles(self) -> list[str]:
 		"""Return the style names."""
 		return [name.replace("_", "-").lower() for name in self.names]
+
+	@property
+	def upstream_style(self) -> "ShieldsIOBadgeStyle":
+		"""The style fetched from Shields.io to render this style."""
+		return ShieldsIOBadgeStyle[DERIVED_STYLES.get(self.name, self.name)]
+
+
+# Styles post-processed locally, mapped to the name of the style they are fetched as
+DERIVED_STYLES: dict[str, str] = {"TRUE_FLAT": "FLAT_SQUARE"}
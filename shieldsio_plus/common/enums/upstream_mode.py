@@ -0,0 +1,16 @@
+from shieldsio_plus.common.enums.better_enum import BetterStrEnum
+
+
+class UpstreamMode(BetterStrEnum):
+	"""
+	Enumeration of the ways upstream requests (Shields.io, font files) are served.
+
+	Elements:
+		PASSTHROUGH: Requests go to the upstream, nothing is recorded.
+		RECORD: Requests go to the upstream, and every response is recorded in the cassette store.
+		REPLAY: Requests are served from the cassette store, without any network access.
+	"""
+
+	PASSTHROUGH = "passthrough"
+	RECORD = "record"
+	REPLAY = "replay"
@@ -1,10 +1,13 @@
 import json
+from functools import cache
 from pathlib import Path
 from typing import TypedDict, Union
 
 from shieldsio_plus.common.enums.better_enum import BetterEnum
 from shieldsio_plus.common.enums.unicode_ranges import UnicodeRange
 from shieldsio_plus.common.types.woff2_font import WOFF2Font
+from shieldsio_plus.util.font_metrics import FontMetrics, load_font_metrics
+from shieldsio_plus.util.unicode_index import UnicodeRangeIndex
 
 
 class FontEnumValue(TypedDict):
@@ -27,7 +30,7 @@ class _KnownWOFF2Fonts(BetterEnum):
 
 	@property
 	def family_name(self) -> str:
-		return self.name
+		return self.value["family_name"]
 
 	@property
 	def font_style(self) -> str:
@@ -49,6 +52,36 @@ class _KnownWOFF2Fonts(BetterEnum):
 	def unicode_range(self) -> Union[UnicodeRange, list[UnicodeRange]]:
 		return self.value["unicode_range"]
 
+	@property
+	def slices(self) -> list[tuple[str, UnicodeRange]]:
+		"""The files of the font, each with the Unicode range it covers."""
+		if isinstance(self.src, str):
+			return [(self.src, self.unicode_range)]
+
+		return list(zip(self.src, self.unicode_range, strict=True))
+
+	@property
+	def metrics(self) -> FontMetrics:
+		"""The advance widths of the font, merged from every `src` file."""
+		return load_font_metrics([self.src] if isinstance(self.src, str) else self.src)
+
+	def srcs_for(self, text: str) -> list[str]:
+		"""
+		Get the files of the font needed to render a text.
+
+		Args:
+			text: The text.
+
+		Returns:
+			The URLs of the files whose Unicode range covers any character of the text, in `src` order.
+		"""
+		return _slice_index(self).owners_for(text)
+
+
+@cache
+def _slice_index(font: _KnownWOFF2Fonts) -> UnicodeRangeIndex[str]:
+	return UnicodeRangeIndex((src, unicode_range.range) for src, unicode_range in font.slices)
+
 
 # Load WOFF2 font definitions from JSON file
 with Path("assets/data/woff_fonts.json").open(encoding="utf-8") as f:
@@ -76,11 +109,24 @@ for dic in data:
 	if isinstance(src, list) and (not isinstance(unicode_range, list) or len(src) != len(unicode_range)):
 		raise ValueError("src and unicode-range must have the same length if src is a list")
 
+	# Unicode ranges are given by block name, e.g. `latin-ext`
 	if not isinstance(unicode_range, list):
-		unicode_range = UnicodeRange(unicode_range)
+		unicode_range = UnicodeRange[unicode_range.replace("-", "_").upper()]
 
 	else:
-		unicode_range = [UnicodeRange(range_) for range_ in unicode_range]
+		unicode_range = [UnicodeRange[range_.replace("-", "_").upper()] for range_ in unicode_range]
+
+	parsed_data.append((
+		family_name.replace(" ", "_").replace("-", "_").upper(),
+		FontEnumValue(
+			family_name=family_name,
+			font_style=font_style,
+			font_weight=font_weight,
+			font_display=font_display,
+			src=src,
+			unicode_range=unicode_range,
+		),
+	))
 
 # Dynamically create the KnownWOFF2Fonts enum with the processed data
 KnownWOFF2Fonts = _KnownWOFF2Fonts("KnownWOFF2Fonts", parsed_data)
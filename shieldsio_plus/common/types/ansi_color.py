@@ -0,0 +1,223 @@
+from dataclasses import dataclass
+from functools import cache
+
+import numpy as np
+
+from shieldsio_plus.common.enums.ansi_named_colors import ANSINamedColor
+from shieldsio_plus.common.types.color_types import RGBColor
+
+# Default xterm colors of the 16 named ANSI colors
+NAMED_COLORS = (
+	"000000",
+	"cd0000",
+	"00cd00",
+	"cdcd00",
+	"0000ee",
+	"cd00cd",
+	"00cdcd",
+	"e5e5e5",
+	"7f7f7f",
+	"ff0000",
+	"00ff00",
+	"ffff00",
+	"5c5cff",
+	"ff00ff",
+	"00ffff",
+	"ffffff",
+)
+
+# Channel levels of the 6x6x6 color cube of indices 16 to 231
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+# Sizes of the ANSI palettes, the 16 named colors and the full 256 colors
+PALETTE_SIZES = (16, 256)
+
+# Bits kept per channel by the lookup tables, so a table holds (2 ** LUT_BITS) ** 3 indices
+LUT_BITS = 5
+
+# Number of cells of the lookup tables matched against the palette at once, to bound memory
+LUT_CHUNK = 4096
+
+
+def _build_palette() -> np.ndarray:
+	cube = [(r, g, b) for r in CUBE_LEVELS for g in CUBE_LEVELS for b in CUBE_LEVELS]
+	greys = [(level, level, level) for level in range(8, 248, 10)]
+	named = [tuple(bytes.fromhex(code)) for code in NAMED_COLORS]
+
+	return np.array(named + cube + greys, dtype=np.uint8)
+
+
+# RGB components of the 256 xterm colors, by index
+ANSI_PALETTE = _build_palette()
+ANSI_PALETTE.flags.writeable = False
+
+
+@cache
+def lookup_table(colors: int = 256) -> np.ndarray:
+	"""
+	Get the table of the nearest ANSI color of every cell of a quantized RGB cube.
+
+	Every channel is quantized to `LUT_BITS` bits, and every cell holds the palette index
+	nearest (in RGB space) to its center, so that finding the nearest ANSI color of any RGB
+	color is a single table read instead of a search of the palette. The table is built
+	once per palette size, in chunks of `LUT_CHUNK` cells.
+
+	Args:
+		colors (optional): Size of the palette searched, 16 for the named colors only, or
+			256. Defaults to 256.
+
+	Raises:
+		ValueError: If the palette size is not supported.
+
+	Returns:
+		The read-only `(2 ** LUT_BITS,) * 3` table of palette indices (uint8).
+	"""
+	if colors not in PALETTE_SIZES:
+		raise ValueError(f"Invalid ANSI palette size: {colors}, should be 16 or 256")
+
+	shift = 8 - LUT_BITS
+	centers = (np.arange(1 << LUT_BITS) << shift) + (1 << shift >> 1)
+	cells = np.stack(np.meshgrid(centers, centers, centers, indexing="ij"), axis=-1).reshape(-1, 3)
+	palette = ANSI_PALETTE[:colors].astype(np.int32)
+	table = np.empty(len(cells), dtype=np.uint8)
+
+	for start in range(0, len(cells), LUT_CHUNK):
+		differences = cells[start : start + LUT_CHUNK, None, :] - palette[None, :, :]
+		table[start : start + LUT_CHUNK] = np.einsum("ijk,ijk->ij", differences, differences).argmin(axis=1)
+
+	table = table.reshape((1 << LUT_BITS,) * 3)
+	table.flags.writeable = False
+
+	return table
+
+
+def nearest_ansi_indices(rgb: np.ndarray, colors: int = 256) -> np.ndarray:
+	"""
+	Find the nearest ANSI color of many RGB colors, through the lookup table.
+
+	Args:
+		rgb: The `(..., 3)` array of components, from 0 to 255.
+		colors (optional): Size of the palette searched, 16 or 256. Defaults to 256.
+
+	Returns:
+		The palette index of every color (uint8).
+	"""
+	cells = np.asarray(rgb, dtype=np.uint8) >> (8 - LUT_BITS)
+
+	return lookup_table(colors)[cells[..., 0], cells[..., 1], cells[..., 2]]
+
+
+@dataclass(frozen=True, slots=True)
+class ANSIColor:
+	"""
+	A color of the 256-color ANSI terminal palette, rendered with the xterm defaults.
+
+	Indices 0 to 15 are the named colors (see `ANSINamedColor`), 16 to 231 a 6x6x6 color
+	cube, and 232 to 255 a greyscale ramp.
+
+	Attributes:
+		index: The palette index, from 0 to 255.
+	"""
+
+	index: int
+
+	def __post_init__(self) -> None:
+		"""
+		Validate the palette index.
+
+		Raises:
+			ValueError: If the index is not between 0 and 255.
+		"""
+		if isinstance(self.index, bool) or not isinstance(self.index, int) or not 0 <= self.index <= 255:
+			raise ValueError(f"Invalid ANSI color index: {self.index}, should be between 0 and 255")
+
+	def __str__(self) -> str:  # noqa: D105
+		return self.hex
+
+	@classmethod
+	def parse(cls, value: int | str) -> "ANSIColor":
+		"""
+		Create an ANSIColor object from a palette index or a named color slug.
+
+		Args:
+			value: The palette index, as an integer or a string of digits, or the slug of a
+				named color, e.g. `bright-red`.
+
+		Raises:
+			ValueError: If the value is neither a valid index nor a named color.
+
+		Returns:
+			A new ANSIColor object.
+		"""
+		if isinstance(value, str):
+			if value.strip().isdigit():
+				return cls(int(value))
+
+			name = value.strip().replace("-", "_").upper()
+
+			if name not in ANSINamedColor.names:
+				raise ValueError(f"Invalid ANSI color: {value}")
+
+			return cls(ANSINamedColor[name].value)
+
+		return cls(value)
+
+	@classmethod
+	def nearest(cls, rgb: RGBColor, colors: int = 256) -> "ANSIColor":
+		"""
+		Find the nearest ANSI color of an RGB color, through the lookup table.
+
+		Args:
+			rgb: The color components, from 0 to 255.
+			colors (optional): Size of the palette searched, 16 or 256. Defaults to 256.
+
+		Returns:
+			The nearest ANSI color.
+		"""
+		r, g, b = (channel >> (8 - LUT_BITS) for channel in rgb)
+
+		return cls(int(lookup_table(colors)[r, g, b]))
+
+	@property
+	def rgb(self) -> RGBColor:
+		"""
+		Get the RGB representation of the color.
+
+		Returns:
+			A tuple of three integers representing the red, green, and blue components.
+		"""
+		return RGBColor(*map(int, ANSI_PALETTE[self.index]))
+
+	@property
+	def hex(self) -> str:
+		"""
+		Get the hex color code with the leading '#'.
+
+		Returns:
+			A string representing the hex color code with the leading '#'.
+		"""
+		return "#" + ANSI_PALETTE[self.index].tobytes().hex()
+
+	def sgr(self, *, background: bool = False) -> str:
+		"""
+		Get the escape sequence setting the color in a terminal.
+
+		Named colors use their 16-color SGR codes, which every terminal supports, and other
+		colors the 256-color extended codes.
+
+		Args:
+			background (optional): Set the background color instead of the foreground. Defaults to False.
+
+		Returns:
+			The SGR escape sequence.
+		"""
+		if self.index < 8:
+			code = f"{(40 if background else 30) + self.index}"
+
+		elif self.index < 16:
+			code = f"{(100 if background else 90) + self.index - 8}"
+
+		else:
+			code = f"{48 if background else 38};5;{self.index}"
+
+		return f"\x1b[{code}m"
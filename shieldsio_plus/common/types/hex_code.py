@@ -4,6 +4,7 @@ from typing import ClassVar
 from scipy.spatial.distance import euclidean
 
 from shieldsio_plus.common.enums.css_named_colors import CSSNamedColor
+from shieldsio_plus.common.types.ansi_color import ANSIColor
 from shieldsio_plus.common.types.color_types import HSLAColor, HSLColor, RGBAColor, RGBColor
 
 
@@ -22,7 +23,7 @@ class HexColor:
 	value: str
 	supported_classes: ClassVar[set[str]] = field(
 		init=False,
-		default={"hex", "rgb", "rgba", "hsl", "hsla", "named_color"},
+		default={"hex", "rgb", "rgba", "hsl", "hsla", "named_color", "ansi"},
 	)
 
 	def __init__(self, value: str) -> None:
@@ -394,3 +395,28 @@ class HexColor:
 			A new HexColor object.
 		"""
 		return cls(css.hex)
+
+	def to_ansi(self, colors: int = 256) -> ANSIColor:
+		"""
+		Convert the hex color code to the closest ANSI terminal color.
+
+		Args:
+			colors (optional): Size of the ANSI palette searched, 16 or 256. Defaults to 256.
+
+		Returns:
+			An ANSIColor object representing the closest ANSI color to the hex code.
+		"""
+		return ANSIColor.nearest(self.to_rgb(), colors)
+
+	@classmethod
+	def from_ansi(cls, ansi: ANSIColor) -> "HexColor":
+		"""
+		Create a HexColor object from an ANSI terminal color.
+
+		Args:
+			ansi: An ANSIColor object, rendered with the xterm default palette.
+
+		Returns:
+			A new HexColor object.
+		"""
+		return cls(ansi.hex)
@@ -1,17 +1,24 @@
+from collections.abc import Callable
 from dataclasses import dataclass, field
-from operator import itemgetter
+from hashlib import sha256
 from pathlib import Path
-from typing import Any, Final
-from urllib.parse import urlencode
+from typing import Any, Optional
 
 from loguru import logger
 
+from shieldsio_plus.common.enums.font_embedding import FontEmbedding
 from shieldsio_plus.common.enums.shields_io_badge_styles import ShieldsIOBadgeStyle
 from shieldsio_plus.common.enums.shields_io_named_colors import ShieldsIONamedColor
 from shieldsio_plus.common.enums.web_safe_fonts import WebSafeFont
+from shieldsio_plus.common.enums.woff2_fonts import KnownWOFF2Fonts
+from shieldsio_plus.common.types.ansi_color import ANSIColor
 from shieldsio_plus.common.types.hex_code import HexColor
+from shieldsio_plus.common.types.shields_io_badge_spec import SHIELDS_IO_BASE_URL, ShieldsIOBadgeSpec
 from shieldsio_plus.common.types.shields_io_color import ShieldsIOColor
 from shieldsio_plus.common.types.svg import SVG
+from shieldsio_plus.util.metrics import RENDER_DURATION
+from shieldsio_plus.util.timing import StageTimer, timed
+from shieldsio_plus.util.variants import DEFAULT_LABEL_COLOR, text_colors_for_background, to_svg_color
 
 
 @dataclass
@@ -32,6 +39,8 @@ class ShieldsIOBadge:
 		label_color: Optional color for the left side of the badge.
 		logo_color: Optional color for the badge logo.
 		font: The font family used for badge text.
+		web_font: Optional web font of the badge text, used instead of `font`.
+		font_embedding: How the web font is delivered, embedded in the badge or shared by the page.
 	"""
 
 	slug: str
@@ -43,10 +52,12 @@ class ShieldsIOBadge:
 	label_color: ShieldsIOColor | None = None
 	logo_color: ShieldsIOColor | None = None
 	font: WebSafeFont = WebSafeFont.DEFAULT
-	__BASE_URL: Final[str] = field(init=False, default="https://img.shields.io/badge/")
+	web_font: KnownWOFF2Fonts | None = None
+	font_embedding: FontEmbedding = FontEmbedding.EMBEDDED
 	__color: str = field(init=False)
 	__label_color: str | None = field(init=False)
 	__logo_color: str | None = field(init=False)
+	__spec: ShieldsIOBadgeSpec = field(init=False, repr=False)
 
 	def __post_init__(self) -> None:
 		"""
@@ -66,13 +77,24 @@ class ShieldsIOBadge:
 		self.__label_color = self.__parse_shields_io_color_object(self.label_color)
 		self.__logo_color = self.__parse_shields_io_color_object(self.logo_color)
 
+		# Freeze the request parameters, so the URL is only built once
+		self.__spec = ShieldsIOBadgeSpec(
+			label=self.label,
+			logo=self.logo.base64,
+			message=self.message,
+			style=self.style.upstream_style.value,
+			color=self.__color,
+			label_color=self.__label_color,
+			logo_color=self.__logo_color,
+		)
+
 	@staticmethod
 	def __parse_shields_io_color_object(color_obj: ShieldsIOColor | None) -> str | None:
 		"""
 		Converts a ShieldsIOColor object to a string format suitable for Shield.io API.
 
 		Args:
-			color_obj: A color object (ShieldsIONamedColor or HexColor) or None.
+			color_obj: A color object (ShieldsIONamedColor, HexColor or ANSIColor) or None.
 
 		Returns:
 			The color string without the leading '#' or None if color_obj is None.
@@ -87,11 +109,24 @@ class ShieldsIOBadge:
 			if isinstance(color_obj, HexColor):
 				return color_obj.hex.removeprefix("#")  # Handle hex colors by returning the hex value
 
+			if isinstance(color_obj, ANSIColor):
+				return color_obj.hex.removeprefix("#")  # Handle ANSI colors by returning their xterm hex value
+
 			# Invalid color type
 			raise ValueError(f"Invalid color object: {color_obj}")
 
 		return None
 
+	@property
+	def spec(self) -> ShieldsIOBadgeSpec:
+		"""
+		Gets the immutable Shields.io request parameters of the badge.
+
+		Returns:
+			The badge spec.
+		"""
+		return self.__spec
+
 	def build_base64_logo(self) -> str:
 		"""
 		Creates a base64-encoded data URL for the logo.
@@ -99,8 +134,7 @@ class ShieldsIOBadge:
 		Returns:
 			A properly formatted data URL containing the base64-encoded SVG logo.
 		"""
-		decoded_data = self.logo.base64
-		return f"data:image/svg%2bxml;base64,{decoded_data}"
+		return self.__spec.logo_data_url
 
 	def build_shieldsio_badge_str(self) -> str:
 		"""
@@ -111,82 +145,197 @@ class ShieldsIOBadge:
 		Returns:
 			The formatted badge string for the Shields.io API.
 		"""
-		badge_content = "-".join(filter(None, [self.label, self.message, self.__color]))
+		return self.__spec.url.removeprefix(SHIELDS_IO_BASE_URL)
 
-		# Build query parameters
-		query = {
-			"style": self.style.value,
-			"labelColor": self.__label_color,
-			"logoColor": self.__logo_color,
-			"color": self.__color,
-		}
+	def build_shieldsio_url(self) -> str:
+		"""
+		Constructs the complete Shields.io URL for the badge.
 
-		# Filter out None values from query parameters
-		query = dict(filter(itemgetter(1), query.items()))
+		The URL is memoized by the badge spec.
 
-		# URL encode the query parameters
-		query_string = urlencode(query)
+		Returns:
+			The full URL to retrieve the badge from Shields.io.
+		"""
+		return self.__spec.url
 
-		# Combine badge content, query string, and logo
-		return f"{badge_content}?{query_string}&logo={self.build_base64_logo()}"
+	@property
+	def render_hash(self) -> str:
+		"""
+		Gets the hash of the rendered badge, i.e. of its request parameters and its local post-processing steps.
 
-	def build_shieldsio_url(self) -> str:
+		Returns:
+			The SHA-256 hex digest, shared by every badge rendered to the same SVG.
 		"""
-		Constructs the complete Shields.io URL for the badge.
+		web_font = f"/{self.web_font.name}/{self.font_embedding.name}" if self.web_font else ""
+
+		return sha256(f"{self.__spec.param_hash}/{self.style.name}/{self.font.name}{web_font}".encode()).hexdigest()
+
+	@property
+	def key(self) -> str:
+		"""
+		Gets the unique key of the badge, relative to the output directory.
 
 		Returns:
-			The full URL to retrieve the badge from Shields.io.
+			The key in the `style[/font]/slug` format, where the font is the web font if any.
 		"""
-		return self.__BASE_URL + self.build_shieldsio_badge_str()
+		if self.web_font:
+			font = f"/{self.web_font.slug}"
+
+		else:
+			font = f"/{self.font.name.lower()}" if self.font != WebSafeFont.DEFAULT else ""
 
-	def download_shieldsio_badge(self, path: str) -> None:
+		return self.style.name.lower() + font + f"/{self.slug}"
+
+	def terminal_preview(self, colors: int = 256) -> str:
 		"""
-		Downloads the badge as an SVG file to the specified path.
+		Renders the badge as colored text, for a preview in a terminal.
+
+		Every section is drawn with its background color and the text color Shields.io would
+		write over it, both mapped to the nearest ANSI colors.
+
+		Args:
+			colors (optional): Size of the ANSI palette of the terminal, 16 or 256. Defaults to 256.
+
+		Returns:
+			The badge text, with the ANSI escape sequences of its colors.
+		"""
+		sections = (
+			[(self.label, self.__label_color or DEFAULT_LABEL_COLOR.removeprefix("#")), (self.message, self.__color)]
+			if self.message
+			else [(self.label, self.__color)]
+		)
+		preview = ""
+
+		for text, color in sections:
+			_, background = to_svg_color(color)
+			foreground = HexColor(text_colors_for_background(background)[0]).to_ansi(colors)
+			preview += f"{HexColor.from_rgb(background).to_ansi(colors).sgr(background=True)}{foreground.sgr()} {text} "
 
-		Creates the directory if it doesn't exist, downloads the badge,
-		and applies any necessary transformations.
+		return preview + "\x1b[0m"
+
+	def file_path(self, path: str) -> Path:
+		"""
+		Gets the path of the badge file.
+
+		Args:
+			path: The directory path where the badges are saved.
+
+		Returns:
+			The resolved path of the badge SVG file.
+		"""
+		return Path(path + "/" + self.key + ".svg").resolve()
+
+	def render(self, fetch: Callable[[str], str] = SVG.fetch, *, timer: Optional[StageTimer] = None) -> SVG:
+		"""
+		Renders the badge by downloading it from Shields.io and applying any necessary transformations.
+
+		The whole render is observed in the render latency histogram of the badge style.
+
+		Args:
+			fetch (optional): Function downloading the raw SVG of a URL. Defaults to `SVG.fetch`.
+			timer (optional): Timer of the build, timing each stage. Defaults to None.
+
+		Returns:
+			The rendered badge.
+		"""
+		with RENDER_DURATION.time(style=self.style.name.lower()):
+			# Download the SVG data from Shields.io
+			with timed(timer, "fetch", self.key):
+				svg_str = fetch(self.build_shieldsio_url())
+
+			return self.post_process(svg_str, timer=timer)
+
+	def post_process(self, svg_str: str, *, timer: Optional[StageTimer] = None) -> SVG:
+		"""
+		Applies the local transformations of the badge to the SVG fetched from Shields.io.
+
+		Args:
+			svg_str: The SVG content returned by Shields.io for the badge URL.
+			timer (optional): Timer of the build, timing each stage. Defaults to None.
+
+		Returns:
+			The transformed badge.
+		"""
+		with timed(timer, "parse", self.key):
+			img_data = SVG(svg_str)
+
+		with timed(timer, "transform", self.key):
+			# Apply TRUE_FLAT specific transformations
+			if self.style.name == ShieldsIOBadgeStyle.TRUE_FLAT.name:
+				img_data.parse_real_flat()
+
+			# Apply custom font if not using the default
+			if self.web_font:
+				img_data.use_web_font(self.web_font, self.font_embedding)
+
+			elif self.font != WebSafeFont.DEFAULT:
+				img_data.change_font(self.font)
+
+		return img_data
+
+	def save_shieldsio_badge(self, path: str, img_data: SVG, *, timer: Optional[StageTimer] = None) -> bool:
+		"""
+		Writes the rendered badge as an SVG file to the specified path.
+
+		Creates the directory if it doesn't exist, and leaves the file
+		untouched if it is already up to date.
 
 		Args:
 			path: The directory path where the badge will be saved.
+			img_data: The rendered badge.
+			timer (optional): Timer of the build, timing the write. Defaults to None.
+
+		Returns:
+			True if the file was written, False if it was already up to date.
 		"""
-		# Download the SVG data from Shields.io
-		img_data = SVG.from_url(self.build_shieldsio_url())
+		with timed(timer, "write", self.key):
+			# Create the full path including style subdirectory
+			self.path = self.file_path(path)
 
-		# Apply TRUE_FLAT specific transformations
-		if self.style.name == ShieldsIOBadgeStyle.TRUE_FLAT.name:
-			img_data.parse_real_flat()
+			# Create directories if they don't exist
+			if not self.path.parent.exists():
+				self.path.parent.mkdir(parents=True, exist_ok=True)
 
-		# Apply custom font if not using the default
-		if self.font != WebSafeFont.DEFAULT:
-			img_data.change_font(self.font)
+			# Write the SVG to file
+			written = img_data.save_to_file(self.path)
 
-		# Create the full path including style subdirectory
-		self.path = Path(
-			path
-			+ "/"
-			+ self.style.name.lower()
-			+ (f"/{self.font.name.lower()}" if self.font != WebSafeFont.DEFAULT else ""),
-		).resolve()
+		logger.info(f"Downloaded: {self.slug} to {self.path}" + ("" if written else " (unchanged)"))
 
-		# Create directories if they don't exist
-		if not self.path.exists():
-			self.path.mkdir(parents=True, exist_ok=True)
+		return written
 
-		# Set the file path with slug as filename
-		self.path /= f"{self.slug}.svg"
+	def download_shieldsio_badge(
+		self,
+		path: str,
+		fetch: Callable[[str], str] = SVG.fetch,
+		*,
+		timer: Optional[StageTimer] = None,
+	) -> bool:
+		"""
+		Downloads the badge as an SVG file to the specified path.
 
-		# Write the SVG to file
-		img_data.save_to_file(self.path)
+		Renders the badge and writes it to disk, unless the file is already up to date.
 
-		logger.info(f"Downloaded: {self.slug} to {self.path}")
+		Args:
+			path: The directory path where the badge will be saved.
+			fetch (optional): Function downloading the raw SVG of a URL. Defaults to `SVG.fetch`.
+			timer (optional): Timer of the build, timing each stage. Defaults to None.
+
+		Returns:
+			True if the file was written, False if it was already up to date.
+		"""
+		return self.save_shieldsio_badge(path, self.render(fetch, timer=timer), timer=timer)
 
 	def to_dict(self) -> dict[str, Any]:
 		"""
 		Converts the badge object to a dictionary representation.
 
 		Returns:
-			A dictionary containing the badge's properties.
+			A dictionary containing the badge's properties. The web font is only included if set.
 		"""
+		web_font = (
+			{"web_font": self.web_font.slug, "font_embedding": self.font_embedding.value} if self.web_font else {}
+		)
+
 		return {
 			"slug": self.slug,
 			"label": self.label,
@@ -196,5 +345,6 @@ class ShieldsIOBadge:
 			"label_color": self.__label_color,
 			"logo_color": self.__logo_color,
 			"font": self.font.name.lower(),
+			**web_font,
 			"shields_io_url": self.build_shieldsio_url(),
 		}
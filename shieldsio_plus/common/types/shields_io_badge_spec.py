@@ -0,0 +1,123 @@
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from hashlib import sha256
+from operator import itemgetter
+from typing import Optional
+from urllib.parse import urlencode
+
+SHIELDS_IO_BASE_URL = "https://img.shields.io/badge/"
+
+
+@lru_cache(maxsize=4096)
+def encode_query(
+	style: str,
+	label_color: Optional[str] = None,
+	logo_color: Optional[str] = None,
+	color: Optional[str] = None,
+) -> str:
+	"""
+	URL encode the query parameters of a badge, without the logo and the unset ones.
+
+	Memoized, since a catalog holds many badges but only a few combinations of style and colors.
+
+	Args:
+		style: The Shields.io style value.
+		label_color (optional): Color for the left side of the badge. Defaults to None.
+		logo_color (optional): Color for the badge logo. Defaults to None.
+		color (optional): Color for the right side of the badge. Defaults to None.
+
+	Returns:
+		The encoded query string.
+	"""
+	query = {
+		"style": style,
+		"labelColor": label_color,
+		"logoColor": logo_color,
+		"color": color,
+	}
+
+	return urlencode(dict(filter(itemgetter(1), query.items())))
+
+
+@dataclass(frozen=True, slots=True)
+class ShieldsIOBadgeSpec:
+	"""
+	Immutable description of a Shields.io badge request.
+
+	Holds exactly the parameters sent to Shields.io, already converted to their API string
+	format, so that two specs are equal (and hash equally) if and only if they produce the
+	same request. The canonical URL and its parameter hash are computed on first access and
+	memoized.
+
+	Attributes:
+		label: The text displayed on the badge.
+		logo: The base64-encoded SVG logo.
+		message: Optional text displayed on the right side of the badge.
+		style: The Shields.io style value.
+		color: The color for the right side of the badge.
+		label_color: Optional color for the left side of the badge.
+		logo_color: Optional color for the badge logo.
+	"""
+
+	label: str
+	logo: str
+	message: Optional[str] = None
+	style: str = "flat-square"
+	color: Optional[str] = None
+	label_color: Optional[str] = None
+	logo_color: Optional[str] = None
+	_url: Optional[str] = field(init=False, default=None, repr=False, compare=False)
+	_param_hash: Optional[str] = field(init=False, default=None, repr=False, compare=False)
+
+	@property
+	def badge_content(self) -> str:
+		"""
+		The badge content path segment, combining label, message and color.
+		"""
+		return "-".join(filter(None, [self.label, self.message, self.color]))
+
+	@property
+	def logo_data_url(self) -> str:
+		"""
+		The data URL of the base64-encoded logo.
+		"""
+		return f"data:image/svg%2bxml;base64,{self.logo}"
+
+	@property
+	def url(self) -> str:
+		"""
+		The canonical Shields.io URL of the badge, computed once.
+		"""
+		if self._url is None:
+			query_string = encode_query(self.style, self.label_color, self.logo_color, self.color)
+			url = f"{SHIELDS_IO_BASE_URL}{self.badge_content}?{query_string}&logo={self.logo_data_url}"
+			object.__setattr__(self, "_url", url)  # noqa: PLC2801
+
+		return self._url
+
+	@property
+	def param_hash(self) -> str:
+		"""
+		The SHA-256 hex digest of the canonical URL, computed once.
+		"""
+		if self._param_hash is None:
+			object.__setattr__(self, "_param_hash", sha256(self.url.encode("utf-8")).hexdigest())  # noqa: PLC2801
+
+		return self._param_hash
+
+
+def build_urls(specs: Iterable[ShieldsIOBadgeSpec]) -> list[str]:
+	"""
+	Build the canonical URLs of many badge specs at once.
+
+	Query strings are encoded once per distinct combination of style and colors, and
+	every URL is memoized in its spec, so the catalog can be rebuilt for free.
+
+	Args:
+		specs: The badge specs.
+
+	Returns:
+		The canonical URLs, in the same order as `specs`.
+	"""
+	return [spec.url for spec in specs]
@@ -1,14 +1,16 @@
 from typing import Union
 
 from shieldsio_plus.common.enums.shields_io_named_colors import ShieldsIONamedColor
+from shieldsio_plus.common.types.ansi_color import ANSIColor
 from shieldsio_plus.common.types.hex_code import HexColor
 
 # Type alias for colors supported by Shields.io
-ShieldsIOColor = Union[ShieldsIONamedColor, HexColor]
+ShieldsIOColor = Union[ShieldsIONamedColor, HexColor, ANSIColor]
 """
 Type alias representing colors supported by Shields.io.
 
 This union type allows for either:
     - ShieldsIONamedColor: Predefined named colors from the Shields.io palette
     - HexColor: Custom colors represented as hex codes
+    - ANSIColor: Terminal palette colors, sent as their xterm default hex codes
 """
@@ -1,12 +1,35 @@
 from base64 import b64decode, b64encode
 from binascii import Error as EncodingError
+from bisect import bisect_right
 from dataclasses import dataclass, field
+from math import ceil, isclose
 from pathlib import Path
 
-import requests
-from bs4 import BeautifulSoup
+import numpy as np
+from bs4 import BeautifulSoup, Tag
 
+from shieldsio_plus.common.enums.font_embedding import FontEmbedding
 from shieldsio_plus.common.enums.web_safe_fonts import WebSafeFont
+from shieldsio_plus.common.enums.woff2_fonts import KnownWOFF2Fonts
+from shieldsio_plus.util.files import write_if_changed
+from shieldsio_plus.util.font_metrics import FontMetrics
+from shieldsio_plus.util.font_stylesheet import font_face_css, font_family
+from shieldsio_plus.util.upstream import upstream
+
+# Font size of Shields.io badge texts, in tenths of a pixel, when none is set
+DEFAULT_FONT_SIZE = 110
+
+
+def _inherited(tag: Tag, name: str, default: float) -> float:
+	for element in (tag, *tag.parents):
+		if isinstance(element, Tag) and element.has_attr(name):
+			return float(element[name])
+
+	return default
+
+
+def _format_length(value: float) -> str:
+	return f"{round(value, 1):g}"
 
 
 @dataclass
@@ -65,7 +88,28 @@ class SVG:
 		Returns:
 			A new SVG object with content from the URL.
 		"""
-		return cls(requests.get(url).content.decode())  # noqa: S113
+		return cls(cls.fetch(url))
+
+	@staticmethod
+	def fetch(url: str) -> str:
+		"""
+		Download the raw SVG content from a URL.
+
+		Args:
+			url: URL to the SVG resource.
+
+		Returns:
+			The SVG content as a string.
+
+		Raises:
+			RequestException: If the request fails.
+			HTTPError: If the upstream answers with an error status.
+			FileNotFoundError: If replaying recorded responses and the URL was never recorded.
+		"""  # noqa: DOC502
+		response = upstream.get(url)
+		response.raise_for_status()
+
+		return response.text
 
 	def svg_to_base64(self) -> None:
 		"""
@@ -203,12 +247,130 @@ class SVG:
 		self.svg_str = str(soup)
 		self.svg_to_base64()  # Update base64 after modifying SVG
 
-	def save_to_file(self, path: str) -> None:
+	@staticmethod
+	def fit_text(soup: BeautifulSoup, metrics: FontMetrics) -> None:
+		"""
+		Lay the texts of a Shields.io badge out again, with the advance widths of another font.
+
+		Shields.io sizes every text, and the background of its section, for Verdana. Every text
+		gets the width measured with the font, its section grows or shrinks by the difference,
+		and the sections after it, their texts and logos, and the badge itself are shifted or
+		resized to match. Badges whose texts are not laid over section backgrounds are left
+		unchanged.
+
+		Args:
+			soup: BeautifulSoup object representing the SVG content.
+			metrics: The advance widths of the font.
+		"""
+		texts = [
+			text
+			for text in soup.find_all(lambda tag: SVG.local_name(tag.name) == "text")
+			if text.has_attr("textLength")
+		]
+		rects = sorted(
+			(
+				rect
+				for rect in soup.find_all(lambda tag: SVG.local_name(tag.name) == "rect")
+				if SVG.local_name(rect.parent.name) == "g" and not rect.get("fill", "url(").startswith("url(")
+			),
+			key=lambda rect: float(rect.get("x", 0)),
+		)
+
+		if not texts or not rects or soup.svg is None:
+			return
+
+		starts = [float(rect.get("x", 0)) for rect in rects]
+		badge_width = float(soup.svg.get("width", 0))
+
+		# Texts are laid out in tenths of a pixel, through a scale transform of one tenth
+		contents = [text.get_text() for text in texts]
+		sizes = np.array([_inherited(text, "font-size", DEFAULT_FONT_SIZE) for text in texts])
+		spacings = np.array([_inherited(text, "letter-spacing", 0) for text in texts])
+		lengths = metrics.measure_many(contents, 1.0) * sizes + spacings * [len(content) for content in contents]
+
+		sections = [max(bisect_right(starts, float(text.get("x", 0)) / 10) - 1, 0) for text in texts]
+		deltas = [0.0] * len(rects)
+
+		for text, section, length in zip(texts, sections, lengths, strict=True):
+			new_length = ceil(length)
+			deltas[section] = (new_length - float(text["textLength"])) / 10
+			text["textLength"] = str(new_length)
+
+		offsets = [sum(deltas[:index]) for index in range(len(rects))]
+
+		for text, section in zip(texts, sections, strict=True):
+			text["x"] = _format_length(float(text.get("x", 0)) + (offsets[section] + deltas[section] / 2) * 10)
+
+		for image in soup.find_all(lambda tag: SVG.local_name(tag.name) == "image"):
+			section = max(bisect_right(starts, float(image.get("x", 0))) - 1, 0)
+			image["x"] = _format_length(float(image.get("x", 0)) + offsets[section])
+
+		for rect, offset, delta in zip(rects, offsets, deltas, strict=True):
+			if rect.has_attr("x") or offset:
+				rect["x"] = _format_length(float(rect.get("x", 0)) + offset)
+
+			rect["width"] = _format_length(float(rect.get("width", 0)) + delta)
+
+		# The clip path and the gradient overlay span the whole badge
+		section_ids = {id(rect) for rect in rects}
+
+		for rect in soup.find_all(lambda tag: SVG.local_name(tag.name) == "rect"):
+			if id(rect) not in section_ids and rect.has_attr("width") and isclose(float(rect["width"]), badge_width):
+				rect["width"] = _format_length(badge_width + sum(deltas))
+
+		soup.svg["width"] = _format_length(badge_width + sum(deltas))
+
+	def use_web_font(self, font: KnownWOFF2Fonts, embedding: FontEmbedding = FontEmbedding.EMBEDDED) -> None:
+		"""
+		Change the font of text elements in the SVG to a web font.
+
+		Texts and backgrounds are laid out again with the advance widths of the font, see
+		`fit_text`, so that the texts are not stretched to Verdana widths.
+
+		Args:
+			font: The web font to apply.
+			embedding (optional): How the font is delivered. With `FontEmbedding.EMBEDDED` the
+				`@font-face` rules of the font files covering the text are added to the SVG in a
+				`<style>` element, with
+				`FontEmbedding.SHARED` the text only references the font family, which the page
+				defines once for every badge. Defaults to `FontEmbedding.EMBEDDED`.
+
+		Raises:
+			ValueError: If the SVG content cannot be parsed.
+			HTTPError: If a file of the font cannot be downloaded to measure the text.
+		"""  # noqa: DOC502
+		try:
+			soup = BeautifulSoup(self.svg_str, "lxml-xml")
+		except Exception as e:
+			raise ValueError(f"Invalid SVG content: {self.svg_str}") from e
+
+		for text in soup.find_all(lambda tag: SVG.local_name(tag.name) in {"text", "g"}):
+			text["font-family"] = font_family(font)
+
+		self.fit_text(soup, font.metrics)
+
+		if embedding == FontEmbedding.EMBEDDED and soup.svg is not None:
+			texts = "".join(text.get_text() for text in soup.find_all(lambda tag: SVG.local_name(tag.name) == "text"))
+
+			# Only the files covering the text are embedded, the others would never be loaded
+			if css := font_face_css(font, texts):
+				style = soup.new_tag("style")
+				style.string = css
+				soup.svg.insert(0, style)
+
+		self.svg_str = str(soup)
+		self.svg_to_base64()  # Update base64 after modifying SVG
+
+	def save_to_file(self, path: str) -> bool:
 		"""
 		Save the SVG content to a file.
 
+		The file is replaced atomically, and left untouched if it already holds the same content.
+
 		Args:
 			path: Path to save the SVG content to.
+
+		Returns:
+			True if the file was written, False if it was already up to date.
 		"""
-		with Path(path).open("w", encoding="utf-8") as handler:
-			handler.write(self.svg_str)
+		return write_if_changed(path, self.svg_str)
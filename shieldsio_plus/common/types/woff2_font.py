@@ -3,7 +3,8 @@ from binascii import Error as EncodingError
 from dataclasses import dataclass, field
 from operator import itemgetter
 
-import requests
+from shieldsio_plus.common.enums.unicode_ranges import UnicodeRange
+from shieldsio_plus.util.upstream import upstream
 
 
 @dataclass
@@ -32,12 +33,13 @@ class WOFF2Font:
 
 		Raises:
 			HTTPError: If the URL is invalid or the request fails.
+			FileNotFoundError: If replaying recorded responses and the URL was never recorded.
 			ValueError: If the file is not a WOFF2 font.
 		"""  # noqa: DOC502
-		response = requests.get(self.url)  # noqa: S113
+		response = upstream.get(self.url)
 		response.raise_for_status()
 
-		if response.headers["Content-Type"] != "font/woff2":
+		if response.content_type != "font/woff2":
 			raise ValueError("Invalid WOFF2 font file")
 
 		self.b64 = b64encode(response.content).decode()
@@ -89,7 +91,7 @@ class WOFF2Font:
 		font_style: str = "normal",
 		font_weight: str = "400",
 		font_display: str = "swap",
-		unicode_range: str = "U+0100-02BA, U+02BD-02C5, U+02C7-02CC, U+02CE-02D7, U+02DD-02FF, U+0304, U+0308, U+0329, U+1D00-1DBF, U+1E00-1E9F, U+1EF2-1EFF, U+2020, U+20A0-20AB, U+20AD-20C0, U+2113, U+2C60-2C7F, U+A720-A7FF",  # noqa: E501
+		unicode_range: str = UnicodeRange.LATIN_EXT.range,
 		**kwargs: dict[str, str],
 	) -> str:
 		"""
@@ -108,5 +110,5 @@ class WOFF2Font:
 
 		params = dict(filter(itemgetter(1), params.items()))
 
-		params_str = " ".join(f"{k.replace("_", "-")}: {v}" for k, v in params.items())
+		params_str = " ".join(f"{k.replace('_', '-')}: {v}" for k, v in params.items())
 		return f"@font-face {{ font-family: '{family_name}'; {params_str}; src: {self.build_css_src()}; }}"
@@ -0,0 +1,65 @@
+from collections.abc import Awaitable, Callable
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest, HttpResponse
+
+from shieldsio_plus.util.metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT
+
+
+class MetricsMiddleware:
+	"""
+	Middleware recording in-flight requests and request latency.
+
+	Supports both the WSGI and the ASGI application, so that requests served by async
+	views are not forced through a thread.
+	"""
+
+	sync_capable = True
+	async_capable = True
+
+	def __init__(self, get_response: Callable[[HttpRequest], HttpResponse | Awaitable[HttpResponse]]) -> None:  # noqa: D107
+		self.get_response = get_response
+
+		if iscoroutinefunction(self.get_response):
+			markcoroutinefunction(self)
+
+	def __call__(self, request: HttpRequest) -> HttpResponse | Awaitable[HttpResponse]:  # noqa: D102
+		if iscoroutinefunction(self):
+			return self._acall(request)
+
+		REQUESTS_IN_FLIGHT.inc()
+		start = perf_counter()
+		status = "500"
+
+		try:
+			response = self.get_response(request)
+			status = str(response.status_code)
+			return response
+
+		finally:
+			REQUEST_DURATION.observe(perf_counter() - start, method=request.method, status=status)
+			REQUESTS_IN_FLIGHT.dec()
+
+	async def _acall(self, request: HttpRequest) -> HttpResponse:
+		"""
+		Async version of `__call__`.
+
+		Args:
+			request: The incoming request.
+
+		Returns:
+			The response of the next middleware or view.
+		"""
+		REQUESTS_IN_FLIGHT.inc()
+		start = perf_counter()
+		status = "500"
+
+		try:
+			response = await self.get_response(request)
+			status = str(response.status_code)
+			return response
+
+		finally:
+			REQUEST_DURATION.observe(perf_counter() - start, method=request.method, status=status)
+			REQUESTS_IN_FLIGHT.dec()
@@ -0,0 +1,247 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from argparse import SUPPRESS, ArgumentParser
+from collections.abc import Sequence
+from itertools import pairwise
+from math import log
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Optional
+
+from loguru import logger
+
+from shieldsio_plus.common.enums.upstream_mode import UpstreamMode
+from shieldsio_plus.scripts.main import iter_badges
+from shieldsio_plus.scripts.update_readme import script as update_readme
+from shieldsio_plus.util.download_shieldsio_badges import download_shields_io_badges
+from shieldsio_plus.util.journal import BuildJournal
+from shieldsio_plus.util.manifest import validate_manifest
+from shieldsio_plus.util.rate_limit import AdaptiveRateLimiter
+from shieldsio_plus.util.synthetic_manifest import write_synthetic_manifest
+from shieldsio_plus.util.upstream import upstream
+from shieldsio_plus.util.upstream_server import StandInServer
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Stages of `main.script`, in build order
+STAGES = ("validate", "build", "readme")
+
+# Scaling exponent of a stage above which it is reported as super-linear
+SUPERLINEAR_EXPONENT = 1.2
+
+
+def run_stage(stage: str, directory: Path, latency: float) -> None:
+	"""
+	Run a build stage against the synthetic manifest of a directory.
+
+	The stage is the same as in `main.script`, but reads and writes its files in the given
+	directory, and badges are fetched from a local Shields.io stand-in.
+
+	Args:
+		stage: The stage, one of `STAGES`.
+		directory: The directory holding the synthetic manifest and the README copy.
+		latency: Latency of the upstream stand-in, in seconds.
+	"""
+	manifest_path = directory / "manifest.json"
+
+	if stage == "validate":
+		validate_manifest(str(manifest_path))
+
+	elif stage == "build":
+		# The stand-in is local, so the upstream rate limit would only measure itself
+		upstream.mode = UpstreamMode.PASSTHROUGH
+		upstream.limiter = AdaptiveRateLimiter(max_rate=10_000, burst=10_000)
+
+		with StandInServer(latency=latency) as server, BuildJournal(directory / "build.journal") as journal:
+			upstream.base_url = server.url
+
+			with manifest_path.open(encoding="utf-8") as f:
+				manifest = json.load(f)
+
+			download_shields_io_badges(
+				iter_badges(manifest, manifest["root"]),
+				f"{directory}/shields/",
+				directory / "badges.json",
+				journal=journal,
+			)
+
+	else:
+		update_readme([
+			"--markdown-filename",
+			str(directory / "README.md"),
+			"--badges-json-filename",
+			str(directory / "badges.json"),
+		])
+
+
+def measure_stage(stage: str, directory: Path, latency: float) -> tuple[float, int]:
+	"""
+	Run a build stage in a fresh interpreter, measuring its duration and peak RSS.
+
+	Every stage runs in its own subprocess, so its peak RSS is not hidden by the peak of a
+	previous stage, and includes the baseline of the interpreter and its imports.
+
+	Args:
+		stage: The stage, one of `STAGES`.
+		directory: The directory holding the synthetic manifest.
+		latency: Latency of the upstream stand-in, in seconds.
+
+	Raises:
+		RuntimeError: If the stage fails.
+
+	Returns:
+		The duration of the stage in seconds, excluding the interpreter startup, and its peak
+		RSS in bytes.
+	"""
+	process = subprocess.Popen(
+		[
+			sys.executable,
+			"-m",
+			"shieldsio_plus.scripts.benchmark_manifest",
+			"--run-stage",
+			stage,
+			"--directory",
+			str(directory),
+			"--latency",
+			str(latency * 1000),
+		],
+		cwd=BASE_DIR,
+		stdout=subprocess.PIPE,
+		text=True,
+	)
+
+	output = process.stdout.read()
+	process.stdout.close()
+	_, status, usage = os.wait4(process.pid, 0)
+	process.returncode = os.waitstatus_to_exitcode(status)
+
+	if process.returncode:
+		raise RuntimeError(f"Stage {stage} failed with status {process.returncode}")
+
+	# `ru_maxrss` is in bytes on macOS, and in KiB elsewhere
+	peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+	return json.loads(output.splitlines()[-1])["duration"], peak_rss
+
+
+def log_scaling(results: dict[str, dict[int, tuple[float, int]]]) -> None:
+	"""
+	Log the scaling exponent of every stage between consecutive sizes.
+
+	An exponent of 1 is linear, 2 quadratic. Exponents above `SUPERLINEAR_EXPONENT` are
+	logged as warnings.
+
+	Args:
+		results: The duration and peak RSS of every stage, by size.
+	"""
+	for stage, by_size in results.items():
+		sizes = sorted(by_size)
+
+		for smaller, larger in pairwise(sizes):
+			(smaller_time, _), (larger_time, _) = by_size[smaller], by_size[larger]
+
+			if smaller_time <= 0:
+				continue
+
+			exponent = log(larger_time / smaller_time) / log(larger / smaller)
+
+			logger.log(
+				"WARNING" if exponent > SUPERLINEAR_EXPONENT else "INFO",
+				f"{stage}: time grows as n^{exponent:.2f} from {smaller} to {larger} entries",
+			)
+
+
+def script(args: Optional[Sequence[str]] = None) -> None:
+	"""
+	Script to benchmark the build stages against synthetic manifests of increasing sizes.
+
+	For every size, a synthetic manifest and its icons are generated in a temporary
+	directory, and every stage of `main.script` (validating the manifest, building the
+	badges against a local Shields.io stand-in, updating a copy of the README) is run in its
+	own subprocess. The duration and peak RSS of every stage are logged, and so is how fast
+	its duration grows between sizes, to find super-linear hot spots.
+
+	Args:
+		args (optional): Command-line arguments. Defaults to None, reading `sys.argv`.
+	"""
+	parser = ArgumentParser(description="Benchmark the build against synthetic manifests.")
+
+	parser.add_argument(
+		"--sizes",
+		type=int,
+		nargs="+",
+		default=[10, 1_000, 10_000, 100_000],
+		help="Numbers of entries of the synthetic manifests.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--stages",
+		type=str,
+		nargs="+",
+		choices=STAGES,
+		default=list(STAGES),
+		help="Stages to benchmark. The readme stage reads the output of the build stage.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--latency",
+		type=float,
+		default=0.0,
+		help="Latency of the upstream stand-in, in milliseconds.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--seed",
+		type=int,
+		default=0,
+		help="Seed of the synthetic manifests.",
+		required=False,
+	)
+
+	# Internal options, running a single stage in a benchmark subprocess
+	parser.add_argument("--run-stage", type=str, choices=STAGES, default=None, help=SUPPRESS, required=False)
+	parser.add_argument("--directory", type=Path, default=None, help=SUPPRESS, required=False)
+
+	args = parser.parse_args(args)
+
+	if args.run_stage:
+		logger.remove()
+		logger.add(sys.stderr, level="WARNING")
+
+		start = perf_counter()
+		run_stage(args.run_stage, args.directory, args.latency / 1000)
+		sys.stdout.write(json.dumps({"duration": perf_counter() - start}) + "\n")
+		return
+
+	if "readme" in args.stages and "build" not in args.stages:
+		parser.error("the readme stage needs the build stage")
+
+	stages = [stage for stage in STAGES if stage in args.stages]
+	results: dict[str, dict[int, tuple[float, int]]] = {stage: {} for stage in stages}
+
+	for size in sorted(args.sizes):
+		with TemporaryDirectory(prefix="shieldsio-plus-benchmark-") as tmp:
+			directory = Path(tmp)
+			write_synthetic_manifest(directory, size, args.seed)
+			shutil.copyfile(BASE_DIR / "README.md", directory / "README.md")
+
+			for stage in stages:
+				results[stage][size] = duration, peak_rss = measure_stage(stage, directory, args.latency / 1000)
+
+				logger.info(
+					f"{stage} of {size} entries: {duration:.3f} s ({duration / size * 1000:.3f} ms/entry), "
+					f"peak RSS {peak_rss / 2**20:.1f} MiB",
+				)
+
+	log_scaling(results)
+
+
+if __name__ == "__main__":
+	script()
@@ -0,0 +1,68 @@
+import json
+from argparse import ArgumentParser
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from shieldsio_plus.util.contrast import analyze, manifest_checks
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def script(args: Optional[Sequence[str]] = None) -> None:
+	"""
+	Script to check the WCAG contrast of the colors of every manifest entry.
+
+	The label, message and logo of every badge are checked against their background, and
+	every failing pair is reported with the nearest named color that would fix it.
+
+	Args:
+		args (optional): Command-line arguments. Defaults to None, reading `sys.argv`.
+
+	Raises:
+		SystemExit: If `--strict` is given and a pair fails.
+	"""
+	parser = ArgumentParser(description="Check the contrast of the manifest colors.")
+
+	parser.add_argument(
+		"--manifest-filename",
+		type=str,
+		default=f"{BASE_DIR}/assets/data/manifest.json",
+		help="Path to the manifest file to be checked.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--strict",
+		action="store_true",
+		help="Exit with an error status if any pair fails.",
+		required=False,
+	)
+
+	args = parser.parse_args(args)
+
+	with Path(args.manifest_filename).open(encoding="utf-8") as f:
+		manifest = json.load(f)
+
+	results = analyze(manifest_checks(manifest, f"{BASE_DIR}/{manifest['root']}"))
+	failures = [result for result in results if not result.passed]
+
+	for result in failures:
+		check = result.check
+		suggestion = f", try {check.field} = {result.suggestion[0]}" if result.suggestion else ""
+
+		logger.warning(
+			f"{check.slug}: {check.role} contrast {result.ratio:.2f} is below {check.minimum} "
+			f"({check.foreground or 'text'} on {check.background}){suggestion}",
+		)
+
+	logger.info(f"Checked {len(results)} color pairs of {len(manifest['data'])} entries, {len(failures)} failed.")
+
+	if args.strict and failures:
+		raise SystemExit(1)
+
+
+if __name__ == "__main__":
+	script()
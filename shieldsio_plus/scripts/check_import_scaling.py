@@ -0,0 +1,212 @@
+import json
+import tracemalloc
+from argparse import ArgumentParser
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Optional
+
+from loguru import logger
+
+from shieldsio_plus.common.enums.upstream_mode import UpstreamMode
+from shieldsio_plus.scripts.main import iter_badges
+from shieldsio_plus.util.download_shieldsio_badges import (
+	badges_index_path,
+	download_shields_io_badges,
+	read_badges_index,
+)
+from shieldsio_plus.util.rate_limit import AdaptiveRateLimiter
+from shieldsio_plus.util.simple_icons import import_simple_icons
+from shieldsio_plus.util.upstream import upstream
+from shieldsio_plus.util.upstream_server import StandInServer
+
+# Icon of the synthetic catalogs, in the simple-icons format
+SYNTHETIC_ICON = (
+	'<svg role="img" viewBox="0 0 24 24" xmlns="http://www.w3.org/2000/svg"><title>{title}</title>'
+	'<path d="M12 0C5.373 0 0 5.373 0 12s5.373 12 12 12 12-5.373 12-12S18.627 0 12 0z"/></svg>'
+)
+
+
+def synthesize_catalog(directory: Path, size: int) -> tuple[Path, Path]:
+	"""
+	Write a synthetic simple-icons catalog and its icons.
+
+	Args:
+		directory: Directory to write the catalog in.
+		size: Number of icons.
+
+	Returns:
+		The paths to the catalog, and to the directory of its icons.
+	"""
+	icons_dir = directory / "icons"
+	icons_dir.mkdir()
+	catalog_path = directory / "simple-icons.json"
+
+	with catalog_path.open("w", encoding="utf-8") as f:
+		f.write("[\n")
+
+		for i in range(size):
+			title = f"Brand {i}"
+			(icons_dir / f"brand{i}.svg").write_text(SYNTHETIC_ICON.format(title=title), encoding="utf-8")
+			json.dump({"title": title, "hex": f"{i * 2654435761 % 0xFFFFFF:06X}", "source": "https://example.com"}, f)
+			f.write(",\n" if i < size - 1 else "\n")
+
+		f.write("]\n")
+
+	return catalog_path, icons_dir
+
+
+def measure[T](function: Callable[[], T]) -> tuple[T, float, int]:
+	"""
+	Run a function, measuring its duration and its peak of allocated memory.
+
+	Args:
+		function: The function.
+
+	Returns:
+		The result of the function, its duration in seconds, and its peak memory in bytes.
+	"""
+	tracemalloc.start()
+	start = perf_counter()
+
+	try:
+		result = function()
+		return result, perf_counter() - start, tracemalloc.get_traced_memory()[1]
+
+	finally:
+		tracemalloc.stop()
+
+
+def run_size(size: int) -> dict[str, Any]:
+	"""
+	Import a synthetic catalog into an empty manifest, and build its badges.
+
+	Args:
+		size: Number of icons of the catalog.
+
+	Returns:
+		The number of built entries, and the duration and peak memory of the import and the build.
+	"""
+	with TemporaryDirectory(prefix="shieldsio-plus-scaling-") as tmp:
+		directory = Path(tmp)
+		catalog_path, icons_dir = synthesize_catalog(directory, size)
+		manifest_path = directory / "manifest.json"
+		manifest_path.write_text(json.dumps({"root": "assets/icons/", "data": []}, indent=2), encoding="utf-8")
+
+		_, import_time, import_peak = measure(
+			lambda: import_simple_icons(catalog_path, icons_dir, manifest_path, directory),
+		)
+
+		def build() -> int:
+			with manifest_path.open(encoding="utf-8") as f:
+				manifest = json.load(f)
+
+			download_shields_io_badges(
+				iter_badges(manifest, f"{directory}/{manifest['root']}"),
+				f"{directory}/shields/",
+				directory / "badges.json",
+			)
+
+			return len(read_badges_index(badges_index_path(directory / "badges.json"))["slugs"])
+
+		built, build_time, build_peak = measure(build)
+
+	return {
+		"entries": built,
+		"import_time": import_time,
+		"import_peak": import_peak,
+		"build_time": build_time,
+		"build_peak": build_peak,
+	}
+
+
+def script(args: Optional[Sequence[str]] = None) -> None:
+	"""
+	Script to check that importing and building the simple-icons catalog scales linearly.
+
+	Synthetic catalogs of increasing sizes are imported into an empty manifest, and their
+	badges built against a local Shields.io stand-in. The time per icon of the import and
+	of the build should stay flat as the catalog grows. The import holds no icon in memory,
+	and the build only keeps a few small records per badge (its spool offset and timings),
+	never its SVG or logo, so their peak memory may only grow by a small budget per icon.
+
+	Args:
+		args (optional): Command-line arguments. Defaults to None, reading `sys.argv`.
+
+	Raises:
+		SystemExit: If the time per icon of the largest catalog is over `--tolerance` times the
+			one of the smallest, or if the peak memory grows by more than `--memory-per-icon`
+			from the smallest to the largest.
+	"""
+	parser = ArgumentParser(description="Check that the simple-icons import and build scale linearly.")
+
+	parser.add_argument(
+		"--sizes",
+		type=int,
+		nargs="+",
+		default=[250, 500, 1000],
+		help="Sizes of the synthetic catalogs, in icons.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--tolerance",
+		type=float,
+		default=2.0,
+		help="Maximum growth of the time per icon, from the smallest to the largest catalog.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--memory-per-icon",
+		type=float,
+		default=16.0,
+		help="Maximum growth of the peak memory per additional icon, in KiB.",
+		required=False,
+	)
+
+	args = parser.parse_args(args)
+	sizes = sorted(args.sizes)
+
+	# The stand-in is local, so the upstream rate limit would only measure itself
+	upstream.mode = UpstreamMode.PASSTHROUGH
+	upstream.limiter = AdaptiveRateLimiter(max_rate=10_000, burst=10_000)
+	results = {}
+
+	with StandInServer(latency=0) as server:
+		upstream.base_url = server.url
+
+		for size in sizes:
+			results[size] = result = run_size(size)
+
+			summary = "; ".join(
+				f"{stage} {result[f'{stage}_time'] / size * 1000:.2f} ms/icon, "
+				f"peak {result[f'{stage}_peak'] / 2**20:.1f} MiB"
+				for stage in ("import", "build")
+			)
+			logger.info(f"{size} icons ({result['entries']} built): {summary}")
+
+	smallest, largest = results[sizes[0]], results[sizes[-1]]
+	added = max(sizes[-1] - sizes[0], 1)
+	failures = [
+		f"{stage} time per icon grew {growth:.2f}x"
+		for stage in ("import", "build")
+		if (growth := largest[f"{stage}_time"] / sizes[-1] / (smallest[f"{stage}_time"] / sizes[0])) > args.tolerance
+	] + [
+		f"{stage} peak memory grew by {growth:.1f} KiB per icon"
+		for stage in ("import", "build")
+		if (growth := (largest[f"{stage}_peak"] - smallest[f"{stage}_peak"]) / added / 1024) > args.memory_per_icon
+	]
+
+	for failure in failures:
+		logger.error(f"From {sizes[0]} to {sizes[-1]} icons, the {failure}")
+
+	if failures:
+		raise SystemExit(1)
+
+	logger.info(f"The import and build scale linearly from {sizes[0]} to {sizes[-1]} icons")
+
+
+if __name__ == "__main__":
+	script()
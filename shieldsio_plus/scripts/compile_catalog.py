@@ -0,0 +1,48 @@
+from argparse import ArgumentParser
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from shieldsio_plus.util.catalog import DEFAULT_CATALOG_PATH, compile_catalog
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def script(args: Optional[Sequence[str]] = None) -> None:
+	"""
+	Script to compile the manifest and its logos into a catalog.
+
+	The API reads the catalog instead of the manifest when it was compiled from the current
+	manifest, so that entries are read on demand instead of parsed at startup.
+
+	Args:
+		args (optional): Command-line arguments. Defaults to None, reading `sys.argv`.
+	"""
+	parser = ArgumentParser(description="Compile the badge catalog.")
+
+	parser.add_argument(
+		"--manifest-filename",
+		type=str,
+		default=f"{BASE_DIR}/assets/data/manifest.json",
+		help="Path to the manifest file to be compiled.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--catalog-filename",
+		type=str,
+		default=str(DEFAULT_CATALOG_PATH),
+		help="Path to the compiled catalog.",
+		required=False,
+	)
+
+	args = parser.parse_args(args)
+
+	if not compile_catalog(args.manifest_filename, BASE_DIR, args.catalog_filename):
+		logger.info(f"The catalog {args.catalog_filename} is up to date")
+
+
+if __name__ == "__main__":
+	script()
@@ -1,25 +1,59 @@
-import pathlib
-from json import dumps
-
-from pyperclip import copy
-
-parsed_data = []
-all_svgs = list(pathlib.Path("./assets/icons").glob("*.svg"))
-
-for svg in all_svgs:
-	slug, display_text, bg_color = svg.stem.split("_")
-	parsed_data.append(
-		{
-			"logo": str(svg),
-			"slug": slug,
-			"label": display_text,
-			"message": None,
-			"style": None,
-			"color": bg_color,
-			"label_color": None,
-			"logo_color": None,
-			"font": None,
-		},
+from argparse import ArgumentParser
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from shieldsio_plus.util.icon_scanner import DEFAULT_CACHE_PATH, update_manifest
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def script(args: Optional[Sequence[str]] = None) -> None:
+	"""
+	Script to merge the new and changed icons of the icon directory into the manifest.
+
+	Icons are scanned incrementally, so only the files changed since the previous run are
+	parsed. Changed icons update the `icon` metadata of their entries, and icons no entry
+	uses get a new entry, whose label and color should be reviewed.
+
+	Args:
+		args (optional): Command-line arguments. Defaults to None, reading `sys.argv`.
+	"""
+	parser = ArgumentParser(description="Merge new and changed icons into the manifest.")
+
+	parser.add_argument(
+		"--manifest-filename",
+		type=str,
+		default=f"{BASE_DIR}/assets/data/manifest.json",
+		help="Path to the manifest file to be updated.",
+		required=False,
 	)
 
-copy(dumps(parsed_data))
+	parser.add_argument(
+		"--cache-filename",
+		type=str,
+		default=str(DEFAULT_CACHE_PATH),
+		help="Path to the cache of the scanned icons.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--full",
+		action="store_true",
+		help="Ignore the cache and scan every icon again.",
+		required=False,
+	)
+
+	args = parser.parse_args(args)
+
+	merged = update_manifest(args.manifest_filename, BASE_DIR, args.cache_filename, full=args.full)
+
+	logger.info(
+		f"Merged {merged} icon entries into {args.manifest_filename}" if merged else "The manifest is up to date",
+	)
+
+
+if __name__ == "__main__":
+	script()
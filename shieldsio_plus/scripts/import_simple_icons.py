@@ -0,0 +1,62 @@
+from argparse import ArgumentParser
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Optional
+
+from shieldsio_plus.util.simple_icons import import_simple_icons
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def script(args: Optional[Sequence[str]] = None) -> None:
+	"""
+	Script to import the icons of a local simple-icons checkout into the manifest.
+
+	The catalog (`simple-icons.json`) is streamed, every icon is copied to the
+	`simple-icons` directory of the icon directory, and gets a manifest entry with its brand
+	color. Icons whose slug is already in the manifest are skipped.
+
+	Args:
+		args (optional): Command-line arguments. Defaults to None, reading `sys.argv`.
+	"""
+	parser = ArgumentParser(description="Import the simple-icons catalog into the manifest.")
+
+	parser.add_argument(
+		"--catalog",
+		type=str,
+		default="simple-icons/_data/simple-icons.json",
+		help="Path to the simple-icons catalog.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--icons-dir",
+		type=str,
+		default="simple-icons/icons",
+		help="Path to the directory holding the simple-icons SVG files.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--manifest-filename",
+		type=str,
+		default=f"{BASE_DIR}/assets/data/manifest.json",
+		help="Path to the manifest file to be updated.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--limit",
+		type=int,
+		default=None,
+		help="Maximum number of icons to import.",
+		required=False,
+	)
+
+	args = parser.parse_args(args)
+
+	import_simple_icons(args.catalog, args.icons_dir, args.manifest_filename, BASE_DIR, limit=args.limit)
+
+
+if __name__ == "__main__":
+	script()
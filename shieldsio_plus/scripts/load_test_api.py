@@ -0,0 +1,124 @@
+import asyncio
+import os
+from argparse import ArgumentParser
+from collections.abc import Sequence
+from statistics import quantiles
+from time import perf_counter
+from typing import Optional
+
+from loguru import logger
+
+from shieldsio_plus.util.rate_limit import AdaptiveRateLimiter
+from shieldsio_plus.util.upstream import upstream
+from shieldsio_plus.util.upstream_server import StandInServer
+
+
+async def run_load(path: str, requests: int, concurrency: int) -> list[float]:
+	"""
+	Send concurrent requests to the ASGI application, in process.
+
+	Args:
+		path: The request path, including the query string.
+		requests: Total number of requests.
+		concurrency: Number of requests in flight at once.
+
+	Raises:
+		RuntimeError: If a request fails.
+
+	Returns:
+		The latency of every request, in seconds.
+	"""  # noqa: DOC502
+	from django.test import AsyncClient  # noqa: PLC0415
+
+	client = AsyncClient()
+	semaphore = asyncio.Semaphore(concurrency)
+
+	async def request() -> float:
+		async with semaphore:
+			start = perf_counter()
+			response = await client.get(path)
+			latency = perf_counter() - start
+
+		if response.status_code != 200:
+			raise RuntimeError(f"Request failed with status {response.status_code}: {response.content!r}")
+
+		return latency
+
+	return await asyncio.gather(*(request() for _ in range(requests)))
+
+
+def script(args: Optional[Sequence[str]] = None) -> None:
+	"""
+	Script to load test the badge API against a local Shields.io stand-in.
+
+	Requests go through the ASGI application in process, and the upstream fetches to a
+	stand-in server with injected latency, so the throughput only depends on how well
+	concurrent renders overlap. Every level of concurrency is run in turn, and its
+	throughput and latency percentiles are logged.
+
+	Args:
+		args (optional): Command-line arguments. Defaults to None, reading `sys.argv`.
+	"""
+	parser = ArgumentParser(description="Load test the badge API.")
+
+	parser.add_argument(
+		"--requests",
+		type=int,
+		default=200,
+		help="Number of requests sent for every level of concurrency.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--concurrency",
+		type=int,
+		nargs="+",
+		default=[1, 8, 32],
+		help="Levels of concurrency to test.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--latency",
+		type=float,
+		default=50.0,
+		help="Latency of the upstream stand-in, in milliseconds.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--slug",
+		type=str,
+		default="azure",
+		help="Slug of the rendered badge.",
+		required=False,
+	)
+
+	args = parser.parse_args(args)
+
+	os.environ.setdefault("DJANGO_SETTINGS_MODULE", "shieldsio_plus.settings")
+
+	import django  # noqa: PLC0415
+
+	django.setup()
+
+	# The stand-in is local, so the upstream rate limit would only measure itself
+	upstream.limiter = AdaptiveRateLimiter(max_rate=10_000, burst=10_000, max_concurrency=max(args.concurrency))
+
+	with StandInServer(latency=args.latency / 1000) as server:
+		upstream.base_url = server.url
+
+		for concurrency in args.concurrency:
+			start = perf_counter()
+			latencies = asyncio.run(run_load(f"/api/badge?slug={args.slug}", args.requests, concurrency))
+			elapsed = perf_counter() - start
+			percentiles = quantiles(latencies, n=100)
+
+			logger.info(
+				f"Concurrency {concurrency}: {args.requests / elapsed:.1f} req/s, "
+				f"p50 {percentiles[49] * 1000:.1f} ms, p95 {percentiles[94] * 1000:.1f} ms",
+			)
+
+
+if __name__ == "__main__":
+	script()
@@ -1,81 +1,271 @@
+from argparse import ArgumentParser
+from collections.abc import Iterable, Iterator, Sequence
 from json import load as json_load
-from operator import itemgetter
 from pathlib import Path
+from typing import Any, Optional
 
+from shieldsio_plus.common.enums.font_embedding import FontEmbedding
 from shieldsio_plus.common.enums.shields_io_badge_styles import ShieldsIOBadgeStyle
+from shieldsio_plus.common.enums.upstream_mode import UpstreamMode
 from shieldsio_plus.common.enums.web_safe_fonts import WebSafeFont
+from shieldsio_plus.common.enums.woff2_fonts import KnownWOFF2Fonts
 from shieldsio_plus.common.types.shields_io_badge import ShieldsIOBadge
-from shieldsio_plus.common.types.svg import SVG
 from shieldsio_plus.scripts.update_readme import script as update_readme
 from shieldsio_plus.util.download_shieldsio_badges import download_shields_io_badges
-from shieldsio_plus.util.manifest import load_manifest_color, validate_manifest
+from shieldsio_plus.util.font_stylesheet import write_font_stylesheet
+from shieldsio_plus.util.journal import BuildJournal
+from shieldsio_plus.util.manifest import load_badge_params, validate_manifest
 from shieldsio_plus.util.metadata import should_run, write_metadata
+from shieldsio_plus.util.sharding import Shard, find_fragments, merge_fragments
+from shieldsio_plus.util.timing import StageTimer
+from shieldsio_plus.util.upstream import upstream
+from shieldsio_plus.util.variants import VariantDeriver
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
-def script() -> None:
+def iter_badges(
+	manifest: dict[str, Any],
+	root: str,
+	shard: Optional[Shard] = None,
+	*,
+	web_fonts: Optional[FontEmbedding] = None,
+) -> Iterator[ShieldsIOBadge]:
+	"""
+	Lazily build the badges of the manifest.
+
+	Every entry is built in every style, and the `twitter` entry in every web-safe font, and
+	in every known web font if requested. Logos are only read when their entry is reached,
+	and shared by the badges of the entry.
+
+	Args:
+		manifest: The loaded manifest.
+		root: Directory holding the logo files.
+		shard (optional): Only build the entries of this shard. Defaults to None, building
+			every entry.
+		web_fonts (optional): How the fonts of the web font badges are delivered. Defaults to
+			None, building no web font badges.
+
+	Yields:
+		The badges to download.
+	"""
+	entries = [entry for entry in manifest["data"] if shard is None or shard.contains(entry["slug"])]
+
+	for entry in entries:
+		params = load_badge_params(entry, root)
+
+		for style in ShieldsIOBadgeStyle.members:
+			yield ShieldsIOBadge(**params, style=ShieldsIOBadgeStyle[style.name])
+
+	# The font badges share the slug of their entry, so they belong to the same shard
+	font_logo = next((dic for dic in entries if dic["slug"] == "twitter"), None)
+
+	if font_logo is None:
+		return
+
+	params = load_badge_params(font_logo, root) | {"style": ShieldsIOBadgeStyle.FLAT}
+
+	for font in WebSafeFont:
+		yield ShieldsIOBadge(**params | {"font": font})
+
+	if web_fonts is None:
+		return
+
+	for web_font in KnownWOFF2Fonts:
+		yield ShieldsIOBadge(**params | {"web_font": web_font, "font_embedding": web_fonts})
+
+
+def collect_shared_fonts(
+	badges: Iterable[ShieldsIOBadge],
+	fonts: dict[KnownWOFF2Fonts, None],
+) -> Iterator[ShieldsIOBadge]:
+	"""
+	Collect the web fonts the page of the badges has to define, while the badges are built.
+
+	Args:
+		badges: The badges.
+		fonts: The collected fonts, in order of first use, updated in place.
+
+	Yields:
+		The badges, unchanged.
+	"""
+	for badge in badges:
+		if badge.web_font and badge.font_embedding == FontEmbedding.SHARED:
+			fonts[badge.web_font] = None
+
+		yield badge
+
+
+def finalize(metadata_path: str, timer: StageTimer) -> None:
+	"""
+	Record the build metadata and update the README tables from the badges index.
+
+	Args:
+		metadata_path: Path to the build metadata file.
+		timer: Timer of the build.
+	"""
+	with timer.span("metadata"):
+		write_metadata(metadata_path)
+
+	with timer.span("readme"):
+		update_readme([])
+
+
+def script(args: Optional[Sequence[str]] = None) -> None:
+	"""
+	Script to validate the manifest, download every badge and update the README.
+
+	Args:
+		args (optional): Command-line arguments. Defaults to None, reading `sys.argv`.
+	"""
+	parser = ArgumentParser(description="Build every badge of the manifest.")
+
+	parser.add_argument(
+		"--derive-variants",
+		action="store_true",
+		help="Fetch one render per badge and derive its color variants locally.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--verify-variants",
+		type=int,
+		default=0,
+		metavar="N",
+		help="Compare a random sample of N derived badges against Shields.io. Implies --derive-variants. Only "
+		"meaningful against the real Shields.io: the local stand-in colors badges with the same rules as the "
+		"variant derivation, so it never reports a mismatch.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--upstream-mode",
+		type=UpstreamMode,
+		choices=UpstreamMode.members,
+		default=None,
+		help="Record upstream responses, replay them offline, or pass requests through. Defaults to the "
+		"SHIELDSIO_PLUS_UPSTREAM_MODE environment variable.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--web-fonts",
+		type=FontEmbedding,
+		choices=FontEmbedding.members,
+		default=None,
+		help="Also build the font badges in every known web font, embedding the fonts in every badge, or "
+		"referencing them from one shared `fonts.css` stylesheet written next to the badges.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--fresh",
+		action="store_true",
+		help="Discard the journal of an interrupted build and download every badge again.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--shard",
+		type=Shard.parse,
+		default=None,
+		metavar="i/N",
+		help="Only build the entries of shard i out of N (0 <= i < N), and write a badges fragment instead of "
+		"the badges JSON file and the README.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--merge",
+		action="store_true",
+		help="Merge the badges fragments of every shard into the badges JSON file, and update the README.",
+		required=False,
+	)
+
+	args = parser.parse_args(args)
+
+	if args.shard and args.merge:
+		parser.error("--shard and --merge are mutually exclusive")
+
+	if args.upstream_mode:
+		upstream.mode = args.upstream_mode
+
 	manifest_path = f"{BASE_DIR}/assets/data/manifest.json"
+	badges_path = f"{BASE_DIR}/assets/shields/"
 	metadata_path = f"{BASE_DIR}/assets/data/metadata"
+	badges_json_path = f"{BASE_DIR}/assets/data/badges.json"
+	fragments_dir = f"{BASE_DIR}/assets/data/shards"
+	journal_path = (
+		f"{BASE_DIR}/assets/data/build.{args.shard.index}-of-{args.shard.count}.journal"
+		if args.shard
+		else f"{BASE_DIR}/assets/data/build.journal"
+	)
+
+	if args.fresh:
+		Path(journal_path).unlink(missing_ok=True)
+
+	timer = StageTimer()
 
-	validate_manifest(manifest_path)
+	if args.merge:
+		fragment_paths = find_fragments(fragments_dir)
 
-	if not should_run(manifest_path, metadata_path):
+		with timer.span("merge"):
+			merge_fragments(fragment_paths, badges_json_path)
+
+		finalize(metadata_path, timer)
+
+		# The fragments are merged, the next sharded build starts from scratch
+		for path in fragment_paths:
+			path.unlink()
+
+		timer.log_summary()
+		return
+
+	with timer.span("validate"):
+		validate_manifest(manifest_path)
+
+	if not should_run(manifest_path, metadata_path, journal_path):
 		return
 
-	with Path(manifest_path).open("r", encoding="utf-8") as f:
+	with timer.span("manifest"), Path(manifest_path).open("r", encoding="utf-8") as f:
 		manifest = json_load(f)
 
-	parsed_data = []
-
-	for logo in manifest["data"]:
-		path = str(BASE_DIR) + "/" + manifest["root"] + logo["logo"]
-
-		params = {
-			"slug": logo["slug"],
-			"label": logo["label"],
-			"logo": SVG.from_file(path),
-			"message": logo["message"],
-			"color": load_manifest_color(logo["color"]),
-			"label_color": load_manifest_color(logo["label_color"]) if logo.get("label_color", None) else None,
-			"logo_color": load_manifest_color(logo["logo_color"]) if logo.get("logo_color", None) else None,
-			"font": WebSafeFont.from_family_name(logo["logo_font"])
-			if logo.get("logo_font", None)
-			else WebSafeFont.DEFAULT,
-		}
-
-		parsed_data.extend([
-			ShieldsIOBadge(
-				**dict(filter(itemgetter(1), params.items())),
-				style=ShieldsIOBadgeStyle[style.name],
-			)
-			for style in ShieldsIOBadgeStyle.members
-		])
-
-	font_logo = next(dic for dic in manifest["data"] if dic["slug"] == "twitter")
+	shared_fonts: dict[KnownWOFF2Fonts, None] = {}
+	badges = collect_shared_fonts(
+		iter_badges(manifest, str(BASE_DIR) + "/" + manifest["root"], args.shard, web_fonts=args.web_fonts),
+		shared_fonts,
+	)
+	deriver = VariantDeriver(sample_size=args.verify_variants) if args.derive_variants or args.verify_variants else None
 
-	for font in WebSafeFont:
-		path = str(BASE_DIR) + "/" + manifest["root"] + font_logo["logo"]
-
-		params = {
-			"slug": font_logo["slug"],
-			"label": font_logo["label"],
-			"logo": SVG.from_file(path),
-			"message": font_logo["message"],
-			"style": ShieldsIOBadgeStyle.FLAT,
-			"color": load_manifest_color(font_logo["color"]),
-			"label_color": load_manifest_color(font_logo["label_color"])
-			if font_logo.get("label_color", None)
-			else None,
-			"logo_color": load_manifest_color(font_logo["logo_color"]) if font_logo.get("logo_color", None) else None,
-			"font": font,
-		}
-
-		parsed_data.append(ShieldsIOBadge(**dict(filter(itemgetter(1), params.items()))))
-
-	download_shields_io_badges(parsed_data, f"{BASE_DIR}/assets/shields/", f"{BASE_DIR}/assets/data/badges.json")
-	write_metadata(metadata_path)
-	update_readme()
+	# Completed badges are journaled, so that an interrupted build resumes where it stopped
+	with timer.span("download"), BuildJournal(journal_path) as journal:
+		download_shields_io_badges(
+			badges,
+			badges_path,
+			args.shard.fragment_path(fragments_dir) if args.shard else badges_json_path,
+			deriver=deriver,
+			journal=journal,
+			fragment=args.shard is not None,
+			timer=timer,
+		)
+
+	# The badges of a shared web font only reference it, their page defines it once for all of them
+	if shared_fonts:
+		with timer.span("stylesheet"):
+			write_font_stylesheet(shared_fonts, f"{badges_path}fonts.css")
+
+	if deriver and args.verify_variants:
+		with timer.span("verify"):
+			deriver.verify()
+
+	# Sharded builds are finalized by the merge, once every shard is done
+	if not args.shard:
+		finalize(metadata_path, timer)
+
+	# The build is finalized, the next one starts from scratch
+	journal.remove()
+
+	timer.log_summary()
 
 
 if __name__ == "__main__":
@@ -1,10 +1,12 @@
 from argparse import ArgumentParser
 from functools import partial
+from io import StringIO
 from pathlib import Path
 
 import pandas as pd
 
 from shieldsio_plus.common.types.hex_code import HexColor
+from shieldsio_plus.util.upstream import upstream
 
 
 def script() -> None:
@@ -100,7 +102,9 @@ def script() -> None:
 		raise ValueError(f"Invalid output format: {args.output_format}")
 
 	# Scrape tables from MDN
-	dfs = pd.read_html(args.url)
+	response = upstream.get(args.url)
+	response.raise_for_status()
+	dfs = pd.read_html(StringIO(response.text))
 
 	# Extract basic and extended color tables
 	basic_colors, extended_colors = dfs[0], dfs[1]
@@ -1,149 +1,159 @@
 import json
 from argparse import ArgumentParser
-from collections.abc import Sequence
+from collections.abc import Iterable, Iterator, Sequence
 from pathlib import Path
 from typing import Optional
 
 from loguru import logger
 
 from shieldsio_plus.common.enums.web_safe_fonts import WebSafeFont
+from shieldsio_plus.util.download_shieldsio_badges import badges_index_path, read_badges_index, write_badges_index
+from shieldsio_plus.util.files import AtomicWriter
 
+LOGOS_HEADER = "#### Available Slugs"
+FONTS_HEADER = "#### Available Fonts"
 
-def update_available_logos(markdown_filename: str, badges_json_filename: str) -> None:
-	# Read badge data from JSON file
-	with Path(badges_json_filename).open(encoding="utf-8") as f:
-		data = json.load(f)
 
-	# Extract unique slugs
-	seen: set[str] = set()
-	unique_slugs: list[str] = []
+def available_logos_table(slugs: Iterable[str]) -> str:
+	"""
+	Build the README table of the available slugs.
 
-	for item in data:
-		slug = item.get("slug")
+	Args:
+		slugs: The distinct slugs of the badges.
 
-		if slug and slug not in seen:
-			seen.add(slug)
-			unique_slugs.append(slug)
+	Returns:
+		The markdown table, with the slugs sorted alphabetically.
+	"""
+	lines = ["| Slug | Sample |", "| --- | --- |"]
+	lines.extend(f"| {slug} | ![{slug}](./assets/shields/flat/{slug}.svg) |" for slug in sorted(slugs))
 
-	# Sort slugs alphabetically
-	unique_slugs.sort()
+	return "\n".join(lines)
 
-	# Generate new table content
-	new_table_lines: list[str] = []
-	new_table_lines.append("| Slug | Sample |")
-	new_table_lines.append("| --- | --- |")
 
-	new_table_lines.extend([f"| {slug} | ![{slug}](./assets/shields/flat/{slug}.svg) |" for slug in unique_slugs])
+def available_fonts_table(fonts: Iterable[WebSafeFont]) -> str:
+	"""
+	Build the README table of the available fonts.
 
-	new_table = "\n".join(new_table_lines)
+	Args:
+		fonts: The web-safe fonts of the badges.
 
-	# Read current README.md content
-	with Path(markdown_filename).open(encoding="utf-8") as f:
-		lines = f.readlines()
+	Returns:
+		The markdown table, with the fonts sorted by family name.
+	"""
+	lines = ["| Family Name | Type | Sample |", "| --- | --- | --- |"]
 
-	# Process file and replace table
-	new_lines: list[str] = []
-	i = 0
+	for font in sorted(fonts, key=lambda x: x.family_name):
+		if font != WebSafeFont.DEFAULT:
+			line = f"| {font.family_name.title()} | {font.family.value.title()} | ![twitter](./assets/shields/flat/{font.name.lower()}/twitter.svg) |"  # noqa: E501
+			lines.append(line)
 
-	while i < len(lines):
-		line = lines[i]
-		new_lines.append(line.rstrip("\n"))
+	return "\n".join(lines)
 
-		# Found the section header for available slugs
-		if line.strip() == "#### Available Slugs":
-			i += 1
 
-			# Skip any blank line after the header
-			if i < len(lines) and not lines[i].strip():
-				new_lines.append(lines[i].rstrip("\n"))
-				i += 1
+def patch_tables(lines: Iterable[str], tables: dict[str, str]) -> Iterator[str]:
+	"""
+	Replace the tables following section headers, in a single pass over the lines.
 
-			# Skip existing table rows
-			while i < len(lines) and lines[i].lstrip().startswith("|"):
-				i += 1
+	The table of a section is the run of lines starting with `|` right after its header,
+	or after the blank line following its header.
 
-			# Insert new table
-			new_lines.append(new_table)
-			continue
+	Args:
+		lines: The lines of the markdown file.
+		tables: The new table of every section, by header line.
 
-		i += 1
+	Yields:
+		The lines of the patched file, each ending with a newline.
+	"""
+	table: Optional[str] = None
+	after_header = False
 
-	# Join content and ensure there's a trailing newline
-	new_content = "\n".join(new_lines) + "\n"
+	for raw_line in lines:
+		line = raw_line.rstrip("\n")
 
-	# Write updated content back to the file
-	with Path(markdown_filename).open("w", encoding="utf-8") as f:
-		f.write(new_content)
+		if table is not None:
+			# Keep the blank line right after the header
+			if after_header and not line.strip():
+				after_header = False
+				yield line + "\n"
+				continue
 
-	# Print status message
-	logger.info(f"Updated {markdown_filename} with {len(unique_slugs)} unique slugs.")
+			after_header = False
 
+			# Skip the existing table rows
+			if line.lstrip().startswith("|"):
+				continue
 
-def update_available_fonts(markdown_filename: str) -> None:
-	# Read badge data from JSON file
-	all_fonts = sorted(WebSafeFont.members, key=lambda x: x.family_name)
+			yield table + "\n"
+			table = None
 
-	# Generate new table content
-	new_table_lines: list[str] = []
-	new_table_lines.append("| Family Name | Type | Sample |")
-	new_table_lines.append("| --- | --- | --- |")
+		yield line + "\n"
 
-	for font in all_fonts:
-		if font != WebSafeFont.DEFAULT:
-			line = f"| {font.family_name.title()} | {font.family.value.title()} | ![twitter](./assets/shields/flat/{font.name.lower()}/twitter.svg) |"  # noqa: E501
-			new_table_lines.append(line)
+		if line.strip() in tables:
+			table = tables[line.strip()]
+			after_header = True
 
-	new_table = "\n".join(new_table_lines)
+	if table is not None:
+		yield table + "\n"
+
+
+def update_readme(markdown_filename: str, tables: dict[str, str]) -> bool:
+	"""
+	Patch the generated tables of a markdown file in one read and one atomic write.
 
-	# Read current README.md content
-	with Path(markdown_filename).open(encoding="utf-8") as f:
-		lines = f.readlines()
+	Args:
+		markdown_filename: Path to the markdown file.
+		tables: The new table of every section, by header line.
 
-	# Process file and replace table
-	new_lines: list[str] = []
-	i = 0
+	Returns:
+		True if the file was written, False if it was already up to date.
+	"""
+	with Path(markdown_filename).open(encoding="utf-8") as f, AtomicWriter(markdown_filename) as writer:
+		for line in patch_tables(f, tables):
+			writer.write(line)
 
-	while i < len(lines):
-		line = lines[i]
-		new_lines.append(line.rstrip("\n"))
+	return writer.written
 
-		# Found the section header for available slugs
-		if line.strip() == "#### Available Fonts":
-			i += 1
 
-			# Skip any blank line after the header
-			if i < len(lines) and not lines[i].strip():
-				new_lines.append(lines[i].rstrip("\n"))
-				i += 1
+def load_index(index_filename: str, badges_json_filename: str) -> dict[str, list[str]]:
+	"""
+	Load the index of the built badges, rebuilding it from the badges JSON file if it is missing.
 
-			# Skip existing table rows
-			while i < len(lines) and lines[i].lstrip().startswith("|"):
-				i += 1
+	Args:
+		index_filename: Path to the index file.
+		badges_json_filename: Path to the badges JSON file.
 
-			# Insert new table
-			new_lines.append(new_table)
-			continue
+	Returns:
+		The sorted distinct slugs (`slugs`) and fonts (`fonts`) of the badges.
+	"""
+	try:
+		return read_badges_index(index_filename)
 
-		i += 1
+	except FileNotFoundError:
+		logger.warning(f"Missing {index_filename}, rebuilding it from {badges_json_filename}")
 
-	# Join content and ensure there's a trailing newline
-	new_content = "\n".join(new_lines) + "\n"
+	with Path(badges_json_filename).open(encoding="utf-8") as f:
+		data = json.load(f)
 
-	# Write updated content back to the file
-	with Path(markdown_filename).open("w", encoding="utf-8") as f:
-		f.write(new_content)
+	write_badges_index(
+		(item["slug"] for item in data if item.get("slug")),
+		(item["font"] for item in data if item.get("font")),
+		index_filename,
+	)
 
-	# Print status message
-	logger.info(f"Updated {markdown_filename} with {len(all_fonts)} unique fonts.")
+	return read_badges_index(index_filename)
 
 
 def script(args: Optional[Sequence[str]] = None) -> None:
 	"""
-	Script to update a markdown file with a table of badge slugs.
+	Script to update a markdown file with the tables of badge slugs and fonts.
 
-	This script reads badge data from a JSON file, extracts unique slugs,
-	and updates a README.md file with a formatted table showing each slug
-	and its corresponding SVG badge image.
+	This script reads the slugs and fonts of the built badges from the badges index, and
+	updates a README.md file with formatted tables showing each slug and font with a
+	sample badge. Every table is patched in a single pass, and the file is left untouched
+	if nothing changed.
+
+	Args:
+		args (optional): Command-line arguments. Defaults to None, reading `sys.argv`.
 	"""
 	# Set up command-line argument parser
 	parser = ArgumentParser(description="Update README.md with badge slugs from JSON data.")
@@ -160,20 +170,38 @@ def script(args: Optional[Sequence[str]] = None) -> None:
 		"--badges-json-filename",
 		type=str,
 		default="assets/data/badges.json",
-		help="Path to the JSON filename to be read.",
+		help="Path to the badges JSON filename, only read if its index is missing.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--index-filename",
+		type=str,
+		default=None,
+		help="Path to the badges index filename to be read. Defaults to the index of the badges JSON file.",
 		required=False,
 	)
 
 	# Parse arguments
 	args = parser.parse_args(args)
 
-	# Print help if no arguments provided
-	if not args:
-		parser.print_help()
+	index_filename = args.index_filename or str(badges_index_path(args.badges_json_filename))
+	index = load_index(index_filename, args.badges_json_filename)
+	fonts = [WebSafeFont[font.upper()] for font in index["fonts"] if font.upper() in WebSafeFont.names]
 
-	# Run the scripts
-	update_available_logos(args.markdown_filename, args.badges_json_filename)
-	update_available_fonts(args.markdown_filename)
+	written = update_readme(
+		args.markdown_filename,
+		{
+			LOGOS_HEADER: available_logos_table(index["slugs"]),
+			FONTS_HEADER: available_fonts_table(fonts),
+		},
+	)
+
+	logger.info(
+		f"Updated {args.markdown_filename} with {len(index['slugs'])} unique slugs and {len(fonts)} unique fonts."
+		if written
+		else f"Skipped unchanged {args.markdown_filename}",
+	)
 
 
 if __name__ == "__main__":
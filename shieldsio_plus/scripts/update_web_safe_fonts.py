@@ -2,9 +2,10 @@ from argparse import ArgumentParser
 from json import dump
 from pathlib import Path
 
-import requests
 from bs4 import BeautifulSoup
 
+from shieldsio_plus.util.upstream import upstream
+
 
 def script() -> None:
 	"""
@@ -73,7 +74,9 @@ def script() -> None:
 	aliases: dict[str, str] = {"monospaced": "monospace", "script": "cursive"}
 
 	# Fetch and parse HTML
-	html = requests.get(target_url, timeout=60).text
+	response = upstream.get(target_url)
+	response.raise_for_status()
+	html = response.text
 	soup = BeautifulSoup(html, "html.parser")
 
 	# Initialize dictionary to store font data by family
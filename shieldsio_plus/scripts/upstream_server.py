@@ -0,0 +1,84 @@
+from argparse import ArgumentParser
+from collections.abc import Sequence
+from contextlib import suppress
+from typing import Optional
+
+from shieldsio_plus.util.upstream import DEFAULT_CASSETTE_DIR, CassetteStore
+from shieldsio_plus.util.upstream_server import StandInServer
+
+
+def script(args: Optional[Sequence[str]] = None) -> None:
+	"""
+	Script to run a local stand-in for img.shields.io.
+
+	Recorded responses are replayed from the cassette directory, and any other badge is
+	synthesized. Point builds at the server through `SHIELDSIO_PLUS_UPSTREAM_URL`.
+	"""
+	# Set up command-line argument parser
+	parser = ArgumentParser(description="Serve recorded and synthesized Shields.io badges locally.")
+
+	parser.add_argument(
+		"--host",
+		type=str,
+		default="127.0.0.1",
+		help="Host to bind to.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--port",
+		type=int,
+		default=8080,
+		help="Port to listen on.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--cassette-dir",
+		type=str,
+		default=str(DEFAULT_CASSETTE_DIR),
+		help="Directory of the recorded responses to replay.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--synthesize-only",
+		action="store_true",
+		default=False,
+		help="Ignore recorded responses and synthesize every badge.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--latency",
+		type=float,
+		default=0.0,
+		help="Latency added to every response, in milliseconds.",
+		required=False,
+	)
+
+	parser.add_argument(
+		"--jitter",
+		type=float,
+		default=0.0,
+		help="Maximum random latency added on top of --latency, in milliseconds.",
+		required=False,
+	)
+
+	# Parse arguments
+	args = parser.parse_args(args)
+
+	server = StandInServer(
+		store=None if args.synthesize_only else CassetteStore(args.cassette_dir),
+		latency=args.latency / 1000,
+		jitter=args.jitter / 1000,
+		host=args.host,
+		port=args.port,
+	)
+
+	with suppress(KeyboardInterrupt):
+		server.serve_forever()
+
+
+if __name__ == "__main__":
+	script()
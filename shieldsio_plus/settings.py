@@ -59,6 +59,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+	"shieldsio_plus.middleware.MetricsMiddleware",
 	"django.middleware.security.SecurityMiddleware",
 	"django.contrib.sessions.middleware.SessionMiddleware",
 	"django.middleware.common.CommonMiddleware",
@@ -141,8 +142,42 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Compiled badge catalog, read instead of the manifest when it is current (see `scripts/compile_catalog.py`)
+BADGE_CATALOG = Path(environ.get("SHIELDSIO_PLUS_BADGE_CATALOG", str(BASE_DIR / "assets" / "data" / "catalog.sqlite3")))
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Rendered badges are cached in process (bounded in bytes), over the shared `badges` cache
+RENDER_CACHE = {
+	"ALIAS": "badges",
+	"MAX_BYTES": int(environ.get("SHIELDSIO_PLUS_RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+	"TTL": int(environ.get("SHIELDSIO_PLUS_RENDER_CACHE_TTL", str(24 * 60 * 60))),
+}
+
+CACHES = {
+	"default": {
+		"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+	},
+	"badges": {
+		"BACKEND": environ.get(
+			"SHIELDSIO_PLUS_CACHE_BACKEND",
+			"django.core.cache.backends.filebased.FileBasedCache",
+		),
+		"LOCATION": environ.get("SHIELDSIO_PLUS_CACHE_LOCATION", str(BASE_DIR / ".cache" / "badges")),
+		"TIMEOUT": RENDER_CACHE["TTL"],
+		"KEY_PREFIX": "shieldsio_plus",
+	},
+}
+
 REST_FRAMEWORK = {
 	"DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 	"DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
 	"PAGE_SIZE": 100,
 }
+
+SPECTACULAR_SETTINGS = {
+	"TITLE": "Shields.io Plus API",
+	"DESCRIPTION": "Render Shields.io badges with the logos, styles and fonts of Shields.io Plus.",
+	"SERVE_INCLUDE_SCHEMA": False,
+}
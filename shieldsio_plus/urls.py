@@ -17,8 +17,12 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
+
+from shieldsio_plus import views
 
 urlpatterns = [
 	path("admin/", admin.site.urls),
+	path("metrics", views.metrics, name="metrics"),
+	path("api/", include("shieldsio_plus.api.urls")),
 ]
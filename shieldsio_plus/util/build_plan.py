@@ -0,0 +1,62 @@
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import batched
+
+from shieldsio_plus.common.types.shields_io_badge import ShieldsIOBadge
+from shieldsio_plus.common.types.shields_io_badge_spec import ShieldsIOBadgeSpec
+
+# Number of consecutive badges grouped together when planning the fetches
+PLAN_WINDOW = 256
+
+
+@dataclass
+class FetchGroup:
+	"""
+	A single upstream request, and the badges rendered locally from its response.
+
+	Badges in a group only differ by their local post-processing steps (e.g. the TRUE_FLAT
+	style, derived from FLAT_SQUARE, a web-safe font, or their colors when variants are
+	derived locally), so the group is fetched once and every badge is post-processed from
+	the shared response.
+
+	Attributes:
+		spec: The upstream request of the group, i.e. the spec of its first badge.
+		badges: The badges rendered from the response.
+	"""
+
+	spec: ShieldsIOBadgeSpec
+	badges: list[ShieldsIOBadge] = field(default_factory=list)
+
+	@property
+	def key(self) -> str:
+		"""The key of the badge owning the upstream request."""
+		return self.badges[0].key
+
+
+def plan_fetches(
+	badges: Iterable[ShieldsIOBadge],
+	window: int = PLAN_WINDOW,
+	key: Callable[[ShieldsIOBadgeSpec], Hashable] = lambda spec: spec,
+) -> Iterator[FetchGroup]:
+	"""
+	Group badges by the upstream request they need.
+
+	Badges are pulled lazily, and grouped within windows of `window` consecutive badges, so
+	the plan is streamed with bounded memory. Badges built from the same manifest entry are
+	consecutive, so the styles and fonts of an entry always land in the same window.
+
+	Args:
+		badges: The badges to plan.
+		window (optional): Number of consecutive badges grouped together. Defaults to `PLAN_WINDOW`.
+		key (optional): Function mapping a badge spec to the request it is rendered from. Defaults to the spec itself.
+
+	Yields:
+		The fetch groups, in order of their first badge.
+	"""
+	for chunk in batched(badges, window, strict=False):
+		groups: dict[Hashable, FetchGroup] = {}
+
+		for badge in chunk:
+			groups.setdefault(key(badge.spec), FetchGroup(badge.spec)).badges.append(badge)
+
+		yield from groups.values()
@@ -0,0 +1,299 @@
+import json
+import os
+import sqlite3
+from collections.abc import Callable, Iterator
+from hashlib import sha256
+from operator import itemgetter
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Optional, Self
+
+from loguru import logger
+
+from shieldsio_plus.common.enums.web_safe_fonts import WebSafeFont
+from shieldsio_plus.common.types.hex_code import HexColor
+from shieldsio_plus.common.types.svg import SVG
+from shieldsio_plus.util.manifest import load_manifest_color
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent.parent.parent / "assets" / "data" / "catalog.sqlite3"
+
+# Version of the catalog schema, stored as the `user_version` of the database
+CATALOG_VERSION = 2
+
+# Bytes of the catalog mapped in memory by readers, so reads are served from the page cache
+MMAP_SIZE = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE logos (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, svg TEXT NOT NULL);
+CREATE TABLE entries (
+	slug TEXT PRIMARY KEY,
+	label TEXT NOT NULL,
+	message TEXT,
+	style TEXT,
+	color TEXT NOT NULL,
+	label_color TEXT,
+	logo_color TEXT,
+	font TEXT NOT NULL,
+	logo_id INTEGER NOT NULL REFERENCES logos (id)
+) WITHOUT ROWID;
+"""
+
+
+class CatalogError(ValueError):
+	"""Failed to open the compiled catalog."""
+
+
+def _resolve_entry(entry: dict[str, Any], logo_id: int) -> tuple[Any, ...]:
+	def _hex(color: Optional[dict[str, Any]]) -> Optional[str]:
+		return load_manifest_color(color).hex if color else None
+
+	font = WebSafeFont.from_family_name(entry["logo_font"]) if entry.get("logo_font") else WebSafeFont.DEFAULT
+
+	return (
+		entry["slug"],
+		entry["label"],
+		entry.get("message"),
+		entry.get("style"),
+		_hex(entry["color"]),
+		_hex(entry.get("label_color")),
+		_hex(entry.get("logo_color")),
+		font.name,
+		logo_id,
+	)
+
+
+def _write_tables(
+	connection: sqlite3.Connection,
+	manifest: dict[str, Any],
+	root: Path,
+	update_digest: Callable[[bytes], None],
+) -> None:
+	logo_ids: dict[str, int] = {}
+
+	def _entries() -> Iterator[tuple[Any, ...]]:
+		for entry in manifest["data"]:
+			if entry["logo"] not in logo_ids:
+				svg = (root / entry["logo"]).read_text(encoding="utf-8")
+				update_digest(f"\0{entry['logo']}\0{svg}".encode())
+				logo_ids[entry["logo"]] = connection.execute(
+					"INSERT INTO logos (path, svg) VALUES (?, ?)",
+					(entry["logo"], svg),
+				).lastrowid
+
+			yield _resolve_entry(entry, logo_ids[entry["logo"]])
+
+	connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", _entries())
+
+
+def _read_meta(path: Path) -> dict[str, str]:
+	try:
+		with BadgeCatalog(path) as catalog:
+			return catalog.meta
+
+	except (FileNotFoundError, CatalogError):
+		return {}
+
+
+def compile_catalog(
+	manifest_path: str | Path,
+	base_dir: str | Path,
+	catalog_path: str | Path = DEFAULT_CATALOG_PATH,
+) -> bool:
+	"""
+	Compile a manifest and its logos into a catalog.
+
+	Entries are stored resolved: colors as hex codes, fonts as `WebSafeFont` names, and
+	logos as SVG text shared by the entries using them. The catalog is compiled to a
+	temporary file next to the target, and only replaces it if its sources (the manifest
+	and the logos) or the manifest modification time changed, so readers keep a
+	consistent file at any time, and `BadgeCatalog.is_current` holds after a compile.
+
+	Args:
+		manifest_path: Path to the manifest file.
+		base_dir: Directory the icon directory of the manifest (`root`) is relative to.
+		catalog_path (optional): Path to the catalog. Defaults to `DEFAULT_CATALOG_PATH`.
+
+	Raises:
+		ValidationError: If a color of the manifest is invalid.
+
+	Returns:
+		True if the catalog was written, False if it was already up to date.
+	"""  # noqa: DOC502
+	manifest_path, catalog_path = Path(manifest_path), Path(catalog_path)
+	manifest_bytes = manifest_path.read_bytes()
+	manifest = json.loads(manifest_bytes)
+	stat = manifest_path.stat()
+	digest = sha256(f"{CATALOG_VERSION}\0".encode() + manifest_bytes)
+
+	catalog_path.parent.mkdir(parents=True, exist_ok=True)
+	tmp_path = catalog_path.with_name(f".{catalog_path.name}.{os.getpid()}.tmp")
+	tmp_path.unlink(missing_ok=True)
+
+	try:
+		connection = sqlite3.connect(tmp_path)
+
+		try:
+			# The temporary file is discarded on failure, so it needs no journal
+			connection.executescript(
+				f"PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF; PRAGMA user_version = {CATALOG_VERSION};"
+				+ _SCHEMA,
+			)
+
+			with connection:
+				_write_tables(connection, manifest, Path(base_dir) / manifest["root"], digest.update)
+				meta = {
+					"root": manifest["root"],
+					"source_digest": digest.hexdigest(),
+					"manifest_mtime_ns": str(stat.st_mtime_ns),
+					"manifest_size": str(stat.st_size),
+				}
+				connection.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+
+		finally:
+			connection.close()
+
+		if _read_meta(catalog_path) == meta:
+			logger.debug(f"Catalog {catalog_path} is up to date")
+			return False
+
+		tmp_path.replace(catalog_path)
+
+	finally:
+		tmp_path.unlink(missing_ok=True)
+
+	logger.info(f"Compiled {len(manifest['data'])} entries into {catalog_path}")
+
+	return True
+
+
+class BadgeCatalog:
+	"""
+	Read-only view of a compiled catalog, reading entries on demand.
+
+	Opening a catalog only checks its version: nothing is parsed, and every lookup is a
+	single indexed read of the memory-mapped database. The connection is shared by every
+	thread, which `sqlite3` serializes.
+
+	Attributes:
+		path: Path to the catalog.
+		meta: The metadata of the catalog, e.g. its manifest `root` and `source_digest`.
+	"""
+
+	def __init__(self, path: str | Path = DEFAULT_CATALOG_PATH, mmap_size: int = MMAP_SIZE) -> None:  # noqa: D107
+		self.path = Path(path)
+
+		if not self.path.is_file():
+			raise FileNotFoundError(f"Missing catalog: {self.path}")
+
+		# The catalog is replaced, never modified in place, so it is opened as immutable
+		self.__connection = sqlite3.connect(
+			f"{self.path.resolve().as_uri()}?mode=ro&immutable=1",
+			uri=True,
+			check_same_thread=False,
+		)
+
+		try:
+			self.__connection.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+			version = self.__connection.execute("PRAGMA user_version").fetchone()[0]
+
+			if version != CATALOG_VERSION:
+				raise CatalogError(f"Catalog {self.path} has version {version}, expected {CATALOG_VERSION}")
+
+			self.meta = dict(self.__connection.execute("SELECT key, value FROM meta"))
+
+		except sqlite3.DatabaseError as e:
+			self.__connection.close()
+			raise CatalogError(f"Invalid catalog {self.path}: {e}") from e
+
+		except CatalogError:
+			self.__connection.close()
+			raise
+
+	def __enter__(self) -> Self:  # noqa: D105
+		return self
+
+	def __exit__(  # noqa: D105
+		self,
+		exc_type: Optional[type[BaseException]],
+		exc_value: Optional[BaseException],
+		traceback: Optional[TracebackType],
+	) -> None:
+		self.close()
+
+	def __contains__(self, slug: object) -> bool:  # noqa: D105
+		return self.__connection.execute("SELECT 1 FROM entries WHERE slug = ?", (slug,)).fetchone() is not None
+
+	def __len__(self) -> int:  # noqa: D105
+		return self.__connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+	def close(self) -> None:
+		"""Close the connection to the catalog."""
+		self.__connection.close()
+
+	def is_current(self, manifest_path: str | Path) -> bool:
+		"""
+		Check that the catalog was compiled from the current manifest, without reading it.
+
+		Args:
+			manifest_path: Path to the manifest file.
+
+		Returns:
+			True if the manifest has the modification time and size it was compiled from.
+		"""
+		try:
+			stat = Path(manifest_path).stat()
+
+		except FileNotFoundError:
+			return False
+
+		return (self.meta.get("manifest_mtime_ns"), self.meta.get("manifest_size")) == (
+			str(stat.st_mtime_ns),
+			str(stat.st_size),
+		)
+
+	def slugs(self) -> Iterator[str]:
+		"""
+		Iterate over the slugs of the catalog.
+
+		Yields:
+			The slugs, sorted.
+		"""
+		for (slug,) in self.__connection.execute("SELECT slug FROM entries ORDER BY slug"):
+			yield slug
+
+	def badge_params(self, slug: str) -> dict[str, Any]:
+		"""
+		Load the ShieldsIOBadge parameters of an entry, as `load_badge_params` does.
+
+		Args:
+			slug: The slug of the entry.
+
+		Raises:
+			KeyError: If the catalog has no such entry.
+
+		Returns:
+			The badge parameters, without the unset ones.
+		"""
+		row = self.__connection.execute(
+			"SELECT e.label, l.svg, e.message, e.color, e.label_color, e.logo_color, e.font "
+			"FROM entries e JOIN logos l ON l.id = e.logo_id WHERE e.slug = ?",
+			(slug,),
+		).fetchone()
+
+		if row is None:
+			raise KeyError(slug)
+
+		label, svg, message, color, label_color, logo_color, font = row
+		params = {
+			"slug": slug,
+			"label": label,
+			"logo": SVG(svg),
+			"message": message,
+			"color": HexColor(color),
+			"label_color": HexColor(label_color) if label_color else None,
+			"logo_color": HexColor(logo_color) if logo_color else None,
+			"font": WebSafeFont[font],
+		}
+
+		return dict(filter(itemgetter(1), params.items()))
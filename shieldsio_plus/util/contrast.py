@@ -0,0 +1,281 @@
+from collections.abc import Sequence
+from functools import cache
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+
+from shieldsio_plus.common.enums.css_named_colors import CSSNamedColor
+from shieldsio_plus.common.enums.shields_io_named_colors import ShieldsIONamedColor
+from shieldsio_plus.util.icon_scanner import extract_icon_metadata
+from shieldsio_plus.util.manifest import load_manifest_color
+from shieldsio_plus.util.variants import (
+	DARK_TEXT,
+	DEFAULT_LABEL_COLOR,
+	LIGHT_TEXT,
+	LIGHT_TEXT_MAX_WEIGHTED_SUM,
+	YIQ_WEIGHTS,
+)
+
+# Minimum contrast ratios of WCAG 2.1 AA, for text (1.4.3) and for graphics such as logos (1.4.11)
+TEXT_CONTRAST = 4.5
+GRAPHICS_CONTRAST = 3.0
+
+# Fill of SVG shapes without a `fill`
+DEFAULT_LOGO_FILL = "#000000"
+
+# Number of failing pairs matched against the named colors at once, to bound memory
+SUGGESTION_CHUNK = 4096
+
+
+class ContrastCheck(NamedTuple):
+	"""
+	A foreground and background pair of a badge that should be readable.
+
+	Attributes:
+		slug: The slug of the manifest entry.
+		role: The checked element, `label`, `message` or `logo`.
+		field: The manifest field to change to fix the pair.
+		foreground: The logo hex code, e.g. `#ffffff`, or None for text, written in the color
+			Shields.io picks over the background.
+		background: The background hex code.
+		minimum: The minimum contrast ratio of the pair.
+	"""
+
+	slug: str
+	role: str
+	field: str
+	foreground: Optional[str]
+	background: str
+	minimum: float
+
+
+class ContrastResult(NamedTuple):
+	"""
+	The contrast of a checked pair.
+
+	Attributes:
+		check: The checked pair.
+		ratio: The contrast ratio, from 1 to 21.
+		suggestion: For failing pairs, the name and manifest color of the nearest named color
+			making the pair pass when set as `check.field`, if any.
+	"""
+
+	check: ContrastCheck
+	ratio: float
+	suggestion: Optional[tuple[str, dict[str, str]]] = None
+
+	@property
+	def passed(self) -> bool:
+		"""Whether the contrast ratio reaches the minimum of the pair."""
+		return self.ratio >= self.check.minimum
+
+
+def hex_to_rgb(codes: Sequence[str]) -> np.ndarray:
+	"""
+	Convert hex codes to RGB components, in a single pass.
+
+	Args:
+		codes: The hex codes, with or without `#`, in the 3 or 6 digit forms.
+
+	Returns:
+		The `(n, 3)` array of components (uint8).
+	"""
+	codes = [code.removeprefix("#") for code in codes]
+	codes = ["".join(digit * 2 for digit in code) if len(code) == 3 else code for code in codes]
+
+	return np.frombuffer(bytes.fromhex("".join(codes)), dtype=np.uint8).reshape(-1, 3)
+
+
+def relative_luminance(rgb: np.ndarray) -> np.ndarray:
+	"""
+	Compute the WCAG relative luminance of colors.
+
+	Args:
+		rgb: The `(..., 3)` array of components, from 0 to 255.
+
+	Returns:
+		The luminance of every color, from 0 (black) to 1 (white).
+	"""
+	channels = rgb / 255.0
+	linear = np.where(channels <= 0.04045, channels / 12.92, ((channels + 0.055) / 1.055) ** 2.4)
+
+	return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def contrast_ratio(luminance_a: np.ndarray, luminance_b: np.ndarray) -> np.ndarray:
+	"""
+	Compute the WCAG contrast ratios of pairs of colors, broadcasting the luminances.
+
+	Args:
+		luminance_a: The luminances of the first colors.
+		luminance_b: The luminances of the second colors.
+
+	Returns:
+		The contrast ratios, from 1 to 21.
+	"""
+	return (np.maximum(luminance_a, luminance_b) + 0.05) / (np.minimum(luminance_a, luminance_b) + 0.05)
+
+
+def text_luminance(rgb: np.ndarray) -> np.ndarray:
+	"""
+	Compute the luminance of the text Shields.io writes over backgrounds.
+
+	The text colors are picked with the rule of `text_colors_for_background`, applied to all
+	the backgrounds at once.
+
+	Args:
+		rgb: The `(..., 3)` array of background components.
+
+	Returns:
+		The luminance of the light or dark text of every background.
+	"""
+	weighted_sums = rgb.astype(np.int64) @ np.array(YIQ_WEIGHTS)
+	light, dark = relative_luminance(hex_to_rgb([LIGHT_TEXT, DARK_TEXT]))
+
+	return np.where(weighted_sums <= LIGHT_TEXT_MAX_WEIGHTED_SUM, light, dark)
+
+
+@cache
+def named_palette() -> tuple[list[tuple[str, dict[str, str]]], np.ndarray]:
+	"""
+	Get the named colors suggestions are picked from, Shields.io colors first.
+
+	Returns:
+		The name and manifest color of every named color, and the `(n, 3)` array of their components.
+	"""
+	colors = [
+		(color.slug, {"class": "named_color", "value": color.slug}, color.hex) for color in ShieldsIONamedColor
+	] + [
+		(name := color.name.lower().replace("_", "-"), {"class": "named_color", "value": name}, color.hex)
+		for color in CSSNamedColor
+	]
+
+	return [(name, manifest_color) for name, manifest_color, _ in colors], hex_to_rgb([code for *_, code in colors])
+
+
+def manifest_checks(manifest: dict[str, Any], root: str) -> list[ContrastCheck]:
+	"""
+	List the foreground and background pairs of every manifest entry.
+
+	Badges without a message are a single section of `color`, holding the label, and the
+	logo unless a label color is set. Other badges hold the label and the logo over
+	`label_color` (Shields.io grey by default), and the message over `color`. Text colors
+	are the ones Shields.io picks, and logos without a `logo_color` are checked through
+	their dominant fill.
+
+	Args:
+		manifest: The manifest.
+		root: The directory holding the logo files.
+
+	Returns:
+		The pairs to check.
+	"""
+	checks = []
+	fills: dict[str, str] = {}
+
+	for entry in manifest["data"]:
+		slug = entry["slug"]
+		color = load_manifest_color(entry["color"]).hex
+		label_color = load_manifest_color(entry["label_color"]).hex if entry.get("label_color") else None
+
+		if entry.get("message"):
+			label_background = label_color or DEFAULT_LABEL_COLOR
+			label_field = "label_color"
+			checks.append(ContrastCheck(slug, "message", "color", None, color, TEXT_CONTRAST))
+
+		else:
+			label_background = color
+			label_field = "color"
+
+		checks.append(ContrastCheck(slug, "label", label_field, None, label_background, TEXT_CONTRAST))
+
+		if entry.get("logo_color"):
+			logo = load_manifest_color(entry["logo_color"]).hex
+
+		else:
+			if entry["logo"] not in fills:
+				icon_fills = [
+					fill for fill in extract_icon_metadata(Path(root) / entry["logo"])["fills"] if fill[:1] == "#"
+				]
+				fills[entry["logo"]] = icon_fills[0] if icon_fills else DEFAULT_LOGO_FILL
+
+			logo = fills[entry["logo"]]
+
+		checks.append(
+			ContrastCheck(slug, "logo", "logo_color", logo, label_color or label_background, GRAPHICS_CONTRAST),
+		)
+
+	return checks
+
+
+def _nearest_passing(
+	replaced: np.ndarray,
+	background_luminances: np.ndarray,
+	is_logo: np.ndarray,
+	minimums: np.ndarray,
+) -> np.ndarray:
+	_, palette = named_palette()
+	palette_luminances = relative_luminance(palette)
+
+	# The contrast of every pair if its logo, or its background, was replaced by every named color
+	candidate_ratios = np.where(
+		is_logo[:, None],
+		contrast_ratio(palette_luminances[None, :], background_luminances[:, None]),
+		contrast_ratio(text_luminance(palette), palette_luminances)[None, :],
+	)
+
+	differences = replaced[:, None, :].astype(np.float64) - palette[None, :, :]
+	distances = np.einsum("ijk,ijk->ij", differences, differences)
+	distances[candidate_ratios < minimums[:, None]] = np.inf
+	nearest = distances.argmin(axis=1)
+
+	return np.where(np.isfinite(distances[np.arange(len(nearest)), nearest]), nearest, -1)
+
+
+def analyze(checks: Sequence[ContrastCheck]) -> list[ContrastResult]:
+	"""
+	Compute the contrast of every pair, and suggest a named color for the failing ones, in one pass.
+
+	The luminances of every logo, background and named color are computed once, as arrays,
+	and the luminances of the text Shields.io writes are derived from the backgrounds. For a
+	failing logo, the suggestion is the named color nearest to the logo (in RGB space)
+	reaching the minimum over the background. For failing text, it is the named color
+	nearest to the background reaching the minimum with the text Shields.io writes over it.
+
+	Args:
+		checks: The pairs to check.
+
+	Returns:
+		The result of every pair, in order.
+	"""
+	if not checks:
+		return []
+
+	is_logo = np.array([check.role == "logo" for check in checks])
+	backgrounds = hex_to_rgb([check.background for check in checks])
+	# Text rows have no foreground of their own, their background only stands in for it
+	foregrounds = hex_to_rgb([check.foreground or check.background for check in checks])
+	minimums = np.array([check.minimum for check in checks])
+	background_luminances = relative_luminance(backgrounds)
+	foreground_luminances = np.where(is_logo, relative_luminance(foregrounds), text_luminance(backgrounds))
+	ratios = contrast_ratio(foreground_luminances, background_luminances)
+
+	failing = np.flatnonzero(ratios < minimums)
+	suggestions: dict[int, Optional[tuple[str, dict[str, str]]]] = {}
+	names, _ = named_palette()
+
+	# Failing logos keep their background and replace their color, failing text replaces its background
+	for start in range(0, len(failing), SUGGESTION_CHUNK):
+		rows = failing[start : start + SUGGESTION_CHUNK]
+		replaced = np.where(is_logo[rows, None], foregrounds[rows], backgrounds[rows])
+		choices = _nearest_passing(replaced, background_luminances[rows], is_logo[rows], minimums[rows])
+
+		suggestions.update(
+			(int(index), names[choice] if choice >= 0 else None) for index, choice in zip(rows, choices, strict=True)
+		)
+
+	return [
+		ContrastResult(check, float(ratio), suggestions.get(index))
+		for index, (check, ratio) in enumerate(zip(checks, ratios, strict=True))
+	]
@@ -1,34 +1,382 @@
 import concurrent.futures
-from collections.abc import Sequence
-from json import dump as json_dump
-from operator import itemgetter
+from collections.abc import Callable, Iterable, Iterator
+from json import dumps as json_dumps
+from json import loads as json_loads
+from os import cpu_count
 from pathlib import Path
+from tempfile import TemporaryFile
+from textwrap import indent
+from time import perf_counter
+from typing import Any, Optional
+
+from loguru import logger
 
 from shieldsio_plus.common.types.shields_io_badge import ShieldsIOBadge
+from shieldsio_plus.common.types.shields_io_badge_spec import ShieldsIOBadgeSpec
+from shieldsio_plus.common.types.svg import SVG
+from shieldsio_plus.util.build_plan import FetchGroup, plan_fetches
+from shieldsio_plus.util.files import AtomicWriter, file_digest, write_if_changed
+from shieldsio_plus.util.journal import BuildJournal
+from shieldsio_plus.util.singleflight import SingleFlight
+from shieldsio_plus.util.timing import StageTimer, timed
+from shieldsio_plus.util.variants import VariantDeriver
+
+# Number of worker threads, and the number of badges allowed to be queued or in flight at once
+MAX_WORKERS = min(32, (cpu_count() or 1) + 4)
+MAX_IN_FLIGHT = 2 * MAX_WORKERS
+
+
+class BadgeRecordSpool:
+	"""
+	Spills badge records to a temporary JSON Lines file.
+
+	Only the sort key and file offset of each record are kept in memory, so that the
+	records can be streamed back sorted by slug without holding them all at once.
+	"""
+
+	def __init__(self) -> None:  # noqa: D107
+		self.__file = TemporaryFile("w+b")  # noqa: SIM115
+		self.__index: list[tuple[str, str, int]] = []
+
+	def __len__(self) -> int:  # noqa: D105
+		return len(self.__index)
+
+	def append(self, record: dict[str, Any], key: str) -> None:
+		"""
+		Append a record to the spool.
+
+		Args:
+			record: The badge record.
+			key: The unique badge key, used to break ties between records with the same slug.
+		"""
+		self.__file.seek(0, 2)
+		self.__index.append((record["slug"], key, self.__file.tell()))
+		self.__file.write(json_dumps(record).encode("utf-8") + b"\n")
+
+	def sorted_entries(self) -> Iterator[tuple[str, dict[str, Any]]]:
+		"""
+		Stream the records back with their keys, sorted by slug and key.
+
+		Yields:
+			The badge keys and records.
+		"""
+		for _, key, offset in sorted(self.__index):
+			self.__file.seek(offset)
+			yield key, json_loads(self.__file.readline())
+
+	def sorted_records(self) -> Iterator[dict[str, Any]]:
+		"""
+		Stream the records back, sorted by slug and key.
+
+		Yields:
+			The badge records.
+		"""
+		for _, record in self.sorted_entries():
+			yield record
+
+	def close(self) -> None:
+		"""Close and delete the spool file."""
+		self.__file.close()
+
+
+def badges_index_path(json_path: str | Path) -> Path:
+	"""
+	Get the path of the index of a badges JSON file.
+
+	Args:
+		json_path: Path of the badges JSON file.
+
+	Returns:
+		The path of the index, e.g. `badges.index.json` next to `badges.json`.
+	"""
+	path = Path(json_path)
+
+	return path.with_name(f"{path.stem}.index.json")
+
+
+def write_badges_index(slugs: Iterable[str], fonts: Iterable[str], index_path: str | Path) -> bool:
+	"""
+	Write the index of the built badges, i.e. their sorted distinct slugs and fonts.
+
+	The index holds what the README tables need, so they are generated without loading
+	the badge records.
+
+	Args:
+		slugs: The slugs of the badges, possibly repeated.
+		fonts: The fonts of the badges, possibly repeated.
+		index_path: Path of the index file.
+
+	Returns:
+		True if the file was written, False if it was already up to date.
+	"""
+	index = {"slugs": sorted(set(slugs)), "fonts": sorted(set(fonts))}
+
+	return write_if_changed(index_path, json_dumps(index, indent=4) + "\n")
+
+
+def read_badges_index(index_path: str | Path) -> dict[str, list[str]]:
+	"""
+	Read the index written by `write_badges_index`.
+
+	Args:
+		index_path: Path of the index file.
+
+	Raises:
+		FileNotFoundError: If the index does not exist.
 
+	Returns:
+		The sorted distinct slugs (`slugs`) and fonts (`fonts`) of the badges.
+	"""  # noqa: DOC502
+	return json_loads(Path(index_path).read_text(encoding="utf-8"))
 
-def download_shields_io_badges(shields: Sequence[ShieldsIOBadge], badge_path: str, json_path: str) -> None:
+
+def write_badges_json(
+	records: Iterable[dict[str, Any]],
+	json_path: str,
+	index_path: Optional[str | Path] = None,
+) -> bool:
+	"""
+	Stream badge records to a JSON file, formatted as `json.dump(records, indent=4)` would.
+
+	The file is written atomically, and left untouched if its content did not change.
+
+	Args:
+		records: The badge records, in output order.
+		json_path: JSON file path to save the badge metadata.
+		index_path (optional): Also write the index of the records, through `write_badges_index`,
+			in the same pass. Defaults to None, writing no index.
+
+	Returns:
+		True if the file was written, False if it was already up to date.
+	"""
+	slugs: set[str] = set()
+	fonts: set[str] = set()
+
+	with AtomicWriter(json_path) as writer:
+		separator = "[\n"
+
+		for record in records:
+			writer.write(separator + indent(json_dumps(record, indent=4), " " * 4))
+			separator = ",\n"
+
+			if record.get("slug"):
+				slugs.add(record["slug"])
+
+			if record.get("font"):
+				fonts.add(record["font"])
+
+		writer.write("[]" if separator == "[\n" else "\n]")
+
+	if index_path is not None:
+		write_badges_index(slugs, fonts, index_path)
+
+	return writer.written
+
+
+def write_badges_fragment(entries: Iterable[tuple[str, dict[str, Any]]], fragment_path: str | Path) -> bool:
+	"""
+	Write the badge records of a shard as a JSON Lines fragment, to be merged later.
+
+	Every line holds the key and the record of a badge, and lines must be given sorted by
+	slug and key, so that fragments can be merged without loading them.
+
+	Args:
+		entries: The badge keys and records, sorted by slug and key.
+		fragment_path: Path of the fragment file.
+
+	Returns:
+		True if the file was written, False if it was already up to date.
+	"""
+	Path(fragment_path).parent.mkdir(parents=True, exist_ok=True)
+
+	with AtomicWriter(fragment_path) as writer:
+		for key, record in entries:
+			writer.write(json_dumps({"key": key, "record": record}) + "\n")
+
+	return writer.written
+
+
+def read_badges_fragment(fragment_path: str | Path) -> Iterator[tuple[str, str, dict[str, Any]]]:
+	"""
+	Stream the badge records of a fragment written by `write_badges_fragment`.
+
+	Args:
+		fragment_path: Path of the fragment file.
+
+	Yields:
+		The slug, key and record of every badge, in the fragment order.
+	"""
+	with Path(fragment_path).open("r", encoding="utf-8") as f:
+		for line in f:
+			entry = json_loads(line)
+			yield entry["record"]["slug"], entry["key"], entry["record"]
+
+
+def download_shields_io_badges(  # noqa: C901, PLR0913, PLR0915
+	shields: Iterable[ShieldsIOBadge],
+	badge_path: str,
+	json_path: str | Path,
+	max_in_flight: int = MAX_IN_FLIGHT,
+	*,
+	deriver: Optional[VariantDeriver] = None,
+	journal: Optional[BuildJournal] = None,
+	fragment: bool = False,
+	timer: Optional[StageTimer] = None,
+) -> None:
 	"""
 	Download shields.io badges in parallel using a ThreadPoolExecutor.
 
+	Badges are pulled lazily from `shields` and grouped by upstream request through
+	`plan_fetches`: each group is fetched once, and every badge of the group (e.g. the font
+	variants of a badge, or the TRUE_FLAT style derived from FLAT_SQUARE) is post-processed
+	locally from the shared response. Identical requests in different groups are coalesced
+	as well. At most `max_in_flight` groups are queued or downloading at any time, so memory
+	stays bounded regardless of the number of badges. Badge files (and the JSON file) that
+	already hold the downloaded content are left untouched, and the number of written and
+	skipped files, as well as the number of saved requests, is logged.
+
+	When a `deriver` is given, badges that only differ by their colors are grouped as well,
+	and derived from the base render of the group through `VariantDeriver.derive`.
+
+	A failing badge (or group fetch) does not stop the build: every other badge is still
+	downloaded, and the failures are raised together once the build is done, without
+	writing the JSON file.
+
 	Args:
-		shields: Sequence of ShieldsIOBadge objects.
+		shields: Iterable of ShieldsIOBadge objects.
 		badge_path: Directory path to save the badges.
-		json_path: JSON file path to save the badge metadata.
+		json_path: JSON file path to save the badge metadata. Its index is written next to it,
+			see `badges_index_path`.
+		max_in_flight (optional): Maximum number of fetch groups queued or in flight. Defaults to `MAX_IN_FLIGHT`.
+		deriver (optional): Variant deriver rendering color variants locally. Defaults to None.
+		journal (optional): Journal the completed badges are recorded in. Badges it holds as
+			completed, with an unchanged file, are not downloaded again. Defaults to None.
+		fragment (optional): Write `json_path` as a shard fragment, through
+			`write_badges_fragment`, instead of the final JSON file. Defaults to False.
+		timer (optional): Timer of the build, timing every stage and badge. Defaults to None.
+
+	Raises:
+		ExceptionGroup: If any badge failed to download, with one exception per failed badge
+			or group fetch.
 	"""
-	badges = []
+	spool = BadgeRecordSpool()
+	flight: SingleFlight[str, str] = SingleFlight()
+	failures: list[Exception] = []
+	written = resumed = failed = 0
 	badge_path = str(Path(badge_path).resolve())
 
-	def _download_single_badge(badge: ShieldsIOBadge) -> None:
-		badge.download_shieldsio_badge(badge_path)
+	def _fetch(group: FetchGroup) -> Callable[[ShieldsIOBadgeSpec], str]:
+		"""
+		Fetch the upstream response of a group once.
+
+		Returns:
+			The renderer of the badges of the group, from their spec.
+		"""
+		if deriver:
+			base = deriver.base(group.spec)
+			return lambda spec: deriver.derive(base, spec)
+
+		svg_str = flight.do(group.spec.url, lambda: SVG.fetch(group.spec.url))
+		return lambda _: svg_str
+
+	def _pending(badges: Iterable[ShieldsIOBadge]) -> Iterator[ShieldsIOBadge]:
+		nonlocal resumed
+
+		for badge in badges:
+			if journal and journal.is_complete(badge.key, badge.spec.url, badge.file_path(badge_path)):
+				spool.append(journal.read_record(badge.key), badge.key)
+				resumed += 1
+				continue
+
+			yield badge
+
+	def _download_group(group: FetchGroup) -> tuple[list[tuple[dict[str, Any], str, bool, str]], list[Exception], int]:
+		results, errors = [], []
+		start = perf_counter()
+
+		try:
+			with timed(timer, "fetch", group.key):
+				render = _fetch(group)
+
+		except Exception as e:  # noqa: BLE001
+			e.add_note(f"While downloading {len(group.badges)} badges of {group.key} from {group.spec.url}")
+			logger.error(f"Failed to download {group.key}: {e}")
+			return results, [e], len(group.badges)
+
+		fetched = perf_counter() - start
+
+		for badge in group.badges:
+			# The shared fetch counts in the duration of every badge of the group
+			start = perf_counter() - fetched
+
+			try:
+				svg = badge.post_process(render(badge.spec), timer=timer)
+				is_written = badge.save_shieldsio_badge(badge_path, svg, timer=timer)
+				results.append((badge.to_dict(), badge.key, is_written, file_digest(badge.path)))
+
+			except Exception as e:  # noqa: BLE001
+				e.add_note(f"While downloading {badge.key} from {badge.spec.url}")
+				logger.error(f"Failed to download {badge.key}: {e}")
+				errors.append(e)
+
+			else:
+				if timer:
+					timer.record_badge(badge.key, perf_counter() - start)
+
+		return results, errors, len(errors)
+
+	def _collect(futures: Iterable[concurrent.futures.Future]) -> int:
+		nonlocal failed
+		count = 0
+
+		for future in futures:
+			results, errors, failed_badges = future.result()
+			failures.extend(errors)
+			failed += failed_badges
+
+			for record, key, is_written, digest in results:
+				spool.append(record, key)
+				count += is_written
+
+				if journal:
+					journal.record(key, digest, record)
+
+		return count
+
+	try:
+		with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+			pending: set[concurrent.futures.Future] = set()
+
+			for group in plan_fetches(_pending(shields), key=deriver.base_key if deriver else lambda spec: spec):
+				# Wait for a slot before pulling more badges from the pipeline
+				if len(pending) >= max_in_flight:
+					done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+					written += _collect(done)
+
+				pending.add(executor.submit(_download_group, group))
+
+			written += _collect(concurrent.futures.as_completed(pending))
+
+		if resumed:
+			logger.info(f"Resumed {resumed} badges completed by the interrupted build.")
+
+		logger.info(f"Wrote {written} badges, skipped {len(spool) - resumed - written} unchanged badges.")
+		calls = deriver.calls if deriver else flight.calls
+		rendered = len(spool) - resumed
+		logger.info(f"Fetched {calls} distinct URLs for {rendered} badges, saved {rendered - calls} upstream requests.")
 
-		badges.append(badge.to_dict())
+		# Keep the previous metadata rather than publishing an incomplete catalog
+		if failures:
+			raise ExceptionGroup(f"Failed to download {failed} of {len(spool) + failed} badges", failures)
 
-	with concurrent.futures.ThreadPoolExecutor() as executor:
-		futures = [executor.submit(_download_single_badge, badge) for badge in shields]
+		with timed(timer, "badges_json"):
+			if fragment:
+				is_written = write_badges_fragment(spool.sorted_entries(), json_path)
+			else:
+				is_written = write_badges_json(spool.sorted_records(), json_path, badges_index_path(json_path))
 
-		for future in concurrent.futures.as_completed(futures):
-			future.result()
+			if not is_written:
+				logger.info(f"Skipped unchanged {json_path}")
 
-	with Path(json_path).open("w", encoding="utf-8") as f:
-		json_dump(sorted(badges, key=itemgetter("slug")), f, indent=4)
+	finally:
+		spool.close()
@@ -0,0 +1,119 @@
+import os
+from hashlib import file_digest as _file_digest
+from hashlib import sha256
+from pathlib import Path
+from stat import S_IMODE
+from tempfile import NamedTemporaryFile
+from types import TracebackType
+from typing import Optional, Self
+
+# Mode of new files, as `open` would create them under the usual umask
+DEFAULT_FILE_MODE = 0o644
+
+
+def file_digest(path: str | Path) -> str | None:
+	"""
+	Compute the SHA-256 digest of a file.
+
+	Args:
+		path: Path to the file.
+
+	Returns:
+		The hex digest, or None if the file does not exist.
+	"""
+	try:
+		with Path(path).open("rb") as f:
+			return _file_digest(f, "sha256").hexdigest()
+
+	except FileNotFoundError:
+		return None
+
+
+class AtomicWriter:
+	"""
+	Context manager writing a file atomically, unless it already holds the same bytes.
+
+	Content is streamed to a temporary file in the same directory while its SHA-256 is
+	computed. On exit the digest is compared against the existing file: if they match the
+	temporary file is discarded, otherwise it is synced to disk and replaces the target
+	through `os.replace`, keeping the mode of the target, so readers never see a partial
+	file, even after a crash.
+
+	Attributes:
+		path: Path to the target file.
+		written: Whether the target file was written. Only set after exiting the context.
+	"""
+
+	def __init__(self, path: str | Path) -> None:  # noqa: D107
+		self.path = Path(path)
+		self.written = False
+		self.__hash = sha256()
+
+	def __enter__(self) -> Self:  # noqa: D105
+		self.__file = NamedTemporaryFile(
+			"wb",
+			dir=self.path.parent,
+			prefix=f".{self.path.name}.",
+			suffix=".tmp",
+			delete=False,
+		)
+		return self
+
+	def write(self, content: str | bytes) -> None:
+		"""
+		Write content to the temporary file.
+
+		Args:
+			content: Content to write. Strings are encoded as UTF-8.
+		"""
+		data = content.encode("utf-8") if isinstance(content, str) else content
+
+		self.__hash.update(data)
+		self.__file.write(data)
+
+	def __exit__(  # noqa: D105
+		self,
+		exc_type: Optional[type[BaseException]],
+		exc_value: Optional[BaseException],
+		traceback: Optional[TracebackType],
+	) -> None:
+		temp_path = Path(self.__file.name)
+
+		try:
+			if exc_type is None and file_digest(self.path) != self.__hash.hexdigest():
+				# The content must reach the disk before the rename, or a crash may leave an empty file
+				self.__file.flush()
+				os.fsync(self.__file.fileno())
+				self.__file.close()
+
+				temp_path.chmod(self.__target_mode())
+				temp_path.replace(self.path)
+				self.written = True
+
+		finally:
+			self.__file.close()
+			temp_path.unlink(missing_ok=True)
+
+	def __target_mode(self) -> int:
+		try:
+			return S_IMODE(self.path.stat().st_mode)
+
+		except FileNotFoundError:
+			return DEFAULT_FILE_MODE
+
+
+def write_if_changed(path: str | Path, content: str | bytes) -> bool:
+	"""
+	Atomically write content to a file, unless the file already holds the same bytes.
+
+	Args:
+		path: Path to the file.
+		content: Content to write. Strings are encoded as UTF-8.
+
+	Returns:
+		True if the file was written, False if it was already up to date.
+	"""
+	with AtomicWriter(path) as writer:
+		writer.write(content)
+
+	return writer.written
@@ -0,0 +1,262 @@
+from collections.abc import Iterable, Sequence
+from hashlib import sha256
+from io import BytesIO
+from pathlib import Path
+from zipfile import BadZipFile
+
+import numpy as np
+from fontTools.ttLib import TTFont
+from loguru import logger
+
+from shieldsio_plus.util.files import write_if_changed
+from shieldsio_plus.util.singleflight import SingleFlight
+from shieldsio_plus.util.upstream import upstream
+
+DEFAULT_METRICS_DIR = Path(__file__).resolve().parent.parent.parent / ".cache" / "font_metrics"
+
+
+class FontMetrics:
+	"""
+	Horizontal advance widths of a font, for local text measurement.
+
+	Only the `head`, `cmap` and `hmtx` tables are decoded, into two compact arrays: the
+	sorted code points mapped by the font, and the advance width of each, in font units.
+	Text is measured by looking up all of its code points at once, and characters missing
+	from the font take the advance of the `.notdef` glyph. Kerning and shaping are ignored,
+	so widths are those of a browser without ligatures, which is what badges need.
+
+	Attributes:
+		units_per_em: The number of font units per em.
+		codepoints: The code points mapped by the font, sorted (uint32).
+		advances: The advance width of each code point, in font units (uint16).
+		default_advance: The advance width of the `.notdef` glyph, in font units.
+	"""
+
+	def __init__(  # noqa: D107
+		self,
+		units_per_em: int,
+		codepoints: np.ndarray,
+		advances: np.ndarray,
+		default_advance: int = 0,
+	) -> None:
+		self.units_per_em = units_per_em
+		self.codepoints = codepoints
+		self.advances = advances
+		self.default_advance = default_advance
+
+	@classmethod
+	def from_bytes(cls, data: bytes) -> "FontMetrics":
+		"""
+		Decode the metrics of a font file (WOFF2, WOFF, TrueType or OpenType).
+
+		Args:
+			data: The font file content.
+
+		Returns:
+			The font metrics.
+		"""
+		font = TTFont(BytesIO(data), lazy=True)
+		cmap = font.getBestCmap() or {}
+		metrics = font["hmtx"].metrics
+
+		codepoints = np.fromiter(cmap.keys(), dtype=np.uint32, count=len(cmap))
+		advances = np.fromiter((metrics[glyph][0] for glyph in cmap.values()), dtype=np.uint16, count=len(cmap))
+		order = np.argsort(codepoints)
+		notdef = metrics.get(font.getGlyphOrder()[0], (0, 0))[0]
+
+		return cls(font["head"].unitsPerEm, codepoints[order], advances[order], notdef)
+
+	@classmethod
+	def merge(cls, fonts: Sequence["FontMetrics"]) -> "FontMetrics":
+		"""
+		Merge the metrics of the files of a font split by Unicode range.
+
+		Args:
+			fonts: The metrics of each file. Earlier files take precedence for the code points
+				mapped by several files.
+
+		Raises:
+			ValueError: If no metrics are given, or if the files have different units per em.
+
+		Returns:
+			The merged metrics.
+		"""
+		if not fonts:
+			raise ValueError("No font metrics to merge")
+
+		if len({font.units_per_em for font in fonts}) > 1:
+			raise ValueError("Cannot merge font metrics with different units per em")
+
+		# `np.unique` keeps the first occurrence of every code point
+		codepoints, first = np.unique(np.concatenate([font.codepoints for font in fonts]), return_index=True)
+		advances = np.concatenate([font.advances for font in fonts])[first]
+
+		return cls(fonts[0].units_per_em, codepoints, advances, fonts[0].default_advance)
+
+	@classmethod
+	def load(cls, path: str | Path) -> "FontMetrics":
+		"""
+		Load metrics saved by `save`.
+
+		Args:
+			path: Path to the `.npz` file.
+
+		Returns:
+			The font metrics.
+		"""
+		with np.load(path) as arrays:
+			return cls(
+				int(arrays["units_per_em"]),
+				arrays["codepoints"],
+				arrays["advances"],
+				int(arrays["default_advance"]),
+			)
+
+	def save(self, path: str | Path) -> None:
+		"""
+		Save the metrics as a compressed `.npz` file.
+
+		The file is written atomically, so concurrent readers never load a partial file.
+
+		Args:
+			path: Path to the `.npz` file.
+		"""
+		Path(path).parent.mkdir(parents=True, exist_ok=True)
+		buffer = BytesIO()
+
+		np.savez_compressed(
+			buffer,
+			units_per_em=self.units_per_em,
+			codepoints=self.codepoints,
+			advances=self.advances,
+			default_advance=self.default_advance,
+		)
+
+		write_if_changed(path, buffer.getvalue())
+
+	def __len__(self) -> int:  # noqa: D105
+		return len(self.codepoints)
+
+	def advances_of(self, codepoints: np.ndarray) -> np.ndarray:
+		"""
+		Look up the advance widths of many code points at once.
+
+		Args:
+			codepoints: The code points (uint32).
+
+		Returns:
+			The advance width of each code point, in font units.
+		"""
+		if not len(self.codepoints):
+			return np.full(len(codepoints), self.default_advance, dtype=np.int64)
+
+		index = np.searchsorted(self.codepoints, codepoints).clip(max=len(self.codepoints) - 1)
+		found = self.codepoints[index] == codepoints
+
+		return np.where(found, self.advances[index], self.default_advance).astype(np.int64)
+
+	def measure(self, text: str, font_size: float) -> float:
+		"""
+		Measure the width of a text.
+
+		Args:
+			text: The text.
+			font_size: The font size, in pixels.
+
+		Returns:
+			The width of the text, in pixels.
+		"""
+		codepoints = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+		return float(self.advances_of(codepoints).sum()) * font_size / self.units_per_em
+
+	def measure_many(self, texts: Iterable[str], font_size: float) -> np.ndarray:
+		"""
+		Measure the widths of many texts in a single lookup.
+
+		Args:
+			texts: The texts.
+			font_size: The font size, in pixels.
+
+		Returns:
+			The width of each text, in pixels.
+		"""
+		texts = list(texts)
+		lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+		codepoints = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32)
+
+		# Sum the advances of every text, including empty ones, from the cumulative sums
+		totals = np.concatenate(([0], np.cumsum(self.advances_of(codepoints))))
+		ends = np.cumsum(lengths)
+
+		return (totals[ends] - totals[ends - lengths]) * font_size / self.units_per_em
+
+
+def metrics_path(urls: Sequence[str], directory: str | Path = DEFAULT_METRICS_DIR) -> Path:
+	"""
+	Get the path of the cached metrics of a font.
+
+	Args:
+		urls: The URLs of the font files.
+		directory (optional): Directory of the cached metrics. Defaults to `DEFAULT_METRICS_DIR`.
+
+	Returns:
+		The path of the `.npz` file, named after the hash of the URLs, so that a changed
+		font is decoded again.
+	"""
+	return Path(directory) / f"{sha256('\n'.join(urls).encode('utf-8')).hexdigest()[:32]}.npz"
+
+
+# Decoded metrics, by font files and cache directory, decoded once even by concurrent callers
+_flight: SingleFlight[tuple[tuple[str, ...], Path], FontMetrics] = SingleFlight()
+
+
+def _load_font_metrics(urls: tuple[str, ...], directory: Path) -> FontMetrics:
+	path = metrics_path(urls, directory)
+
+	try:
+		return FontMetrics.load(path)
+
+	except FileNotFoundError:
+		pass
+
+	# Truncated or damaged on disk, e.g. by an interrupted run
+	except (OSError, EOFError, KeyError, ValueError, BadZipFile) as e:
+		logger.warning(f"Decoding the font metrics again, the cached {path} is unreadable: {e}")
+
+	fonts = []
+
+	for url in urls:
+		response = upstream.get(url)
+		response.raise_for_status()
+		fonts.append(FontMetrics.from_bytes(response.content))
+
+	metrics = FontMetrics.merge(fonts)
+	metrics.save(path)
+
+	logger.debug(f"Decoded the metrics of {len(metrics)} code points from {len(urls)} font files")
+
+	return metrics
+
+
+def load_font_metrics(urls: Sequence[str], directory: str | Path = DEFAULT_METRICS_DIR) -> FontMetrics:
+	"""
+	Load the metrics of a font, decoding its files only once.
+
+	Metrics are kept in memory and cached on disk, so font files are only downloaded and
+	decoded the first time a font is used, once even if several threads use it at the same
+	time. An unreadable cached file is decoded again.
+
+	Args:
+		urls: The URLs of the font files, e.g. one per Unicode range.
+		directory (optional): Directory of the cached metrics. Defaults to `DEFAULT_METRICS_DIR`.
+
+	Raises:
+		HTTPError: If a font file cannot be downloaded.
+
+	Returns:
+		The font metrics.
+	"""  # noqa: DOC502
+	key = (tuple(urls), Path(directory))
+
+	return _flight.do(key, lambda: _load_font_metrics(*key))
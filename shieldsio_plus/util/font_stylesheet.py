@@ -0,0 +1,91 @@
+from collections.abc import Iterable
+from functools import cache
+from pathlib import Path
+from typing import Optional
+
+from shieldsio_plus.common.enums.unicode_ranges import UnicodeRange
+from shieldsio_plus.common.enums.woff2_fonts import KnownWOFF2Fonts
+from shieldsio_plus.common.types.woff2_font import WOFF2Font
+from shieldsio_plus.util.files import write_if_changed
+
+# Fonts of the badge text when the web font is not loaded, i.e. the Shields.io font
+FALLBACK_FONT_FAMILY = "Verdana,Geneva,DejaVu Sans,sans-serif"
+
+
+def font_family(font: KnownWOFF2Fonts) -> str:
+	"""
+	Get the `font-family` value referencing a web font, with the Shields.io font as fallback.
+
+	Args:
+		font: The web font.
+
+	Returns:
+		The `font-family` value.
+	"""
+	return f"'{font.family_name}',{FALLBACK_FONT_FAMILY}"
+
+
+@cache
+def _font_face_rule(font: KnownWOFF2Fonts, src: str, unicode_range: UnicodeRange) -> str:
+	return WOFF2Font(src).to_css(
+		font.family_name,
+		font.font_style,
+		font.font_weight,
+		font.font_display,
+		unicode_range=unicode_range.range,
+	)
+
+
+def font_face_css(font: KnownWOFF2Fonts, text: Optional[str] = None) -> str:
+	"""
+	Build the `@font-face` rules of a web font, one per file, with the files inlined as base64.
+
+	Rules are built once per process, so every badge or stylesheet using the font shares
+	the same download and encoding.
+
+	Args:
+		font: The web font.
+		text (optional): Only include the files whose Unicode range covers a character of this
+			text, e.g. the text of a badge. Defaults to None, including every file.
+
+	Raises:
+		HTTPError: If a font file cannot be downloaded.
+		ValueError: If a font file is not a WOFF2 font.
+
+	Returns:
+		The `@font-face` rules, empty if no file covers the text.
+	"""  # noqa: DOC502
+	srcs = None if text is None else set(font.srcs_for(text))
+
+	return "\n".join(
+		_font_face_rule(font, src, unicode_range) for src, unicode_range in font.slices if srcs is None or src in srcs
+	)
+
+
+def font_stylesheet(fonts: Iterable[KnownWOFF2Fonts]) -> str:
+	"""
+	Build a stylesheet holding the `@font-face` rules of every font exactly once.
+
+	Args:
+		fonts: The web fonts, possibly repeated, e.g. the fonts of every badge of a page.
+
+	Returns:
+		The stylesheet, with the fonts in order of first use.
+	"""
+	return "\n".join(font_face_css(font) for font in dict.fromkeys(fonts))
+
+
+def write_font_stylesheet(fonts: Iterable[KnownWOFF2Fonts], path: str | Path) -> bool:
+	"""
+	Write the shared stylesheet of a set of badges, unless it is already up to date.
+
+	Args:
+		fonts: The web fonts of the badges, possibly repeated.
+		path: Path of the stylesheet, e.g. `fonts.css` next to the badges.
+
+	Returns:
+		True if the file was written, False if it was already up to date.
+	"""
+	Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+	return write_if_changed(path, font_stylesheet(fonts) + "\n")
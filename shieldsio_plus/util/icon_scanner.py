@@ -0,0 +1,409 @@
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional, TypedDict
+
+from loguru import logger
+from lxml import etree
+
+from shieldsio_plus.util.files import write_if_changed
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent.parent / ".cache" / "icon_scan.json"
+
+# Maximum number of icons parsed at once
+MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Number of dominant fill colors kept per icon
+DOMINANT_FILLS = 3
+
+_SHORT_HEX = re.compile(r"#([0-9a-fA-F])([0-9a-fA-F])([0-9a-fA-F])")
+_STYLE_FILL = re.compile(r"(?:^|;)\s*fill\s*:\s*([^;]+)")
+_LENGTH = re.compile(r"\s*([0-9]*\.?[0-9]+)\s*(?:px)?\s*")
+
+
+class IconMetadata(TypedDict):
+	"""
+	Metadata extracted from an SVG icon.
+
+	Attributes:
+		view_box: The `viewBox` of the icon, or None if it has none.
+		width: The width of the icon, from its `width` attribute or its `viewBox`.
+		height: The height of the icon, from its `height` attribute or its `viewBox`.
+		fills: The most used fill colors, most used first.
+	"""
+
+	view_box: Optional[str]
+	width: Optional[float]
+	height: Optional[float]
+	fills: list[str]
+
+
+def _parse_length(value: Optional[str]) -> Optional[float]:
+	match = _LENGTH.fullmatch(value) if value else None
+
+	return float(match[1]) if match else None
+
+
+def _normalize_color(value: str) -> Optional[str]:
+	value = value.strip().lower()
+
+	if not value or value in {"none", "transparent", "inherit", "currentcolor"} or value.startswith("url("):
+		return None
+
+	# Expand short hex codes, so that `#fff` and `#ffffff` are counted as the same color
+	if match := _SHORT_HEX.fullmatch(value):
+		return "#" + "".join(digit * 2 for digit in match.groups())
+
+	return value
+
+
+def extract_icon_metadata(path: str | Path) -> IconMetadata:
+	"""
+	Extract the metadata of an SVG icon.
+
+	Fills are read from the `fill` attributes and inline `fill` styles of every element, and
+	counted once per element. Gradients, `none` and inherited fills are ignored.
+
+	Args:
+		path: Path to the SVG file.
+
+	Raises:
+		ValueError: If the file is not a valid SVG document.
+
+	Returns:
+		The icon metadata.
+	"""
+	try:
+		root = etree.parse(str(path), etree.XMLParser(resolve_entities=False, no_network=True)).getroot()
+
+	except etree.XMLSyntaxError as e:
+		raise ValueError(f"Invalid SVG file: {path}") from e
+
+	view_box = root.get("viewBox")
+	box = [float(value) for value in re.split(r"[\s,]+", view_box.strip())] if view_box else []
+	fills: Counter[str] = Counter()
+
+	for element in root.iter():
+		if not isinstance(element.tag, str):
+			continue
+
+		values = [element.get("fill", "")]
+
+		if style_fill := _STYLE_FILL.search(element.get("style", "")):
+			values.append(style_fill[1])
+
+		fills.update(filter(None, map(_normalize_color, values)))
+
+	return IconMetadata(
+		view_box=view_box,
+		width=_parse_length(root.get("width")) or (box[2] if len(box) == 4 else None),
+		height=_parse_length(root.get("height")) or (box[3] if len(box) == 4 else None),
+		fills=[color for color, _ in fills.most_common(DOMINANT_FILLS)],
+	)
+
+
+@dataclass
+class IconScan:
+	"""
+	The result of a scan of an icon directory.
+
+	Attributes:
+		icons: The metadata of every icon, by path relative to the icon directory.
+		changed: The icons that are new or changed since the previous scan, sorted.
+		removed: The icons of the previous scan that no longer exist, sorted.
+		entries: The modification time (`mtime_ns`), size and metadata of every icon, by path,
+			to be saved with `IconScanner.save_cache` once the scan is merged.
+	"""
+
+	icons: dict[str, IconMetadata] = field(default_factory=dict)
+	changed: list[str] = field(default_factory=list)
+	removed: list[str] = field(default_factory=list)
+	entries: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+class IconScanner:
+	"""
+	Incremental scanner of the SVG icons of a directory.
+
+	The metadata of every icon is cached with the modification time and size of its file,
+	so a scan only stats the unchanged icons, and only parses the new or changed ones. The
+	directory tree is walked, and the icons parsed, in a thread pool.
+
+	The cache records what the manifest it is merged into has seen, so it is keyed on both
+	the icon directory and the manifest, and only saved by the caller once the scan is merged.
+
+	Attributes:
+		root: The icon directory.
+		cache_path: Path to the cache file.
+		max_workers: Maximum number of threads walking and parsing.
+		manifest_path: Path to the manifest the scans are merged into, if any.
+	"""
+
+	def __init__(  # noqa: D107
+		self,
+		root: str | Path,
+		cache_path: str | Path = DEFAULT_CACHE_PATH,
+		max_workers: int = MAX_WORKERS,
+		manifest_path: Optional[str | Path] = None,
+	) -> None:
+		self.root = Path(root)
+		self.cache_path = Path(cache_path)
+		self.max_workers = max_workers
+		self.manifest_path = Path(manifest_path) if manifest_path is not None else None
+
+	@property
+	def cache_key(self) -> dict[str, Optional[str]]:
+		"""
+		Gets the key of the cache of the scanner.
+
+		Returns:
+			The resolved paths of the icon directory and of the manifest.
+		"""
+		return {
+			"root": str(self.root.resolve()),
+			"manifest": str(self.manifest_path.resolve()) if self.manifest_path is not None else None,
+		}
+
+	def load_cache(self) -> dict[str, dict[str, Any]]:
+		"""
+		Load the cached icons of the previous scan.
+
+		Returns:
+			The modification time (`mtime_ns`), size and metadata of every icon, by path. Empty if
+			the cache is missing, unreadable, or was written for another directory or manifest.
+		"""
+		try:
+			cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+
+		except (FileNotFoundError, json.JSONDecodeError):
+			return {}
+
+		if any(cache.get(name) != value for name, value in self.cache_key.items()):
+			return {}
+
+		return cache["icons"]
+
+	def save_cache(self, icons: dict[str, dict[str, Any]]) -> None:
+		"""
+		Save the cached icons of a scan.
+
+		Args:
+			icons: The modification time (`mtime_ns`), size and metadata of every icon, by path.
+		"""
+		self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+		write_if_changed(self.cache_path, json.dumps(self.cache_key | {"icons": icons}, indent="\t"))
+
+	@staticmethod
+	def __list_directory(path: Path) -> tuple[list[os.DirEntry], list[Path]]:
+		files, directories = [], []
+
+		with os.scandir(path) as entries:
+			for entry in entries:
+				if entry.is_dir(follow_symlinks=False):
+					directories.append(Path(entry.path))
+
+				elif entry.name.lower().endswith(".svg") and entry.is_file():
+					files.append(entry)
+
+		return files, directories
+
+	def walk(self, executor: ThreadPoolExecutor) -> dict[str, os.stat_result]:
+		"""
+		Stat every SVG file of the icon directory tree, one directory level at a time.
+
+		Args:
+			executor: The thread pool listing the directories.
+
+		Returns:
+			The stat of every icon, by path relative to the icon directory, in POSIX form.
+		"""
+		stats = {}
+		directories = [self.root]
+
+		while directories:
+			next_directories = []
+
+			for files, subdirectories in executor.map(self.__list_directory, directories):
+				for entry in files:
+					stats[Path(entry.path).relative_to(self.root).as_posix()] = entry.stat()
+
+				next_directories.extend(subdirectories)
+
+			directories = next_directories
+
+		return stats
+
+	def scan(self, *, full: bool = False) -> IconScan:
+		"""
+		Scan the icon directory, parsing only the icons that are new or changed since the previous scan.
+
+		The cache is not saved, so that the icons of a scan are only seen as unchanged once it
+		is merged: see `save_cache` and `IconScan.entries`.
+
+		Args:
+			full (optional): Ignore the cache, and parse every icon. Defaults to False.
+
+		Raises:
+			ExceptionGroup: If any changed icon is not a valid SVG document.
+
+		Returns:
+			The scan result.
+		"""
+		cache = {} if full else self.load_cache()
+		result = IconScan()
+		entries = {}
+
+		with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="icons") as executor:
+			stats = self.walk(executor)
+
+			for path, stat in stats.items():
+				cached = cache.get(path)
+
+				if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+					entries[path] = cached
+
+				else:
+					result.changed.append(path)
+
+			result.changed.sort()
+			futures = {path: executor.submit(extract_icon_metadata, self.root / path) for path in result.changed}
+			errors = []
+
+			for path, future in futures.items():
+				try:
+					stat = stats[path]
+					entries[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "metadata": future.result()}
+
+				except ValueError as e:
+					errors.append(e)
+
+		if errors:
+			raise ExceptionGroup(f"Failed to scan {len(errors)} icons", errors)
+
+		result.removed = sorted(set(cache) - set(stats))
+		result.entries = {path: entries[path] for path in sorted(entries)}
+		result.icons = {path: entry["metadata"] for path, entry in result.entries.items()}
+
+		logger.debug(
+			f"Scanned {len(stats)} icons in {self.root}: {len(result.changed)} new or changed, "
+			f"{len(result.removed)} removed",
+		)
+
+		return result
+
+
+def new_manifest_entry(path: str, metadata: IconMetadata) -> dict[str, Any]:
+	"""
+	Build the manifest entry of a new icon.
+
+	The slug and label are derived from the file name, and the color from the dominant fill
+	of the icon, so they should be reviewed before building.
+
+	Args:
+		path: The path of the icon, relative to the icon directory.
+		metadata: The icon metadata.
+
+	Returns:
+		The manifest entry.
+	"""
+	slug = Path(path).with_suffix("").as_posix().replace("/", "-").lower()
+	fill = next((fill for fill in metadata["fills"] if fill.startswith("#")), None)
+
+	return {
+		"logo": path,
+		"slug": slug,
+		"label": slug.replace("-", " ").title(),
+		"message": None,
+		"style": None,
+		"color": {"class": "hex", "value": fill.removeprefix("#")}
+		if fill
+		else {"class": "named_color", "value": "blue"},
+		"label_color": None,
+		"logo_color": None,
+		"font": None,
+		"icon": metadata,
+	}
+
+
+def merge_icons(manifest: dict[str, Any], scan: IconScan) -> int:
+	"""
+	Merge the new and changed icons of a scan into a manifest, in place.
+
+	The entries of changed icons get their new metadata, under the `icon` key, and icons no
+	entry uses get a new entry. Only the changed icons are visited, and entries of removed
+	icons are kept, as they are authored by hand.
+
+	Args:
+		manifest: The manifest.
+		scan: The scan result.
+
+	Returns:
+		The number of entries added or updated.
+	"""
+	entries_by_logo: dict[str, list[dict[str, Any]]] = {}
+
+	for entry in manifest["data"]:
+		entries_by_logo.setdefault(entry["logo"], []).append(entry)
+
+	merged = 0
+
+	for path in scan.changed:
+		metadata = scan.icons[path]
+
+		if path not in entries_by_logo:
+			manifest["data"].append(new_manifest_entry(path, metadata))
+			logger.info(f"Added new icon {path} to the manifest")
+			merged += 1
+			continue
+
+		for entry in entries_by_logo[path]:
+			if entry.get("icon") != metadata:
+				entry["icon"] = metadata
+				merged += 1
+
+	for path in scan.removed:
+		if path in entries_by_logo:
+			logger.warning(f"Icon {path} was removed, but is still used by {len(entries_by_logo[path])} entries")
+
+	return merged
+
+
+def update_manifest(
+	manifest_path: str | Path,
+	base_dir: str | Path,
+	cache_path: str | Path = DEFAULT_CACHE_PATH,
+	*,
+	full: bool = False,
+) -> int:
+	"""
+	Scan the icon directory of a manifest, and merge the new and changed icons into it.
+
+	The manifest is only written if an entry changed, and keeps its formatting. The scan cache
+	is only saved once the manifest is written, so a failed merge is retried by the next run.
+
+	Args:
+		manifest_path: Path to the manifest file.
+		base_dir: Directory the icon directory of the manifest (`root`) is relative to.
+		cache_path (optional): Path to the scan cache. Defaults to `DEFAULT_CACHE_PATH`.
+		full (optional): Ignore the cache, and parse every icon. Defaults to False.
+
+	Returns:
+		The number of entries added or updated.
+	"""
+	with Path(manifest_path).open(encoding="utf-8") as f:
+		manifest = json.load(f)
+
+	scanner = IconScanner(Path(base_dir) / manifest["root"], cache_path, manifest_path=manifest_path)
+	scan = scanner.scan(full=full)
+	merged = merge_icons(manifest, scan) if scan.changed or scan.removed else 0
+
+	if merged:
+		write_if_changed(manifest_path, json.dumps(manifest, indent=2, ensure_ascii=False))
+
+	scanner.save_cache(scan.entries)
+
+	return merged
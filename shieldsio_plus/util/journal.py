@@ -0,0 +1,203 @@
+import json
+import os
+from hashlib import sha256
+from pathlib import Path
+from types import TracebackType
+from typing import Any, NamedTuple, Optional, Self
+
+from loguru import logger
+
+from shieldsio_plus.util.files import file_digest
+
+
+class JournalEntry(NamedTuple):
+	"""
+	A badge completed by a build, as kept in memory.
+
+	Attributes:
+		url_hash: SHA-256 hex digest of the Shields.io URL of the badge.
+		hash: SHA-256 hex digest of the written badge file.
+		offset: Offset of the line of the badge in the journal file, holding its metadata record.
+	"""
+
+	url_hash: str
+	hash: str
+	offset: int
+
+
+def _url_hash(url: str) -> str:
+	return sha256(url.encode()).hexdigest()
+
+
+class BuildJournal:
+	"""
+	Append-only journal of the badges completed by a build, used to resume interrupted builds.
+
+	Every completed badge is appended as a JSON line holding its key, the digest of its file
+	and its metadata record. Lines are fsynced in batches of `batch_size`, so a crash loses
+	at most one batch of progress. A truncated last line, left by a crash mid-write, is
+	ignored when loading.
+
+	Only the digests of the URL and file of every badge, and the offset of its line, are
+	kept in memory: records are read back from the file on demand, see `read_record`.
+
+	The journal only exists while a build is in progress: it is removed once the build is
+	finalized, so its presence means the previous build was interrupted.
+
+	Attributes:
+		path: Path to the journal file.
+		batch_size: Number of entries appended between two fsyncs.
+		entries: Completed badges, by key, including the ones loaded from a previous build.
+	"""
+
+	def __init__(self, path: str | Path, batch_size: int = 64) -> None:  # noqa: D107
+		self.path = Path(path)
+		self.batch_size = batch_size
+		self.entries: dict[str, JournalEntry] = {}
+		self.__pending = 0
+		self.__file = None
+		self.__reader = None
+
+		self.load()
+
+	def load(self) -> int:
+		"""
+		Load the entries of a previous build from the journal file.
+
+		Returns:
+			The number of loaded entries.
+		"""
+		if not self.path.exists():
+			return 0
+
+		offset = 0
+
+		with self.path.open("rb") as f:
+			for line in f:
+				try:
+					data = json.loads(line)
+					self.entries[data["key"]] = JournalEntry(
+						_url_hash(data["record"]["shields_io_url"]),
+						data["hash"],
+						offset,
+					)
+
+				except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+					logger.warning(f"Ignoring truncated entry in {self.path}")
+
+				offset += len(line)
+
+		logger.info(f"Resuming build: {len(self.entries)} badges already completed.")
+
+		return len(self.entries)
+
+	def is_complete(self, key: str, url: str, path: str | Path) -> bool:
+		"""
+		Check if a badge was completed and is still up to date.
+
+		Args:
+			key: The badge key.
+			url: The Shields.io URL of the badge, to detect changed badges.
+			path: Path to the badge file.
+
+		Returns:
+			True if the badge was completed for the same URL and its file is unchanged.
+		"""
+		entry = self.entries.get(key)
+
+		return entry is not None and entry.url_hash == _url_hash(url) and file_digest(path) == entry.hash
+
+	def read_record(self, key: str) -> dict[str, Any]:
+		"""
+		Read the metadata record of a completed badge back from the journal file.
+
+		Args:
+			key: The key of a badge of `entries`.
+
+		Returns:
+			The badge metadata, as written to the badges JSON file.
+		"""
+		offset = self.entries[key].offset
+
+		# Entries of this build may still be buffered
+		if self.__file is not None:
+			self.__file.flush()
+
+		if self.__reader is None:
+			self.__reader = self.path.open("rb")
+
+		self.__reader.seek(offset)
+
+		return json.loads(self.__reader.readline())["record"]
+
+	def __is_truncated(self) -> bool:
+		try:
+			with self.path.open("rb") as f:
+				f.seek(-1, os.SEEK_END)
+				return f.read(1) != b"\n"
+
+		except OSError:
+			return False
+
+	def record(self, key: str, digest: str, record: dict[str, Any]) -> None:
+		"""
+		Append a completed badge to the journal.
+
+		Args:
+			key: The badge key.
+			digest: SHA-256 hex digest of the written badge file.
+			record: The badge metadata.
+		"""
+		if self.__file is None:
+			self.path.parent.mkdir(parents=True, exist_ok=True)
+			truncated = self.__is_truncated()
+			self.__file = self.path.open("ab")
+
+			# Terminate a line truncated by a crash, so that the next entry stays readable
+			if truncated:
+				self.__file.write(b"\n")
+
+		self.entries[key] = JournalEntry(_url_hash(record["shields_io_url"]), digest, self.__file.tell())
+		self.__file.write(json.dumps({"key": key, "hash": digest, "record": record}).encode() + b"\n")
+		self.__pending += 1
+
+		if self.__pending >= self.batch_size:
+			self.flush()
+
+	def flush(self) -> None:
+		"""Write the appended entries to disk."""
+		if self.__file is None or not self.__pending:
+			return
+
+		self.__file.flush()
+		os.fsync(self.__file.fileno())
+		self.__pending = 0
+
+	def close(self) -> None:
+		"""Write the appended entries to disk and close the journal file."""
+		self.flush()
+
+		if self.__file is not None:
+			self.__file.close()
+			self.__file = None
+
+		if self.__reader is not None:
+			self.__reader.close()
+			self.__reader = None
+
+	def remove(self) -> None:
+		"""Delete the journal, once the build is finalized."""
+		self.close()
+		self.path.unlink(missing_ok=True)
+		self.entries.clear()
+
+	def __enter__(self) -> Self:  # noqa: D105
+		return self
+
+	def __exit__(  # noqa: D105
+		self,
+		exc_type: Optional[type[BaseException]],
+		exc_value: Optional[BaseException],
+		traceback: Optional[TracebackType],
+	) -> None:
+		self.close()
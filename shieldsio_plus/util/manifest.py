@@ -1,6 +1,8 @@
 import json
+from collections import Counter
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional, TypedDict
+from typing import Any, Optional, TypedDict
 
 from loguru import logger
 
@@ -8,6 +10,7 @@ from shieldsio_plus.common.enums.css_named_colors import CSSNamedColor
 from shieldsio_plus.common.enums.shields_io_badge_styles import ShieldsIOBadgeStyle
 from shieldsio_plus.common.enums.shields_io_named_colors import ShieldsIONamedColor
 from shieldsio_plus.common.enums.web_safe_fonts import WebSafeFont
+from shieldsio_plus.common.types.ansi_color import ANSIColor
 from shieldsio_plus.common.types.hex_code import HexColor
 from shieldsio_plus.common.types.svg import SVG
 
@@ -64,15 +67,13 @@ def validate_manifest(path: str = "assets/data/manifest.json") -> None:  # noqa:
 
 	found_errors = []
 
-	slugs = [dic["slug"] for dic in manifest["data"]]
+	slug_counts = Counter(dic["slug"] for dic in manifest["data"] if "slug" in dic)
 
 	if not Path(manifest["root"]).exists() or not Path(manifest["root"]).is_dir():
 		found_errors.append(ValidationError(f"Root directory {manifest['root']} does not exist or is not a directory"))
 
-	if len(set(slugs)) != len(slugs):
-		found_errors.append(
-			ValidationError(f"Duplicate slugs found: { {item for item in slugs if slugs.count(item) > 1} }"),
-		)
+	if duplicates := {slug for slug, count in slug_counts.items() if count > 1}:
+		found_errors.append(ValidationError(f"Duplicate slugs found: {duplicates}"))
 
 	root_dir = manifest["root"]
 
@@ -117,7 +118,8 @@ def load_manifest_color(color: ManifestColor) -> HexColor:  # noqa: PLR0911, RET
 		ValidationError: The named color is invalid.
 
 	Returns:
-		The loaded color.
+		The loaded color. ANSI colors, given by palette index or named color slug, are
+		loaded with their xterm default value.
 	"""
 	if color["class"] == "hex":
 		return HexColor(color["value"])
@@ -135,10 +137,40 @@ def load_manifest_color(color: ManifestColor) -> HexColor:  # noqa: PLR0911, RET
 		return HexColor.from_hsla(color["value"])
 
 	if color["class"] == "named_color":
+		name = color["value"].replace("-", "_").upper()
+
 		if color["value"] in ShieldsIONamedColor.slugs():
-			return HexColor.from_css(ShieldsIONamedColor(color["value"].replace("-", "_").upper()))
+			return HexColor.from_css(ShieldsIONamedColor[name])
 
-		if color["value"] in CSSNamedColor.names:
-			return HexColor.from_css(CSSNamedColor(color["value"].replace("-", "_").upper()))
+		if name in CSSNamedColor.names:
+			return HexColor.from_css(CSSNamedColor[name])
 
 		raise ValidationError(f"Invalid named color: {color['value']}")
+
+	if color["class"] == "ansi":
+		return HexColor.from_ansi(ANSIColor.parse(color["value"]))
+
+
+def load_badge_params(entry: dict[str, Any], root: str) -> dict[str, Any]:
+	"""
+	Load the ShieldsIOBadge parameters of a manifest entry.
+
+	Args:
+		entry: The manifest entry.
+		root: Directory holding the logo files.
+
+	Returns:
+		The badge parameters, without the unset ones.
+	"""
+	params = {
+		"slug": entry["slug"],
+		"label": entry["label"],
+		"logo": SVG.from_file(root + entry["logo"]),
+		"message": entry["message"],
+		"color": load_manifest_color(entry["color"]),
+		"label_color": load_manifest_color(entry["label_color"]) if entry.get("label_color") else None,
+		"logo_color": load_manifest_color(entry["logo_color"]) if entry.get("logo_color") else None,
+		"font": WebSafeFont.from_family_name(entry["logo_font"]) if entry.get("logo_font") else WebSafeFont.DEFAULT,
+	}
+
+	return dict(filter(itemgetter(1), params.items()))
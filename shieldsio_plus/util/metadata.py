@@ -3,6 +3,7 @@ from contextlib import suppress
 from getpass import getuser
 from pathlib import Path
 from time import time
+from typing import Optional
 
 from loguru import logger
 
@@ -34,17 +35,26 @@ def write_metadata(metadata_path: str = "./assets/data/metadata") -> None:
 def should_run(
 	manifest_path: str = "./assets/data/manifest.json",
 	metadata_path: str = "./assets/data/metadata",
+	journal_path: Optional[str] = None,
 ) -> bool:
 	"""
 	Check if the script should run based on the last run time.
 
+	The script always runs while the journal of an interrupted build exists, so that the
+	build is resumed and finalized.
+
 	Args:
 		manifest_path (optional): The path to the manifest file. Defaults to "./assets/data/manifest".
 		metadata_path (optional): The path to the metadata file. Defaults to "./assets/data/metadata".
+		journal_path (optional): The path to the build journal. Defaults to None.
 
 	Returns:
 		bool: True if the script should run, False otherwise.
 	"""
+	if journal_path and Path(journal_path).exists():
+		logger.debug("Found the journal of an interrupted build.")
+		return True
+
 	metadata = ConfigParser()
 	metadata.read(Path(metadata_path).resolve())
 
@@ -0,0 +1,371 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Generator
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from typing import ClassVar
+
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+	"""
+	Format a label set in the Prometheus text format.
+
+	Args:
+		names: Label names.
+		values: Label values, in the same order as `names`.
+		extra (optional): Already formatted extra label (e.g. `le="0.5"`). Defaults to "".
+
+	Returns:
+		The formatted label set, or an empty string if there are no labels.
+	"""
+	labels = [
+		f'{name}="{value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")}"'
+		for name, value in zip(names, values, strict=True)
+	]
+
+	if extra:
+		labels.append(extra)
+
+	return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def _format_value(value: float) -> str:
+	"""
+	Format a sample value in the Prometheus text format.
+
+	Args:
+		value: The sample value.
+
+	Returns:
+		The formatted value.
+	"""
+	if value == float("inf"):
+		return "+Inf"
+
+	return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+	"""
+	Base class for metrics exposed in the Prometheus text format.
+
+	Attributes:
+		name: The metric name.
+		documentation: The metric help text.
+		labelnames: Names of the labels the metric is partitioned by.
+	"""
+
+	type_: ClassVar[str] = "untyped"
+
+	def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+		self.name = name
+		self.documentation = documentation
+		self.labelnames = labelnames
+		self._lock = Lock()
+
+	def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+		if set(labels) != set(self.labelnames):
+			raise ValueError(f"Invalid labels for {self.name}: {labels}, expected {self.labelnames}")
+
+		return tuple(str(labels[name]) for name in self.labelnames)
+
+	@abstractmethod
+	def _samples(self) -> list[str]:
+		"""
+		Render the samples of the metric, called under its lock.
+
+		Returns:
+			The sample lines, in the Prometheus text format.
+		"""
+
+	def expose(self) -> str:
+		"""
+		Render the metric in the Prometheus text format.
+
+		Returns:
+			The metric help, type and samples.
+		"""
+		with self._lock:
+			samples = self._samples()
+
+		return "\n".join([f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_}", *samples])
+
+
+class Counter(_Metric):
+	"""A monotonically increasing counter."""
+
+	type_: ClassVar[str] = "counter"
+
+	def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:  # noqa: D107
+		super().__init__(name, documentation, labelnames)
+		self.__values: dict[tuple[str, ...], float] = {} if labelnames else {(): 0.0}
+
+	def inc(self, amount: float = 1.0, **labels: str) -> None:
+		"""
+		Increment the counter.
+
+		Args:
+			amount (optional): Amount to increment by. Defaults to 1.0.
+			**labels: Label values of the incremented series.
+
+		Raises:
+			ValueError: If `amount` is negative.
+		"""
+		if amount < 0:
+			raise ValueError("Counters can only be incremented")
+
+		key = self._key(labels)
+
+		with self._lock:
+			self.__values[key] = self.__values.get(key, 0.0) + amount
+
+	def get(self, **labels: str) -> float:
+		"""
+		Get the current value of a series.
+
+		Args:
+			**labels: Label values of the series.
+
+		Returns:
+			The current value, 0.0 if the series was never incremented.
+		"""
+		return self.__values.get(self._key(labels), 0.0)
+
+	def _samples(self) -> list[str]:
+		return [
+			f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+			for key, value in sorted(self.__values.items())
+		]
+
+
+class Gauge(_Metric):
+	"""A value that can go up and down."""
+
+	type_: ClassVar[str] = "gauge"
+
+	def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:  # noqa: D107
+		super().__init__(name, documentation, labelnames)
+		self.__values: dict[tuple[str, ...], float] = {} if labelnames else {(): 0.0}
+
+	def inc(self, amount: float = 1.0, **labels: str) -> None:
+		"""
+		Increment the gauge.
+
+		Args:
+			amount (optional): Amount to increment by. Defaults to 1.0.
+			**labels: Label values of the series.
+		"""
+		key = self._key(labels)
+
+		with self._lock:
+			self.__values[key] = self.__values.get(key, 0.0) + amount
+
+	def dec(self, amount: float = 1.0, **labels: str) -> None:
+		"""
+		Decrement the gauge.
+
+		Args:
+			amount (optional): Amount to decrement by. Defaults to 1.0.
+			**labels: Label values of the series.
+		"""
+		self.inc(-amount, **labels)
+
+	def set(self, value: float, **labels: str) -> None:
+		"""
+		Set the gauge to a value.
+
+		Args:
+			value: The new value.
+			**labels: Label values of the series.
+		"""
+		key = self._key(labels)
+
+		with self._lock:
+			self.__values[key] = value
+
+	def get(self, **labels: str) -> float:
+		"""
+		Get the current value of a series.
+
+		Args:
+			**labels: Label values of the series.
+
+		Returns:
+			The current value, 0.0 if the series was never set.
+		"""
+		return self.__values.get(self._key(labels), 0.0)
+
+	def _samples(self) -> list[str]:
+		return [
+			f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+			for key, value in sorted(self.__values.items())
+		]
+
+
+class Histogram(_Metric):
+	"""A histogram of observed values, with cumulative buckets."""
+
+	type_: ClassVar[str] = "histogram"
+
+	def __init__(  # noqa: D107
+		self,
+		name: str,
+		documentation: str,
+		labelnames: tuple[str, ...] = (),
+		buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+	) -> None:
+		super().__init__(name, documentation, labelnames)
+		self.buckets = tuple(sorted(buckets))
+		self.__series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+		if not labelnames:
+			self.__series[()] = ([0] * (len(self.buckets) + 1), [0.0])
+
+	def observe(self, value: float, **labels: str) -> None:
+		"""
+		Observe a value.
+
+		Args:
+			value: The observed value.
+			**labels: Label values of the series.
+		"""
+		key = self._key(labels)
+
+		with self._lock:
+			counts, total = self.__series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+			counts[bisect_left(self.buckets, value)] += 1
+			total[0] += value
+
+	@contextmanager
+	def time(self, **labels: str) -> Generator[None]:
+		"""
+		Observe the duration of the enclosed block, in seconds.
+
+		Args:
+			**labels: Label values of the series.
+
+		Yields:
+			None.
+		"""
+		start = perf_counter()
+
+		try:
+			yield
+
+		finally:
+			self.observe(perf_counter() - start, **labels)
+
+	def _samples(self) -> list[str]:
+		samples = []
+
+		for key, (counts, total) in sorted(self.__series.items()):
+			cumulative = 0
+
+			for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+				cumulative += count
+				le = f'le="{_format_value(bound)}"'
+				samples.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+
+			samples.extend((
+				f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total[0])}",
+				f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}",
+			))
+
+		return samples
+
+
+class MetricsRegistry:
+	"""A collection of metrics exposed together."""
+
+	def __init__(self) -> None:  # noqa: D107
+		self.__metrics: dict[str, _Metric] = {}
+
+	def register[T: _Metric](self, metric: T) -> T:
+		"""
+		Register a metric.
+
+		Args:
+			metric: The metric to register.
+
+		Raises:
+			ValueError: If a metric with the same name is already registered.
+
+		Returns:
+			The registered metric.
+		"""
+		if metric.name in self.__metrics:
+			raise ValueError(f"Metric already registered: {metric.name}")
+
+		self.__metrics[metric.name] = metric
+		return metric
+
+	def expose(self) -> str:
+		"""
+		Render every registered metric in the Prometheus text format.
+
+		Returns:
+			The exposition text.
+		"""
+		return "\n".join(metric.expose() for metric in self.__metrics.values()) + "\n"
+
+
+# Shared registry and the metrics of the badge service
+registry = MetricsRegistry()
+
+REQUESTS_IN_FLIGHT = registry.register(
+	Gauge("shieldsio_plus_requests_in_flight", "Number of HTTP requests currently being served."),
+)
+REQUEST_DURATION = registry.register(
+	Histogram(
+		"shieldsio_plus_request_duration_seconds",
+		"HTTP request latency in seconds.",
+		("method", "status"),
+	),
+)
+RENDER_DURATION = registry.register(
+	Histogram("shieldsio_plus_render_duration_seconds", "Badge render latency in seconds.", ("style",)),
+)
+CACHE_LOOKUPS = registry.register(
+	Counter("shieldsio_plus_cache_lookups", "Render cache lookups, by tier and result.", ("tier", "result")),
+)
+RENDER_CACHE_BYTES = registry.register(
+	Gauge("shieldsio_plus_render_cache_bytes", "Size of the in-process render cache, in bytes."),
+)
+RENDER_CACHE_EVICTIONS = registry.register(
+	Counter("shieldsio_plus_render_cache_evictions", "Entries evicted from the in-process render cache.", ("reason",)),
+)
+UPSTREAM_FETCH_DURATION = registry.register(
+	Histogram("shieldsio_plus_upstream_fetch_duration_seconds", "Upstream fetch latency in seconds."),
+)
+UPSTREAM_FETCH_ERRORS = registry.register(
+	Counter("shieldsio_plus_upstream_fetch_errors", "Failed upstream fetches, by reason.", ("reason",)),
+)
+UPSTREAM_RATE = registry.register(
+	Gauge("shieldsio_plus_upstream_rate", "Current upstream request rate limit, in requests per second.", ("limiter",)),
+)
+UPSTREAM_CONCURRENCY_LIMIT = registry.register(
+	Gauge("shieldsio_plus_upstream_concurrency_limit", "Current upstream concurrency limit.", ("limiter",)),
+)
+UPSTREAM_IN_FLIGHT = registry.register(
+	Gauge("shieldsio_plus_upstream_in_flight", "Number of upstream requests in flight.", ("limiter",)),
+)
+UPSTREAM_QUEUE_DEPTH = registry.register(
+	Gauge("shieldsio_plus_upstream_queue_depth", "Number of upstream requests waiting for the limiter.", ("limiter",)),
+)
+UPSTREAM_THROTTLES = registry.register(
+	Counter("shieldsio_plus_upstream_throttles", "Upstream requests throttled by the upstream.", ("limiter",)),
+)
+
+
+def record_cache_lookup(tier: str, *, hit: bool) -> None:
+	"""
+	Record a render cache lookup.
+
+	Args:
+		tier: Name of the cache tier.
+		hit: Whether the lookup was a hit.
+	"""
+	CACHE_LOOKUPS.inc(tier=tier, result="hit" if hit else "miss")
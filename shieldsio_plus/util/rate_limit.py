@@ -0,0 +1,245 @@
+from collections.abc import Generator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from math import floor, isfinite
+from threading import Condition
+from time import monotonic
+from typing import Optional
+
+from loguru import logger
+
+from shieldsio_plus.util.metrics import (
+	UPSTREAM_CONCURRENCY_LIMIT,
+	UPSTREAM_IN_FLIGHT,
+	UPSTREAM_QUEUE_DEPTH,
+	UPSTREAM_RATE,
+	UPSTREAM_THROTTLES,
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+	"""
+	Parse the value of a `Retry-After` header.
+
+	Args:
+		value: The header value, either a number of seconds or an HTTP date.
+
+	Returns:
+		The number of seconds to wait, or None if the value is missing or invalid.
+	"""
+	if not value:
+		return None
+
+	if value.strip().isdigit():
+		return float(value)
+
+	try:
+		date = parsedate_to_datetime(value)
+
+	except (TypeError, ValueError):
+		return None
+
+	return max((date - datetime.now(UTC)).total_seconds(), 0.0)
+
+
+class AdaptiveRateLimiter:
+	"""
+	Token-bucket rate limiter with an AIMD (additive increase, multiplicative decrease) concurrency limit.
+
+	Requests take a token from a bucket refilled at `rate` tokens per second, holding at most
+	`burst` tokens, and a slot among `concurrency` concurrent requests. Every successful
+	request grows the concurrency limit by `1 / concurrency` (one slot per round trip) and the
+	rate back towards `max_rate`. A throttled request halves both (at most once per
+	`decrease_interval`, since concurrent requests are usually throttled together), and
+	pauses every request until the upstream `Retry-After` delay has elapsed, up to
+	`max_backoff`.
+
+	The current rate, concurrency limit, in-flight requests and queue depth are exposed as
+	properties, and published as gauges labelled with the limiter name.
+
+	Attributes:
+		name: Name of the limiter, used as the metrics label.
+		max_rate: Maximum rate, in requests per second.
+		burst: Maximum number of tokens in the bucket.
+		min_concurrency: Lower bound of the concurrency limit.
+		max_concurrency: Upper bound of the concurrency limit.
+		decrease_factor: Factor applied to the rate and concurrency limit when throttled.
+		decrease_interval: Minimum delay between two decreases, in seconds.
+		default_backoff: Pause when throttled without a `Retry-After` header, in seconds.
+		max_backoff: Longest pause when throttled, whatever the `Retry-After` header, in seconds.
+		max_retries: Number of times a throttled request is retried.
+	"""
+
+	def __init__(  # noqa: PLR0913
+		self,
+		name: str = "upstream",
+		max_rate: float = 20.0,
+		burst: int = 10,
+		min_concurrency: int = 1,
+		max_concurrency: int = 16,
+		*,
+		decrease_factor: float = 0.5,
+		decrease_interval: float = 1.0,
+		default_backoff: float = 1.0,
+		max_backoff: float = 60.0,
+		max_retries: int = 5,
+	) -> None:
+		"""
+		Create a limiter, starting at its maximum rate and concurrency.
+
+		Raises:
+			ValueError: If the rate is not a positive number, or a limit is below 1.
+		"""
+		if not (isfinite(max_rate) and max_rate > 0):
+			raise ValueError(f"Invalid upstream rate: {max_rate}, should be a positive number of requests per second")
+
+		if burst < 1 or min_concurrency < 1 or max_concurrency < min_concurrency:
+			raise ValueError(
+				f"Invalid limits: burst {burst} and concurrency {min_concurrency} to {max_concurrency}, should be "
+				"at least 1",
+			)
+
+		self.name = name
+		self.max_rate = max_rate
+		self.burst = burst
+		self.min_concurrency = min_concurrency
+		self.max_concurrency = max_concurrency
+		self.decrease_factor = decrease_factor
+		self.decrease_interval = decrease_interval
+		self.default_backoff = default_backoff
+		self.max_backoff = max_backoff
+		self.max_retries = max_retries
+
+		self.__rate = max_rate
+		self.__concurrency = float(max_concurrency)
+		self.__tokens = float(burst)
+		self.__refilled_at = monotonic()
+		self.__paused_until = 0.0
+		self.__decreased_at = float("-inf")
+		self.__in_flight = 0
+		self.__waiting = 0
+		self.__condition = Condition()
+
+		self.__publish()
+
+	@property
+	def rate(self) -> float:
+		"""The current rate, in requests per second."""
+		return self.__rate
+
+	@property
+	def concurrency(self) -> int:
+		"""The current concurrency limit."""
+		return floor(self.__concurrency)
+
+	@property
+	def in_flight(self) -> int:
+		"""The number of requests currently holding a slot."""
+		return self.__in_flight
+
+	@property
+	def queue_depth(self) -> int:
+		"""The number of requests waiting for a token or a slot."""
+		return self.__waiting
+
+	def __publish(self) -> None:
+		UPSTREAM_RATE.set(self.__rate, limiter=self.name)
+		UPSTREAM_CONCURRENCY_LIMIT.set(self.concurrency, limiter=self.name)
+		UPSTREAM_IN_FLIGHT.set(self.__in_flight, limiter=self.name)
+		UPSTREAM_QUEUE_DEPTH.set(self.__waiting, limiter=self.name)
+
+	def __refill(self, now: float) -> None:
+		self.__tokens = min(self.burst, self.__tokens + (now - self.__refilled_at) * self.__rate)
+		self.__refilled_at = now
+
+	def __wait_time(self, now: float) -> Optional[float]:
+		"""
+		Get how long to wait before a request can start.
+
+		Args:
+			now: The current monotonic time.
+
+		Returns:
+			0 if the request can start, the number of seconds to wait, or None to wait for a
+			slot to be released.
+		"""
+		if now < self.__paused_until:
+			return self.__paused_until - now
+
+		if self.__in_flight >= self.concurrency:
+			return None
+
+		self.__refill(now)
+
+		if self.__tokens < 1:
+			return (1 - self.__tokens) / self.__rate
+
+		return 0
+
+	@contextmanager
+	def acquire(self) -> Generator[None]:
+		"""
+		Wait for a token and a concurrency slot, and hold the slot in the enclosed block.
+
+		Yields:
+			None.
+		"""
+		with self.__condition:
+			self.__waiting += 1
+			self.__publish()
+
+			try:
+				while (wait := self.__wait_time(monotonic())) != 0:
+					self.__condition.wait(wait)
+
+			finally:
+				self.__waiting -= 1
+
+			self.__tokens -= 1
+			self.__in_flight += 1
+			self.__publish()
+
+		try:
+			yield
+
+		finally:
+			with self.__condition:
+				self.__in_flight -= 1
+				self.__publish()
+				self.__condition.notify_all()
+
+	def on_success(self) -> None:
+		"""Additively increase the concurrency limit and the rate after a successful request."""
+		with self.__condition:
+			self.__concurrency = min(self.max_concurrency, self.__concurrency + 1 / self.__concurrency)
+			self.__rate = min(self.max_rate, self.__rate + self.max_rate / (10 * self.max_concurrency))
+			self.__publish()
+			self.__condition.notify_all()
+
+	def on_throttle(self, retry_after: Optional[float] = None) -> None:
+		"""
+		Multiplicatively decrease the concurrency limit and the rate after a throttled request.
+
+		Args:
+			retry_after (optional): Delay requested by the upstream, in seconds, capped by
+				`max_backoff`. Defaults to None, pausing for `default_backoff`.
+		"""
+		pause = min(max(self.default_backoff if retry_after is None else retry_after, 0.0), self.max_backoff)
+
+		with self.__condition:
+			now = monotonic()
+
+			if now - self.__decreased_at >= self.decrease_interval:
+				self.__concurrency = max(self.min_concurrency, self.__concurrency * self.decrease_factor)
+				self.__rate = max(self.max_rate / 100, self.__rate * self.decrease_factor)
+				self.__decreased_at = now
+
+			self.__paused_until = max(self.__paused_until, now + pause)
+			self.__tokens = min(self.__tokens, 0)
+			self.__publish()
+
+		UPSTREAM_THROTTLES.inc(limiter=self.name)
+		logger.warning(
+			f"Throttled by upstream, pausing {pause:.1f} s (rate {self.__rate:.1f}/s, concurrency {self.concurrency}).",
+		)
@@ -0,0 +1,250 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from threading import Lock
+from time import monotonic, time
+from typing import Any, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from loguru import logger
+
+from shieldsio_plus.util.metrics import RENDER_CACHE_BYTES, RENDER_CACHE_EVICTIONS, record_cache_lookup
+
+# Default TTL of rendered badges, in seconds
+DEFAULT_TTL = 24 * 60 * 60
+
+# Default size of the in-process tier, in bytes
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class _Entry(NamedTuple):
+	value: str
+	size: int
+	expires_at: float
+
+
+class ByteLRU:
+	"""
+	Thread-safe LRU cache of strings, bounded by the total size of its values in bytes.
+
+	Entries expire after `ttl` seconds, and the least recently used entries are evicted
+	until a new entry fits. Values larger than the whole cache are not stored.
+
+	Attributes:
+		max_bytes: Maximum total size of the values, in bytes (UTF-8 encoded).
+		ttl: Time to live of the entries, in seconds.
+		stats: Number of hits, misses, and entries evicted to fit new ones or on expiry.
+	"""
+
+	def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL) -> None:  # noqa: D107
+		self.max_bytes = max_bytes
+		self.ttl = ttl
+		self.stats: dict[str, int] = {"hits": 0, "misses": 0, "evicted": 0, "expired": 0}
+		self.__entries: OrderedDict[str, _Entry] = OrderedDict()
+		self.__size = 0
+		self.__lock = Lock()
+
+	@property
+	def size(self) -> int:
+		"""The total size of the cached values, in bytes."""
+		return self.__size
+
+	def __len__(self) -> int:  # noqa: D105
+		return len(self.__entries)
+
+	def __remove(self, key: str, reason: str) -> None:
+		entry = self.__entries.pop(key)
+		self.__size -= entry.size
+		self.stats[reason] += 1
+		RENDER_CACHE_EVICTIONS.inc(reason=reason)
+
+	def get(self, key: str) -> Optional[str]:
+		"""
+		Get a cached value, and mark it as the most recently used.
+
+		Args:
+			key: The cache key.
+
+		Returns:
+			The value, or None if it is missing or expired.
+		"""
+		with self.__lock:
+			entry = self.__entries.get(key)
+
+			if entry is not None and entry.expires_at <= monotonic():
+				self.__remove(key, "expired")
+				RENDER_CACHE_BYTES.set(self.__size)
+				entry = None
+
+			if entry is None:
+				self.stats["misses"] += 1
+				return None
+
+			self.__entries.move_to_end(key)
+			self.stats["hits"] += 1
+
+			return entry.value
+
+	def set(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+		"""
+		Cache a value, evicting the least recently used entries until it fits.
+
+		Args:
+			key: The cache key.
+			value: The value.
+			ttl (optional): Time to live of the entry, in seconds. Defaults to None, using `ttl`.
+
+		Returns:
+			True if the value was cached, False if it is larger than the whole cache.
+		"""
+		size = len(value.encode("utf-8"))
+
+		if size > self.max_bytes:
+			return False
+
+		with self.__lock:
+			if key in self.__entries:
+				self.__size -= self.__entries.pop(key).size
+
+			while self.__entries and self.__size + size > self.max_bytes:
+				self.__remove(next(iter(self.__entries)), "evicted")
+
+			self.__entries[key] = _Entry(value, size, monotonic() + (self.ttl if ttl is None else ttl))
+			self.__size += size
+			RENDER_CACHE_BYTES.set(self.__size)
+
+		return True
+
+	def clear(self) -> None:
+		"""Remove every entry."""
+		with self.__lock:
+			self.__entries.clear()
+			self.__size = 0
+			RENDER_CACHE_BYTES.set(0)
+
+
+class TieredRenderCache:
+	"""
+	Two-tier cache of rendered badges, keyed by the render hash of the badges.
+
+	The first tier is a per-process `ByteLRU`, the second a Django cache backend shared by
+	every worker process (e.g. file-based or memcached), so a badge rendered by one worker
+	is reused by the others. Hits in the shared tier are copied into the local one for the
+	rest of their lifetime only: the shared tier stores the expiry time of its entries next
+	to them, so copying never extends the TTL. Lookups are counted per tier, and a failing
+	shared backend is treated as a miss rather than failing the render.
+
+	Attributes:
+		local: The in-process tier.
+		alias: Alias of the shared Django cache, or None to only cache in process.
+		ttl: Time to live of the entries of both tiers, in seconds.
+	"""
+
+	def __init__(self, local: ByteLRU, alias: Optional[str] = None, ttl: float = DEFAULT_TTL) -> None:  # noqa: D107
+		self.local = local
+		self.alias = alias
+		self.ttl = ttl
+
+	@classmethod
+	def from_settings(cls) -> "TieredRenderCache":
+		"""
+		Create the cache configured by the `RENDER_CACHE` setting.
+
+		The setting holds the alias of the shared Django cache (`ALIAS`, None to disable the
+		shared tier), the size of the local tier in bytes (`MAX_BYTES`) and the TTL in seconds
+		(`TTL`).
+
+		Returns:
+			The configured cache.
+		"""
+		config: dict[str, Any] = getattr(settings, "RENDER_CACHE", {})
+		ttl = config.get("TTL", DEFAULT_TTL)
+
+		return cls(ByteLRU(config.get("MAX_BYTES", DEFAULT_MAX_BYTES), ttl), config.get("ALIAS"), ttl)
+
+	@staticmethod
+	def shared_key(key: str) -> str:
+		"""
+		Get the key of a render in the shared tier.
+
+		Args:
+			key: The render hash.
+
+		Returns:
+			The namespaced key.
+		"""
+		return f"render:{key}"
+
+	def get(self, key: str) -> Optional[str]:
+		"""
+		Get a rendered badge from the first tier holding it.
+
+		Args:
+			key: The render hash of the badge.
+
+		Returns:
+			The SVG content, or None if no tier holds it.
+		"""
+		value = self.local.get(key)
+		record_cache_lookup("local", hit=value is not None)
+
+		if value is not None or self.alias is None:
+			return value
+
+		try:
+			entry: Optional[tuple[str, float]] = caches[self.alias].get(self.shared_key(key))
+
+		except Exception as e:  # noqa: BLE001
+			logger.warning(f"Render cache backend `{self.alias}` failed: {e}")
+			entry = None
+
+		record_cache_lookup("shared", hit=entry is not None)
+
+		if entry is None:
+			return None
+
+		value, expires_at = entry
+
+		# Clocks of the worker hosts may differ, so never cache locally for longer than the TTL
+		if (remaining := min(expires_at - time(), self.ttl)) > 0:
+			self.local.set(key, value, ttl=remaining)
+
+		return value
+
+	def set(self, key: str, value: str) -> None:
+		"""
+		Store a rendered badge in both tiers.
+
+		Args:
+			key: The render hash of the badge.
+			value: The SVG content.
+		"""
+		self.local.set(key, value)
+
+		if self.alias is None:
+			return
+
+		try:
+			caches[self.alias].set(self.shared_key(key), (value, time() + self.ttl), timeout=self.ttl)
+
+		except Exception as e:  # noqa: BLE001
+			logger.warning(f"Render cache backend `{self.alias}` failed: {e}")
+
+	def get_or_render(self, key: str, render: Callable[[], str]) -> str:
+		"""
+		Get a rendered badge, rendering and caching it on a miss.
+
+		Args:
+			key: The render hash of the badge.
+			render: Function rendering the SVG content of the badge.
+
+		Returns:
+			The SVG content.
+		"""
+		value = self.get(key)
+
+		if value is None:
+			value = render()
+			self.set(key, value)
+
+		return value
@@ -0,0 +1,172 @@
+import heapq
+import re
+from hashlib import sha256
+from operator import itemgetter
+from pathlib import Path
+from typing import NamedTuple
+
+from loguru import logger
+
+from shieldsio_plus.util.download_shieldsio_badges import badges_index_path, read_badges_fragment, write_badges_json
+
+_FRAGMENT_NAME = re.compile(r"badges\.(\d+)-of-(\d+)\.jsonl")
+
+
+class Shard(NamedTuple):
+	"""
+	A partition of the manifest entries, built by its own process or machine.
+
+	Entries are assigned to shards by the hash of their slug, so every shard of a build holds
+	a stable, disjoint subset of the badges, whatever the order of the manifest.
+
+	Attributes:
+		index: Index of the shard, from 0 to `count - 1`.
+		count: Number of shards of the build.
+	"""
+
+	index: int
+	count: int
+
+	@classmethod
+	def parse(cls, value: str) -> "Shard":
+		"""
+		Parse a shard from its `i/N` notation.
+
+		Args:
+			value: The shard, e.g. `0/4` for the first of four shards.
+
+		Raises:
+			ValueError: If the value is not a valid shard.
+
+		Returns:
+			The shard.
+		"""
+		index, separator, count = value.partition("/")
+
+		try:
+			shard = cls(int(index), int(count))
+
+		except ValueError as e:
+			raise ValueError(f"Invalid shard: {value}, expected `i/N`") from e
+
+		if not separator or not 0 <= shard.index < shard.count:
+			raise ValueError(f"Invalid shard: {value}, expected `i/N` with 0 <= i < N")
+
+		return shard
+
+	@classmethod
+	def from_fragment_path(cls, path: str | Path) -> "Shard":
+		"""
+		Get the shard a fragment was written by.
+
+		Args:
+			path: Path of the fragment file.
+
+		Raises:
+			ValueError: If the file name is not a fragment name.
+
+		Returns:
+			The shard.
+		"""
+		match = _FRAGMENT_NAME.fullmatch(Path(path).name)
+
+		if match is None:
+			raise ValueError(f"Not a badges fragment: {path}")
+
+		return cls(int(match[1]), int(match[2]))
+
+	@staticmethod
+	def bucket(slug: str, count: int) -> int:
+		"""
+		Get the index of the shard a slug belongs to.
+
+		Args:
+			slug: The manifest entry slug.
+			count: Number of shards of the build.
+
+		Returns:
+			The shard index.
+		"""
+		return int.from_bytes(sha256(slug.encode("utf-8")).digest()[:8], "big") % count
+
+	def contains(self, slug: str) -> bool:
+		"""
+		Check if a manifest entry belongs to the shard.
+
+		Args:
+			slug: The manifest entry slug.
+
+		Returns:
+			True if the entry is built by this shard.
+		"""
+		return self.bucket(slug, self.count) == self.index
+
+	def fragment_path(self, directory: str | Path) -> Path:
+		"""
+		Get the path of the badges fragment written by the shard.
+
+		Args:
+			directory: Directory holding the fragments.
+
+		Returns:
+			The fragment path.
+		"""
+		return Path(directory) / f"badges.{self.index}-of-{self.count}.jsonl"
+
+	def __str__(self) -> str:  # noqa: D105
+		return f"{self.index}/{self.count}"
+
+
+def find_fragments(directory: str | Path) -> list[Path]:
+	"""
+	Find the fragments of a sharded build, and check that every shard is present.
+
+	Args:
+		directory: Directory holding the fragments.
+
+	Raises:
+		FileNotFoundError: If no fragment was found, or if a shard is missing.
+		ValueError: If the fragments were written by builds with different shard counts.
+
+	Returns:
+		The fragment paths, ordered by shard index.
+	"""
+	fragments = {Shard.from_fragment_path(path): path for path in Path(directory).glob("badges.*-of-*.jsonl")}
+
+	if not fragments:
+		raise FileNotFoundError(f"No badges fragments found in {directory}")
+
+	counts = {shard.count for shard in fragments}
+
+	if len(counts) > 1:
+		raise ValueError(f"Fragments in {directory} come from different shard counts: {sorted(counts)}")
+
+	count = counts.pop()
+	missing = [str(Shard(index, count)) for index in range(count) if Shard(index, count) not in fragments]
+
+	if missing:
+		raise FileNotFoundError(f"Missing badges fragments for shards: {', '.join(missing)}")
+
+	return [fragments[shard] for shard in sorted(fragments)]
+
+
+def merge_fragments(fragment_paths: list[Path], json_path: str | Path) -> bool:
+	"""
+	Merge the fragments of a sharded build into the final badges JSON file and its index.
+
+	Fragments are already sorted by slug and key, so they are combined with a streaming
+	k-way merge, holding a single record per fragment in memory.
+
+	Args:
+		fragment_paths: Paths of the fragment files.
+		json_path: Path of the badges JSON file.
+
+	Returns:
+		True if the file was written, False if it was already up to date.
+	"""
+	merged = heapq.merge(*(read_badges_fragment(path) for path in fragment_paths), key=itemgetter(0, 1))
+	is_written = write_badges_json((record for _, _, record in merged), json_path, badges_index_path(json_path))
+
+	logger.info(f"Merged {len(fragment_paths)} badges fragments into {json_path}")
+
+	return is_written
@@ -0,0 +1,289 @@
+import json
+import re
+import unicodedata
+from collections.abc import Iterable, Iterator
+from itertools import chain
+from pathlib import Path
+from textwrap import indent
+from typing import Any, NamedTuple, Optional
+
+from loguru import logger
+
+from shieldsio_plus.common.types.hex_code import HexColor
+from shieldsio_plus.util.files import AtomicWriter, write_if_changed
+from shieldsio_plus.util.variants import text_colors_for_background
+
+# Size of the chunks the catalog is read in, in characters
+CHUNK_SIZE = 64 * 1024
+
+# Directory of the imported icons, relative to the icon directory of the manifest
+ICONS_SUBDIRECTORY = "simple-icons"
+
+_ICONS_ARRAY = re.compile(r'"icons"\s*:\s*\[')
+
+# Values a JSON element may be cut in, which `raw_decode` reports at their start
+_PARTIAL_TOKENS = ("true", "false", "null", "NaN", "Infinity", "-Infinity", "e+", "e-", "E+", "E-")
+
+# Replacements of `titleToSlug` in simple-icons, applied before stripping diacritics
+_SLUG_REPLACEMENTS = str.maketrans({
+	"+": "plus",
+	".": "dot",
+	"&": "and",
+	"đ": "d",
+	"ħ": "h",
+	"\u0131": "i",
+	"ĸ": "k",
+	"ŀ": "l",
+	"ł": "l",
+	"ß": "ss",
+	"ŧ": "t",
+})
+
+
+class SimpleIcon(NamedTuple):
+	"""
+	An icon of the simple-icons catalog.
+
+	Attributes:
+		title: The brand name.
+		slug: The simple-icons slug, also the name of the icon file.
+		color: The brand color.
+	"""
+
+	title: str
+	slug: str
+	color: HexColor
+
+
+def title_to_slug(title: str) -> str:
+	"""
+	Derive the simple-icons slug of a brand, for icons without an explicit slug.
+
+	Args:
+		title: The brand name.
+
+	Returns:
+		The slug, e.g. `dotnet` for `.NET`.
+	"""
+	normalized = unicodedata.normalize("NFD", title.lower().translate(_SLUG_REPLACEMENTS))
+
+	return re.sub(r"[^a-z0-9]", "", normalized)
+
+
+def _is_partial(buffer: str, error: json.JSONDecodeError) -> bool:
+	# Strings are reported at their opening quote, literals and escapes at their start
+	tail = buffer[error.pos :]
+
+	return (
+		error.pos >= len(buffer) - 1
+		or error.msg.startswith("Unterminated string")
+		or (error.msg.startswith("Invalid \\uXXXX") and len(tail) < 6)
+		or any(token.startswith(tail) for token in _PARTIAL_TOKENS)
+	)
+
+
+def iter_json_array(path: str | Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+	"""
+	Stream the elements of the top-level array of a JSON file, or of its `icons` array.
+
+	The file is read in chunks, and every element is decoded as soon as it is complete, so
+	memory is bounded by the chunk size and the largest element, whatever the file size.
+	More chunks are only read while the element is cut at the end of the buffer, so a
+	malformed element is reported as soon as it is read.
+
+	Args:
+		path: Path to the JSON file, e.g. `simple-icons.json` in its current (array) or
+			former (`{"icons": [...]}`) format.
+		chunk_size (optional): Size of the chunks read, in characters. Defaults to `CHUNK_SIZE`.
+
+	Raises:
+		ValueError: If the file holds no such array, is truncated, or holds a malformed element.
+
+	Yields:
+		The elements of the array, in order.
+	"""
+	decoder = json.JSONDecoder()
+
+	with Path(path).open(encoding="utf-8") as f:
+		chunk = f.read(chunk_size)
+		buffer = chunk.lstrip()
+		# Offset of the start of the buffer in the file, in characters
+		offset = len(chunk) - len(buffer)
+
+		# Find the opening bracket of the array, reading until the `icons` key if needed
+		while not buffer.startswith("[") and not (match := _ICONS_ARRAY.search(buffer)):
+			if not (chunk := f.read(chunk_size)):
+				raise ValueError(f"No icons array in {path}")
+
+			stripped = (buffer + chunk).lstrip()
+			offset += len(buffer) + len(chunk) - len(stripped)
+			buffer = stripped
+
+		position = 1 if buffer.startswith("[") else match.end()
+
+		while True:
+			while position < len(buffer) and buffer[position] in " \t\r\n,":
+				position += 1
+
+			if position < len(buffer) and buffer[position] == "]":
+				return
+
+			try:
+				element, position = decoder.raw_decode(buffer, position)
+
+			except json.JSONDecodeError as e:
+				if not _is_partial(buffer, e):
+					raise ValueError(f"Malformed icons array in {path} at character {offset + e.pos}: {e.msg}") from e
+
+				if not (chunk := f.read(chunk_size)):
+					raise ValueError(f"Truncated icons array in {path}") from None
+
+				buffer = buffer[position:] + chunk
+				offset += position
+				position = 0
+				continue
+
+			yield element
+
+
+def iter_simple_icons(path: str | Path, chunk_size: int = CHUNK_SIZE) -> Iterator[SimpleIcon]:
+	"""
+	Stream the icons of a simple-icons catalog.
+
+	Icons with an invalid color are skipped with a warning.
+
+	Args:
+		path: Path to `simple-icons.json`.
+		chunk_size (optional): Size of the chunks read, in characters. Defaults to `CHUNK_SIZE`.
+
+	Yields:
+		The icons, in catalog order.
+	"""
+	for item in iter_json_array(path, chunk_size):
+		try:
+			color = HexColor(item["hex"])
+
+		except (KeyError, ValueError):
+			logger.warning(f"Skipped {item.get('title')}: invalid color {item.get('hex')}")
+			continue
+
+		yield SimpleIcon(item["title"], item.get("slug") or title_to_slug(item["title"]), color)
+
+
+def import_icon(icon: SimpleIcon, source_dir: Path, icons_dir: Path) -> Optional[dict[str, Any]]:
+	"""
+	Copy the file of an icon to the icon directory, and build its manifest entry.
+
+	simple-icons files have no fill, so the copy is filled with the color Shields.io would
+	use for text over the brand color, keeping the logo readable on its badge.
+
+	Args:
+		icon: The icon.
+		source_dir: The `icons` directory of simple-icons.
+		icons_dir: The icon directory of the manifest.
+
+	Returns:
+		The manifest entry, or None if the icon has no file.
+	"""
+	try:
+		svg = (source_dir / f"{icon.slug}.svg").read_text(encoding="utf-8")
+
+	except FileNotFoundError:
+		logger.warning(f"Skipped {icon.title}: missing {icon.slug}.svg")
+		return None
+
+	logo = f"{ICONS_SUBDIRECTORY}/{icon.slug}.svg"
+	text_color, _ = text_colors_for_background(icon.color.to_rgb())
+	write_if_changed(icons_dir / logo, svg.replace("<svg ", f'<svg fill="{text_color}" ', 1))
+
+	return {
+		"logo": logo,
+		"slug": icon.slug,
+		"label": icon.title,
+		"message": None,
+		"style": None,
+		"color": {"class": "hex", "value": icon.color.value.lower()},
+		"label_color": None,
+		"logo_color": None,
+		"font": None,
+	}
+
+
+def write_manifest(root: str, entries: Iterable[dict[str, Any]], manifest_path: str | Path) -> bool:
+	"""
+	Stream manifest entries to a manifest file, formatted as `json.dumps(manifest, indent=2)` would.
+
+	Args:
+		root: The icon directory of the manifest.
+		entries: The entries, in order.
+		manifest_path: Path to the manifest file.
+
+	Returns:
+		True if the file was written, False if it was already up to date.
+	"""
+	with AtomicWriter(manifest_path) as writer:
+		writer.write(f'{{\n  "root": {json.dumps(root)},\n  "data": ')
+		separator = "[\n"
+
+		for entry in entries:
+			writer.write(separator + indent(json.dumps(entry, indent=2, ensure_ascii=False), " " * 4))
+			separator = ",\n"
+
+		writer.write("[]" if separator == "[\n" else "\n  ]")
+		writer.write("\n}")
+
+	return writer.written
+
+
+def import_simple_icons(
+	catalog_path: str | Path,
+	source_dir: str | Path,
+	manifest_path: str | Path,
+	base_dir: str | Path,
+	limit: Optional[int] = None,
+) -> int:
+	"""
+	Import the icons of a simple-icons catalog into a manifest.
+
+	The catalog is streamed, and every icon is copied and written to the manifest as it is
+	read, so only the existing entries and the imported slugs are held in memory. Icons whose slug is already in
+	the manifest are skipped, so imports can be repeated.
+
+	Args:
+		catalog_path: Path to `simple-icons.json`.
+		source_dir: The `icons` directory of simple-icons.
+		manifest_path: Path to the manifest file.
+		base_dir: Directory the icon directory of the manifest (`root`) is relative to.
+		limit (optional): Maximum number of icons imported. Defaults to None, importing all of them.
+
+	Returns:
+		The number of icons imported.
+	"""
+	with Path(manifest_path).open(encoding="utf-8") as f:
+		manifest = json.load(f)
+
+	icons_dir = Path(base_dir) / manifest["root"]
+	(icons_dir / ICONS_SUBDIRECTORY).mkdir(parents=True, exist_ok=True)
+	slugs = {entry["slug"] for entry in manifest["data"]}
+	imported = 0
+
+	def _new_entries() -> Iterator[dict[str, Any]]:
+		nonlocal imported
+
+		for icon in iter_simple_icons(catalog_path):
+			if limit is not None and imported >= limit:
+				return
+
+			if icon.slug in slugs:
+				continue
+
+			if entry := import_icon(icon, Path(source_dir), icons_dir):
+				slugs.add(icon.slug)
+				imported += 1
+				yield entry
+
+	write_manifest(manifest["root"], chain(manifest["data"], _new_entries()), manifest_path)
+
+	logger.info(f"Imported {imported} simple-icons into {manifest_path}")
+
+	return imported
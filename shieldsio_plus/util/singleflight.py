@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from threading import Lock
+
+
+class SingleFlight[K: Hashable, V]:
+	"""
+	Coalesces concurrent and repeated calls for the same key into a single call.
+
+	The first caller for a key runs the function, while concurrent callers for the same key
+	wait for its result instead of running it again. Successful results are then kept for
+	the `max_results` most recently used keys, so later callers reuse them as well. Failures
+	are shared with the callers waiting on them, but never kept.
+
+	Attributes:
+		calls: Number of times a function was actually run.
+		saved: Number of calls answered from an in-flight or kept result.
+	"""
+
+	def __init__(self, max_results: int = 1024) -> None:  # noqa: D107
+		self.max_results = max_results
+		self.calls = 0
+		self.saved = 0
+		self.__lock = Lock()
+		self.__in_flight: dict[K, Future[V]] = {}
+		self.__results: OrderedDict[K, V] = OrderedDict()
+
+	def do(self, key: K, fn: Callable[[], V]) -> V:
+		"""
+		Run `fn` for `key`, unless a call for the same key is in flight or already done.
+
+		Args:
+			key: Key identifying the call.
+			fn: Function producing the result.
+
+		Returns:
+			The result of the single call for `key`.
+		"""
+		leader = False
+
+		with self.__lock:
+			if key in self.__results:
+				self.__results.move_to_end(key)
+				self.saved += 1
+				return self.__results[key]
+
+			if future := self.__in_flight.get(key):
+				self.saved += 1
+
+			else:
+				self.calls += 1
+				future = self.__in_flight[key] = Future()
+				future.set_running_or_notify_cancel()
+				leader = True
+
+		if not leader:
+			return future.result()
+
+		try:
+			result = fn()
+
+		except BaseException as e:
+			with self.__lock:
+				del self.__in_flight[key]
+
+			future.set_exception(e)
+			raise
+
+		with self.__lock:
+			del self.__in_flight[key]
+			self.__results[key] = result
+
+			while len(self.__results) > self.max_results:
+				self.__results.popitem(last=False)
+
+		future.set_result(result)
+		return result
@@ -0,0 +1,89 @@
+from collections.abc import Iterator
+from pathlib import Path
+from random import Random
+from typing import Any
+
+from shieldsio_plus.common.enums.shields_io_named_colors import ShieldsIONamedColor
+from shieldsio_plus.util.simple_icons import write_manifest
+
+# Icon of the synthetic manifests, a ring of the entry color
+SYNTHETIC_ICON = (
+	'<svg viewBox="0 0 24 24" xmlns="http://www.w3.org/2000/svg"><path fill="#{color}" '
+	'd="M12 0C5.373 0 0 5.373 0 12s5.373 12 12 12 12-5.373 12-12S18.627 0 12 0zm0 4a8 8 0 1 1 0 16 8 8 0 0 1 0-16z"/>'
+	"</svg>"
+)
+
+# Share of the synthetic entries with a message, a label color and a named color
+MESSAGE_RATIO = 0.2
+LABEL_COLOR_RATIO = 0.2
+NAMED_COLOR_RATIO = 0.2
+
+
+def synthetic_entry(index: int, random: Random) -> dict[str, Any]:
+	"""
+	Build a synthetic manifest entry, shaped like the hand-written ones.
+
+	Most entries have a hex color, and only a label. Some have a message, a label color or a
+	named color, in the proportions of `MESSAGE_RATIO`, `LABEL_COLOR_RATIO` and
+	`NAMED_COLOR_RATIO`, so that every code path of the build is exercised.
+
+	Args:
+		index: The index of the entry, making its slug and icon unique.
+		random: The random generator picking the optional fields and colors.
+
+	Returns:
+		The manifest entry. Its icon is `synthetic-{index}.svg`.
+	"""
+	slug = f"synthetic-{index}"
+
+	return {
+		"logo": f"{slug}.svg",
+		"slug": slug,
+		"label": f"Synthetic {index}",
+		"message": f"v{index}" if random.random() < MESSAGE_RATIO else None,
+		"style": None,
+		"color": {"class": "named_color", "value": random.choice(ShieldsIONamedColor.slugs())}
+		if random.random() < NAMED_COLOR_RATIO
+		else {"class": "hex", "value": f"{random.getrandbits(24):06x}"},
+		"label_color": {"class": "hex", "value": f"{random.getrandbits(24):06x}"}
+		if random.random() < LABEL_COLOR_RATIO
+		else None,
+		"logo_color": None,
+		"font": None,
+	}
+
+
+def write_synthetic_manifest(directory: str | Path, size: int, seed: int = 0) -> Path:
+	"""
+	Write a synthetic manifest and its icons, for benchmarks.
+
+	The manifest is streamed to disk, formatted like the real one, and its root is the
+	absolute path of its icon directory, so that it can be used from any working directory.
+	The same size and seed always give the same manifest.
+
+	Args:
+		directory: The directory to write the manifest (`manifest.json`) and the icon
+			directory (`icons`) in.
+		size: The number of entries, each with its own icon.
+		seed (optional): The seed of the random generator. Defaults to 0.
+
+	Returns:
+		The path to the manifest file.
+	"""
+	directory = Path(directory)
+	icons_dir = directory / "icons"
+	icons_dir.mkdir(parents=True, exist_ok=True)
+	manifest_path = directory / "manifest.json"
+	random = Random(seed)  # noqa: S311
+
+	def _entries() -> Iterator[dict[str, Any]]:
+		for index in range(size):
+			entry = synthetic_entry(index, random)
+			color = entry["color"]["value"] if entry["color"]["class"] == "hex" else "000000"
+			(icons_dir / entry["logo"]).write_text(SYNTHETIC_ICON.format(color=color), encoding="utf-8")
+
+			yield entry
+
+	write_manifest(f"{icons_dir.resolve().as_posix()}/", _entries(), manifest_path)
+
+	return manifest_path
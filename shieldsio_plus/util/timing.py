@@ -0,0 +1,205 @@
+from bisect import bisect_left
+from collections.abc import Generator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from heapq import heappush, heappushpop
+from math import ceil
+from operator import itemgetter
+from threading import Lock
+from time import perf_counter
+from typing import Optional
+
+from loguru import logger
+
+# Upper bounds of the span duration buckets, in seconds: 4 buckets per doubling from 10 microseconds to
+# about 30 minutes, so percentiles are within 19% of the exact value
+SPAN_BUCKETS: tuple[float, ...] = tuple(1e-5 * 2 ** (i / 4) for i in range(110))
+
+
+@dataclass
+class StageStats:
+	"""
+	Fixed-size aggregate of the spans of a stage.
+
+	Attributes:
+		count: Number of spans.
+		total: Total duration of the spans, in seconds.
+		max: Longest span, in seconds.
+		buckets: Number of spans per duration bucket, see `SPAN_BUCKETS`. The last bucket
+			counts the spans longer than every bound.
+	"""
+
+	count: int = 0
+	total: float = 0.0
+	max: float = 0.0
+	buckets: list[int] = field(default_factory=lambda: [0] * (len(SPAN_BUCKETS) + 1))
+
+	def add(self, duration: float) -> None:
+		"""
+		Add a span to the aggregate.
+
+		Args:
+			duration: Duration of the span in seconds.
+		"""
+		self.count += 1
+		self.total += duration
+		self.max = max(self.max, duration)
+		self.buckets[bisect_left(SPAN_BUCKETS, duration)] += 1
+
+	def percentile(self, percent: float) -> float:
+		"""
+		Estimate a percentile using the nearest-rank method over the buckets.
+
+		Args:
+			percent: Percentile to compute, between 0 and 100.
+
+		Returns:
+			The upper bound of the bucket holding the percentile, capped by the longest span,
+			or 0.0 if there are no spans.
+		"""
+		rank = max(ceil(percent / 100 * self.count), 1)
+		cumulative = 0
+
+		for bound, count in zip((*SPAN_BUCKETS, self.max), self.buckets, strict=True):
+			cumulative += count
+
+			if cumulative >= rank:
+				return min(bound, self.max)
+
+		return 0.0
+
+
+class StageTimer:
+	"""
+	Collects timing spans for the stages of a badge build.
+
+	Every span is emitted through loguru as a structured record (with `stage`, `badge` and
+	`duration` bound as extra fields) and aggregated so that a summary can be logged once
+	the build finishes. Memory does not grow with the number of spans: every stage keeps a
+	fixed-size `StageStats`, and only the `slowest` badges are kept. The timer is
+	thread-safe, since badges are downloaded in parallel.
+
+	The timer is created by the build and passed to the code it times, see `timed`.
+
+	Attributes:
+		slowest: Number of slowest badges kept.
+		stages: Aggregated spans, by stage name.
+	"""
+
+	def __init__(self, slowest: int = 5) -> None:  # noqa: D107
+		self.slowest = slowest
+		self.stages: dict[str, StageStats] = {}
+		self.__badges: list[tuple[float, str]] = []
+		self.__lock = Lock()
+
+	@contextmanager
+	def span(self, stage: str, badge: Optional[str] = None) -> Generator[None]:
+		"""
+		Time the enclosed block as a single span of `stage`.
+
+		Args:
+			stage: Name of the build stage (e.g. "fetch", "write").
+			badge (optional): Key of the badge the span belongs to. Defaults to None.
+
+		Yields:
+			None.
+		"""
+		start = perf_counter()
+
+		try:
+			yield
+
+		finally:
+			self.record(stage, perf_counter() - start, badge)
+
+	def record(self, stage: str, duration: float, badge: Optional[str] = None) -> None:
+		"""
+		Record an already measured span.
+
+		Args:
+			stage: Name of the build stage.
+			duration: Duration of the span in seconds.
+			badge (optional): Key of the badge the span belongs to, only logged. Defaults to None.
+		"""
+		with self.__lock:
+			self.stages.setdefault(stage, StageStats()).add(duration)
+
+		logger.bind(stage=stage, badge=badge, duration=duration).trace(
+			f"{stage} took {duration * 1000:.2f} ms" + (f" for {badge}" if badge else ""),
+		)
+
+	def record_badge(self, badge: str, duration: float) -> None:
+		"""
+		Record the total duration of a badge, kept if it is one of the `slowest` badges.
+
+		Args:
+			badge: Key of the badge.
+			duration: Duration of the badge in seconds.
+		"""
+		with self.__lock:
+			if len(self.__badges) < self.slowest:
+				heappush(self.__badges, (duration, badge))
+
+			elif self.slowest:
+				heappushpop(self.__badges, (duration, badge))
+
+	def reset(self) -> None:
+		"""Discard every recorded span."""
+		with self.__lock:
+			self.stages.clear()
+			self.__badges.clear()
+
+	def summary(self) -> dict[str, dict[str, float]]:
+		"""
+		Build the per-stage summary of the recorded spans.
+
+		Returns:
+			A mapping of stage name to its count, total, max, p50, p95 and p99 (in seconds), plus
+			a `slowest_badges` entry mapping the slowest badge keys to their duration.
+		"""
+		with self.__lock:
+			summary = {
+				stage: {
+					"count": stats.count,
+					"total": stats.total,
+					"max": stats.max,
+					"p50": stats.percentile(50),
+					"p95": stats.percentile(95),
+					"p99": stats.percentile(99),
+				}
+				for stage, stats in self.stages.items()
+			}
+			badges = sorted(self.__badges, reverse=True)
+
+		summary["slowest_badges"] = dict(map(itemgetter(1, 0), badges))
+
+		return summary
+
+	def log_summary(self) -> None:
+		"""Log the per-stage summary and the slowest badges."""
+		summary = self.summary()
+		slowest_badges = summary.pop("slowest_badges")
+
+		for stage, stats in summary.items():
+			logger.bind(stage=stage, **stats).info(
+				f"{stage}: {stats['count']} spans, total {stats['total']:.3f} s, "
+				f"p50 {stats['p50'] * 1000:.2f} ms, p95 {stats['p95'] * 1000:.2f} ms, p99 {stats['p99'] * 1000:.2f} ms",
+			)
+
+		for badge, duration in slowest_badges.items():
+			logger.bind(badge=badge, duration=duration).info(f"Slow badge: {badge} took {duration:.3f} s")
+
+
+def timed(timer: Optional[StageTimer], stage: str, badge: Optional[str] = None) -> AbstractContextManager[None]:
+	"""
+	Time the enclosed block as a span of `stage`, if a timer is given.
+
+	Args:
+		timer: The timer of the build, or None to time nothing (e.g. when serving the API).
+		stage: Name of the build stage.
+		badge (optional): Key of the badge the span belongs to. Defaults to None.
+
+	Returns:
+		The span of the timer, or a context manager doing nothing.
+	"""
+	return timer.span(stage, badge) if timer else nullcontext()
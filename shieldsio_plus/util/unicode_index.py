@@ -0,0 +1,173 @@
+import re
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Hashable, Iterable
+from functools import cache
+from itertools import pairwise
+
+from shieldsio_plus.common.enums.unicode_ranges import UnicodeRange
+
+_RANGE_ITEM = re.compile(r"U\+([0-9A-Fa-f?]{1,6})(?:-([0-9A-Fa-f]{1,6}))?")
+
+
+def parse_unicode_range(value: str) -> list[tuple[int, int]]:
+	"""
+	Parse a CSS `unicode-range` value into code point intervals.
+
+	Args:
+		value: The value, e.g. `U+0000-00FF, U+0131, U+02??`. Wildcards (`?`) match any hex digit.
+
+	Raises:
+		ValueError: If an item of the value is not a valid range.
+
+	Returns:
+		The inclusive `(start, end)` intervals, in the order of the value.
+	"""
+	intervals = []
+
+	for item in filter(None, (item.strip() for item in value.split(","))):
+		if not (match := _RANGE_ITEM.fullmatch(item)) or ("?" in match[1] and match[2]):
+			raise ValueError(f"Invalid unicode range: {item}")
+
+		start = int(match[1].replace("?", "0"), 16)
+		end = int(match[2] or match[1].replace("?", "F"), 16)
+
+		if start > end:
+			raise ValueError(f"Invalid unicode range: {item}")
+
+		intervals.append((start, end))
+
+	return intervals
+
+
+class UnicodeRangeIndex[T: Hashable]:
+	"""
+	Index of the owners of possibly overlapping code point ranges, e.g. Unicode blocks or font files.
+
+	The ranges are split once into disjoint segments, sorted by their first code point, each
+	holding the owners of every range covering it. A code point is then looked up with a
+	single bisection, whatever the number of ranges.
+
+	Attributes:
+		owners: The owners of the ranges, in order of insertion.
+	"""
+
+	def __init__(self, ranges: Iterable[tuple[T, str]]) -> None:  # noqa: D107
+		self.owners: list[T] = []
+		intervals: list[tuple[int, int, int]] = []
+
+		for owner, value in ranges:
+			index = len(self.owners)
+			self.owners.append(owner)
+			intervals.extend((start, end, index) for start, end in parse_unicode_range(value))
+
+		# Sweep the boundaries of the ranges in order, tracking the owners covering each segment
+		events: dict[int, list[tuple[int, int]]] = {}
+
+		for start, end, index in intervals:
+			events.setdefault(start, []).append((index, 1))
+			events.setdefault(end + 1, []).append((index, -1))
+
+		boundaries = sorted(events)
+		active: Counter[int] = Counter()
+		starts: list[int] = []
+		ends: list[int] = []
+		segments: list[tuple[int, ...]] = []
+
+		for start, stop in pairwise(boundaries):
+			for index, delta in events[start]:
+				active[index] += delta
+
+			if not (covering := tuple(sorted(index for index, count in active.items() if count > 0))):
+				continue
+
+			# Merge adjacent segments with the same owners
+			if segments and segments[-1] == covering and ends[-1] == start - 1:
+				ends[-1] = stop - 1
+				continue
+
+			starts.append(start)
+			ends.append(stop - 1)
+			segments.append(covering)
+
+		self.__starts = starts
+		self.__ends = ends
+		self.__segments = segments
+
+	def __len__(self) -> int:  # noqa: D105
+		return len(self.__segments)
+
+	def __lookup(self, codepoint: int) -> tuple[int, ...]:
+		index = bisect_right(self.__starts, codepoint) - 1
+
+		if index < 0 or codepoint > self.__ends[index]:
+			return ()
+
+		return self.__segments[index]
+
+	def lookup(self, codepoint: int) -> list[T]:
+		"""
+		Get the owners of the ranges covering a code point.
+
+		Args:
+			codepoint: The code point.
+
+		Returns:
+			The owners, in order of insertion.
+		"""
+		return [self.owners[index] for index in self.__lookup(codepoint)]
+
+	def owners_for(self, text: str) -> list[T]:
+		"""
+		Get the owners of the ranges covering any character of a text.
+
+		Every distinct character is looked up once.
+
+		Args:
+			text: The text.
+
+		Returns:
+			The owners, in order of insertion.
+		"""
+		found: set[int] = set()
+
+		for char in set(text):
+			found.update(self.__lookup(ord(char)))
+
+		return [self.owners[index] for index in sorted(found)]
+
+	def missing(self, text: str) -> str:
+		"""
+		Get the characters of a text that no range covers.
+
+		Args:
+			text: The text.
+
+		Returns:
+			The distinct uncovered characters, in order of first occurrence.
+		"""
+		return "".join(char for char in dict.fromkeys(text) if not self.__lookup(ord(char)))
+
+
+@cache
+def unicode_block_index() -> UnicodeRangeIndex[UnicodeRange]:
+	"""
+	Get the index of the ranges of the `UnicodeRange` blocks, built once per process.
+
+	Returns:
+		The index.
+	"""
+	return UnicodeRangeIndex((block, block.range) for block in UnicodeRange)
+
+
+def blocks_for(text: str) -> list[UnicodeRange]:
+	"""
+	Get the Unicode blocks needed to render a text.
+
+	Args:
+		text: The text.
+
+	Returns:
+		The blocks covering any character of the text, in `UnicodeRange` order.
+	"""
+	return unicode_block_index().owners_for(text)
@@ -0,0 +1,326 @@
+import json
+import re
+from base64 import b64decode, b64encode
+from dataclasses import dataclass
+from hashlib import sha256
+from http import HTTPStatus
+from os import environ
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from loguru import logger
+from requests.utils import requote_uri
+
+from shieldsio_plus.common.enums.upstream_mode import UpstreamMode
+from shieldsio_plus.util.files import write_if_changed
+from shieldsio_plus.util.metrics import UPSTREAM_FETCH_DURATION, UPSTREAM_FETCH_ERRORS
+from shieldsio_plus.util.rate_limit import AdaptiveRateLimiter, parse_retry_after
+
+# Origin of the real Shields.io service, replaced by the configured base URL
+SHIELDS_IO_ORIGIN = "https://img.shields.io"
+
+DEFAULT_CASSETTE_DIR = Path(__file__).resolve().parent.parent.parent / ".cassettes"
+
+# Environment variables configuring the shared upstream client
+MODE_ENV = "SHIELDSIO_PLUS_UPSTREAM_MODE"
+BASE_URL_ENV = "SHIELDSIO_PLUS_UPSTREAM_URL"
+CASSETTE_DIR_ENV = "SHIELDSIO_PLUS_CASSETTE_DIR"
+RATE_ENV = "SHIELDSIO_PLUS_UPSTREAM_RATE"
+
+# Default maximum number of upstream requests per second
+DEFAULT_RATE = 20.0
+
+# Status codes of throttled requests, retried once the upstream allows it
+_THROTTLED_STATUSES = {HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE}
+
+_PERCENT_ESCAPE = re.compile(r"%[0-9a-fA-F]{2}")
+
+
+def canonical_url(url: str) -> str:
+	"""
+	Normalize a URL so that equivalent requests share a single cassette.
+
+	Unsafe characters are percent-encoded and escapes are uppercased, the way they are
+	sent over the wire, the scheme and host are lowercased, the fragment is dropped and
+	the query parameters are sorted. Parameters are not decoded, since badge logos are
+	base64 data URLs in which `+` and `%2B` are not interchangeable.
+
+	Args:
+		url: The URL to normalize.
+
+	Returns:
+		The canonical URL.
+	"""
+	parts = urlsplit(_PERCENT_ESCAPE.sub(lambda match: match[0].upper(), requote_uri(url)))
+	query = "&".join(sorted(filter(None, parts.query.split("&"))))
+
+	return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+@dataclass(frozen=True)
+class UpstreamResponse:
+	"""
+	Response of an upstream request, either fetched or replayed.
+
+	Attributes:
+		url: The requested URL.
+		status_code: The HTTP status code.
+		content_type: The value of the `Content-Type` header.
+		content: The response body.
+	"""
+
+	url: str
+	status_code: int
+	content_type: str
+	content: bytes
+
+	@property
+	def ok(self) -> bool:
+		"""Whether the status code is lower than 400."""
+		return self.status_code < 400
+
+	@property
+	def text(self) -> str:
+		"""The response body, decoded as UTF-8."""
+		return self.content.decode()
+
+	def raise_for_status(self) -> None:
+		"""
+		Raise an error if the request failed.
+
+		Raises:
+			HTTPError: If the status code is 400 or higher.
+		"""
+		if not self.ok:
+			raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class CassetteStore:
+	"""
+	Directory of recorded upstream responses, keyed by canonical URL.
+
+	Every response is stored as a JSON file named after the SHA-256 of its canonical URL,
+	under a two-character prefix directory to keep directories small.
+
+	Attributes:
+		directory: Directory holding the cassettes.
+	"""
+
+	def __init__(self, directory: str | Path = DEFAULT_CASSETTE_DIR) -> None:  # noqa: D107
+		self.directory = Path(directory)
+
+	def path(self, url: str) -> Path:
+		"""
+		Get the cassette path of a URL.
+
+		Args:
+			url: The requested URL.
+
+		Returns:
+			The path of the cassette file, which may not exist.
+		"""
+		key = sha256(canonical_url(url).encode("utf-8")).hexdigest()
+		return self.directory / key[:2] / f"{key}.json"
+
+	def __contains__(self, url: str) -> bool:  # noqa: D105
+		return self.path(url).is_file()
+
+	def get(self, url: str) -> Optional[UpstreamResponse]:
+		"""
+		Load the recorded response of a URL.
+
+		Args:
+			url: The requested URL.
+
+		Returns:
+			The recorded response, or None if the URL was never recorded.
+		"""
+		try:
+			with self.path(url).open("r", encoding="utf-8") as f:
+				cassette = json.load(f)
+
+		except FileNotFoundError:
+			return None
+
+		return UpstreamResponse(
+			url=url,
+			status_code=cassette["status_code"],
+			content_type=cassette["content_type"],
+			content=b64decode(cassette["body"]),
+		)
+
+	def put(self, url: str, response: UpstreamResponse) -> bool:
+		"""
+		Record the response of a URL.
+
+		Args:
+			url: The requested URL.
+			response: The response to record.
+
+		Returns:
+			True if the cassette was written, False if it already held the same response.
+		"""
+		cassette = {
+			"url": canonical_url(url),
+			"status_code": response.status_code,
+			"content_type": response.content_type,
+			"body": b64encode(response.content).decode(),
+		}
+
+		path = self.path(url)
+		path.parent.mkdir(parents=True, exist_ok=True)
+
+		return write_if_changed(path, json.dumps(cassette, indent=4))
+
+
+class UpstreamClient:
+	"""
+	HTTP client for every upstream request of a build, with record and replay support.
+
+	In `PASSTHROUGH` mode requests go to the network. In `RECORD` mode successful responses
+	are also saved in the cassette store, and in `REPLAY` mode they are served from it, so
+	builds can run offline and deterministically. Requests to Shields.io are sent to
+	`base_url`, which allows pointing builds at a local stand-in server.
+
+	Network requests go through the rate limiter, and throttled requests (`429`, or `503`
+	with a `Retry-After` header) are retried after the delay requested by the upstream.
+
+	Attributes:
+		mode: How requests are served.
+		store: The cassette store used to record and replay responses.
+		base_url: Base URL replacing the Shields.io origin.
+		timeout: Timeout of network requests, in seconds.
+		limiter: Rate limiter shared by every network request.
+	"""
+
+	def __init__(  # noqa: D107
+		self,
+		mode: UpstreamMode = UpstreamMode.PASSTHROUGH,
+		store: Optional[CassetteStore] = None,
+		base_url: str = SHIELDS_IO_ORIGIN,
+		timeout: float = 60,
+		limiter: Optional[AdaptiveRateLimiter] = None,
+	) -> None:
+		self.mode = mode
+		self.store = store or CassetteStore()
+		self.base_url = base_url
+		self.timeout = timeout
+		self.limiter = limiter or AdaptiveRateLimiter()
+
+	@classmethod
+	def from_env(cls) -> "UpstreamClient":
+		"""
+		Create a client configured through environment variables.
+
+		`SHIELDSIO_PLUS_UPSTREAM_MODE` sets the mode, `SHIELDSIO_PLUS_UPSTREAM_URL` the base
+		URL, `SHIELDSIO_PLUS_CASSETTE_DIR` the cassette directory and
+		`SHIELDSIO_PLUS_UPSTREAM_RATE` the maximum number of requests per second.
+
+		Raises:
+			ValueError: If the rate is not a positive number.
+
+		Returns:
+			The configured client.
+		"""
+		rate = environ.get(RATE_ENV, str(DEFAULT_RATE))
+
+		try:
+			limiter = AdaptiveRateLimiter(max_rate=float(rate))
+
+		except ValueError as e:
+			raise ValueError(f"Invalid {RATE_ENV}: {rate!r}, should be a positive number of requests per second") from e
+
+		return cls(
+			mode=UpstreamMode(environ.get(MODE_ENV, UpstreamMode.PASSTHROUGH.value)),
+			store=CassetteStore(environ.get(CASSETTE_DIR_ENV, DEFAULT_CASSETTE_DIR)),
+			base_url=environ.get(BASE_URL_ENV, SHIELDS_IO_ORIGIN),
+			limiter=limiter,
+		)
+
+	def resolve(self, url: str) -> str:
+		"""
+		Get the URL actually requested for a URL.
+
+		Args:
+			url: The requested URL.
+
+		Returns:
+			The URL, with the Shields.io origin replaced by `base_url`.
+		"""
+		if url.startswith(SHIELDS_IO_ORIGIN + "/"):
+			return self.base_url.rstrip("/") + url.removeprefix(SHIELDS_IO_ORIGIN)
+
+		return url
+
+	def get(self, url: str) -> UpstreamResponse:
+		"""
+		Get the response of a URL, according to the client mode.
+
+		Args:
+			url: The requested URL.
+
+		Raises:
+			FileNotFoundError: If replaying and the URL was never recorded.
+			RequestException: If the request fails.
+
+		Returns:
+			The response.
+		"""  # noqa: DOC502
+		if self.mode is UpstreamMode.REPLAY:
+			response = self.store.get(url)
+
+			if response is None:
+				raise FileNotFoundError(f"No recorded response for: {url}")
+
+			return response
+
+		response = self.__request(url)
+
+		if self.mode is UpstreamMode.RECORD:
+			if response.ok:
+				self.store.put(url, response)
+
+			else:
+				logger.warning(f"Not recording failed response ({response.status_code}) for: {url}")
+
+		return response
+
+	def __request(self, url: str) -> UpstreamResponse:
+		for attempt in range(self.limiter.max_retries + 1):
+			with self.limiter.acquire(), UPSTREAM_FETCH_DURATION.time():
+				try:
+					response = requests.get(self.resolve(url), timeout=self.timeout)
+
+				except requests.RequestException as e:
+					UPSTREAM_FETCH_ERRORS.inc(reason=type(e).__name__)
+					raise
+
+			retry_after = parse_retry_after(response.headers.get("Retry-After"))
+			throttled = response.status_code == HTTPStatus.TOO_MANY_REQUESTS or (
+				response.status_code in _THROTTLED_STATUSES and retry_after is not None
+			)
+
+			if not throttled:
+				self.limiter.on_success()
+				break
+
+			self.limiter.on_throttle(retry_after)
+
+			if attempt < self.limiter.max_retries:
+				logger.debug(f"Retrying throttled request ({attempt + 1}/{self.limiter.max_retries}): {url}")
+
+		if not response.ok:
+			UPSTREAM_FETCH_ERRORS.inc(reason=str(response.status_code))
+
+		return UpstreamResponse(
+			url=url,
+			status_code=response.status_code,
+			content_type=response.headers.get("Content-Type", ""),
+			content=response.content,
+		)
+
+
+# Shared client for every upstream request
+upstream = UpstreamClient.from_env()
@@ -0,0 +1,293 @@
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from random import Random
+from threading import Lock, Thread
+from time import sleep
+from types import TracebackType
+from typing import Optional, Self, override
+from urllib.parse import unquote, urlsplit
+from xml.sax.saxutils import escape
+
+from loguru import logger
+
+from shieldsio_plus.util.upstream import SHIELDS_IO_ORIGIN, CassetteStore, UpstreamResponse
+from shieldsio_plus.util.variants import DEFAULT_LABEL_COLOR, text_colors_for_background, to_svg_color
+
+# Approximate advance of a Verdana 11px character, and of the badge logo, in pixels
+CHAR_WIDTH = 7
+LOGO_WIDTH = 14
+
+# Fallback message color, used by Shields.io for unknown colors
+DEFAULT_COLOR = "9f9f9f"
+
+# Single dashes separate the badge content parts, double dashes are escaped dashes
+_CONTENT_SEPARATOR = re.compile(r"(?<!-)-(?!-)")
+
+
+def _unescape_content(part: str) -> str:
+	return part.replace("--", "-").replace("__", "\0").replace("_", " ").replace("\0", "_")
+
+
+def _query_params(query: str) -> dict[str, str]:
+	# Values are not decoded as form data, since `+` is meaningful in base64 logos
+	return {key: unquote(value) for key, _, value in (param.partition("=") for param in query.split("&") if param)}
+
+
+def _fill(color: Optional[str], default: str) -> tuple[str, tuple[int, int, int]]:
+	try:
+		return to_svg_color(color or default)
+
+	except ValueError:
+		return to_svg_color(default)
+
+
+def synthesize_badge(path: str, query: str) -> Optional[str]:  # noqa: PLR0914
+	"""
+	Synthesize a static badge with the structure of a Shields.io badge.
+
+	The layout only approximates Shields.io (text widths are estimated), but the document
+	structure, fills and text colors match, so every local post-processing step applies.
+	Colors are picked with the same functions as `recolor_badge`, so derived variants
+	always match the stand-in, and can only be verified against the real Shields.io.
+
+	Args:
+		path: The request path, e.g. `/badge/label-message-color`.
+		query: The raw query string.
+
+	Returns:
+		The SVG content, or None if the path is not a static badge.
+	"""
+	if not path.startswith("/badge/"):
+		return None
+
+	parts = [_unescape_content(part) for part in _CONTENT_SEPARATOR.split(unquote(path.removeprefix("/badge/")))]
+	params = _query_params(query)
+
+	label, message = (parts[0], "-".join(parts[1:-1])) if len(parts) > 2 else ("", parts[0])
+	color = params.get("color") or (parts[-1] if len(parts) > 1 else None)
+	style = params.get("style", "flat")
+	logo = params.get("logo")
+
+	if style == "for-the-badge":
+		label, message = label.upper(), message.upper()
+
+	height = 28 if style == "for-the-badge" else 20
+	logo_width = LOGO_WIDTH + 5 if logo else 0
+	label_width = logo_width + (len(label) * CHAR_WIDTH + 10 if label else 0)
+	message_width = len(message) * CHAR_WIDTH + 10
+	width = label_width + message_width
+
+	label_fill, label_rgb = _fill(params.get("labelColor"), DEFAULT_LABEL_COLOR.removeprefix("#"))
+	message_fill, message_rgb = _fill(color, DEFAULT_COLOR)
+
+	texts = []
+
+	for text, x, rgb in (
+		(label, logo_width + (label_width - logo_width) / 2, label_rgb),
+		(message, label_width + message_width / 2, message_rgb),
+	):
+		if not text:
+			continue
+
+		text_color, shadow_color = text_colors_for_background(rgb)
+		length = (len(text) * CHAR_WIDTH) * 10
+		texts.extend((
+			(
+				f'<text aria-hidden="true" x="{x * 10:g}" y="{height * 7.5:g}" fill="{shadow_color}" '
+				f'fill-opacity=".3" transform="scale(.1)" textLength="{length}">{escape(text)}</text>'
+			),
+			(
+				f'<text x="{x * 10:g}" y="{height * 7:g}" transform="scale(.1)" fill="{text_color}" '
+				f'textLength="{length}">{escape(text)}</text>'
+			),
+		))
+
+	image = (
+		f'<image x="5" y="{(height - LOGO_WIDTH) / 2:g}" width="{LOGO_WIDTH}" height="{LOGO_WIDTH}" '
+		f'xlink:href="{escape(logo)}"/>'
+		if logo
+		else ""
+	)
+	label_rect = f'<rect width="{label_width}" height="{height}" fill="{label_fill}"/>' if label_width else ""
+	message_rect = f'<rect x="{label_width}" width="{message_width}" height="{height}" fill="{message_fill}"/>'
+
+	if style in {"flat-square", "for-the-badge"}:
+		background = f'<g shape-rendering="crispEdges">{label_rect}{message_rect}</g>'
+	else:
+		background = (
+			'<linearGradient id="s" x2="0" y2="100%"><stop offset="0" stop-color="#bbb" stop-opacity=".1"/>'
+			'<stop offset="1" stop-opacity=".1"/></linearGradient>'
+			f'<clipPath id="r"><rect width="{width}" height="{height}" rx="3" fill="#fff"/></clipPath>'
+			f'<g clip-path="url(#r)">{label_rect}{message_rect}'
+			f'<rect width="{width}" height="{height}" fill="url(#s)"/></g>'
+		)
+
+	title = escape(f"{label}: {message}" if label else message)
+
+	return (
+		'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+		f'width="{width}" height="{height}" role="img" aria-label="{title}"><title>{title}</title>{background}'
+		'<g fill="#fff" text-anchor="middle" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" '
+		f'text-rendering="geometricPrecision" font-size="110">{image}{"".join(texts)}</g></svg>'
+	)
+
+
+class StandInServer:
+	"""
+	Local HTTP stand-in for img.shields.io.
+
+	Requests are answered from the cassette store when the URL was recorded, and with a
+	synthesized badge otherwise. A fixed latency plus a random jitter can be injected in
+	every response, to benchmark builds against a deterministic upstream.
+
+	Attributes:
+		store: Cassette store the responses are replayed from. None to always synthesize.
+		latency: Delay added to every response, in seconds.
+		jitter: Maximum random delay added on top of `latency`, in seconds.
+		host: Host the server binds to.
+		port: Port the server listens on. 0 picks a free port when started.
+		stats: Number of responses served, by source ("replayed", "synthesized", "not_found").
+	"""
+
+	def __init__(  # noqa: D107, PLR0913
+		self,
+		store: Optional[CassetteStore] = None,
+		*,
+		latency: float = 0.0,
+		jitter: float = 0.0,
+		host: str = "127.0.0.1",
+		port: int = 0,
+		seed: Optional[int] = None,
+	) -> None:
+		self.store = store
+		self.latency = latency
+		self.jitter = jitter
+		self.host = host
+		self.port = port
+		self.stats: dict[str, int] = {"replayed": 0, "synthesized": 0, "not_found": 0}
+		self.__random = Random(seed)  # noqa: S311
+		self.__lock = Lock()
+		self.__server: Optional[ThreadingHTTPServer] = None
+		self.__thread: Optional[Thread] = None
+
+	@property
+	def url(self) -> str:
+		"""The base URL of the server, to use as the upstream base URL."""
+		return f"http://{self.host}:{self.port}"
+
+	def delay(self) -> None:
+		"""Sleep for the injected latency."""
+		with self.__lock:
+			duration = self.latency + self.__random.uniform(0, self.jitter)
+
+		if duration > 0:
+			sleep(duration)
+
+	def respond(self, path: str) -> Optional[UpstreamResponse]:
+		"""
+		Build the response to a request.
+
+		Args:
+			path: The request path, including the query string.
+
+		Returns:
+			The response, or None if the path cannot be answered.
+		"""
+		url = SHIELDS_IO_ORIGIN + path
+		response = self.store.get(url) if self.store else None
+		source = "replayed"
+
+		if response is None:
+			parts = urlsplit(path)
+			svg_str = synthesize_badge(parts.path, parts.query)
+			source = "synthesized" if svg_str else "not_found"
+			response = UpstreamResponse(url, 200, "image/svg+xml;charset=utf-8", svg_str.encode()) if svg_str else None
+
+		with self.__lock:
+			self.stats[source] += 1
+
+		return response
+
+	def start(self) -> Self:
+		"""
+		Start serving in a background thread.
+
+		Returns:
+			The server itself, to be used as a context manager.
+		"""
+		self.__server = _StandInHTTPServer((self.host, self.port), self)
+		self.port = self.__server.server_address[1]
+		self.__thread = Thread(target=self.__server.serve_forever, daemon=True)
+		self.__thread.start()
+
+		logger.info(f"Shields.io stand-in listening on {self.url}")
+
+		return self
+
+	def stop(self) -> None:
+		"""Stop serving and release the port."""
+		if self.__server is not None:
+			self.__server.shutdown()
+			self.__server.server_close()
+			self.__server = None
+
+		if self.__thread is not None:
+			self.__thread.join()
+			self.__thread = None
+
+	def serve_forever(self) -> None:
+		"""Serve in the current thread until interrupted."""
+		self.__server = _StandInHTTPServer((self.host, self.port), self)
+		self.port = self.__server.server_address[1]
+
+		logger.info(f"Shields.io stand-in listening on {self.url}")
+
+		try:
+			self.__server.serve_forever()
+
+		finally:
+			self.__server.server_close()
+			self.__server = None
+
+	def __enter__(self) -> Self:  # noqa: D105
+		return self.start()
+
+	def __exit__(  # noqa: D105
+		self,
+		exc_type: Optional[type[BaseException]],
+		exc_value: Optional[BaseException],
+		traceback: Optional[TracebackType],
+	) -> None:
+		self.stop()
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+	daemon_threads = True
+
+	def __init__(self, address: tuple[str, int], stand_in: StandInServer) -> None:
+		super().__init__(address, _StandInHandler)
+		self.stand_in = stand_in
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+	server: _StandInHTTPServer
+
+	@override
+	def do_GET(self) -> None:
+		stand_in = self.server.stand_in
+		stand_in.delay()
+		response = stand_in.respond(self.path)
+
+		if response is None:
+			self.send_error(404)
+			return
+
+		self.send_response(response.status_code)
+		self.send_header("Content-Type", response.content_type)
+		self.send_header("Content-Length", str(len(response.content)))
+		self.end_headers()
+		self.wfile.write(response.content)
+
+	@override
+	def log_message(self, fmt: str, *args: object) -> None:
+		logger.trace(fmt % args)
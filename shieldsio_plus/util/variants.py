@@ -0,0 +1,289 @@
+from bisect import bisect_right
+from collections.abc import Callable
+from dataclasses import replace
+from random import Random
+from threading import Lock
+from typing import Optional
+
+from bs4 import BeautifulSoup, Tag
+from loguru import logger
+
+from shieldsio_plus.common.enums.css_named_colors import CSSNamedColor
+from shieldsio_plus.common.enums.shields_io_named_colors import ShieldsIONamedColor
+from shieldsio_plus.common.types.color_types import RGBColor
+from shieldsio_plus.common.types.hex_code import HexColor
+from shieldsio_plus.common.types.shields_io_badge_spec import ShieldsIOBadgeSpec
+from shieldsio_plus.common.types.svg import SVG
+from shieldsio_plus.util.singleflight import SingleFlight
+
+# Default label color of Shields.io badges
+DEFAULT_LABEL_COLOR = "#555"
+
+# Brightness above which Shields.io switches to dark text
+BRIGHTNESS_THRESHOLD = 0.69
+
+# Weights of the red, green and blue components in the YIQ brightness of Shields.io, out of 255000
+YIQ_WEIGHTS = (299, 587, 114)
+
+# Text colors Shields.io writes over dark and light backgrounds, and their shadows
+LIGHT_TEXT, LIGHT_TEXT_SHADOW = "#fff", "#010101"
+DARK_TEXT, DARK_TEXT_SHADOW = "#333", "#ccc"
+
+
+def _brightness(weighted_sum: int) -> float:
+	# Rounded to 2 decimals before the comparison, as Shields.io does
+	return round(weighted_sum / 255000, 2)
+
+
+# Largest weighted sum of the components of a background Shields.io writes light text over,
+# for vectorized checks to apply the exact rule of `text_colors_for_background`
+LIGHT_TEXT_MAX_WEIGHTED_SUM = bisect_right(range(255001), BRIGHTNESS_THRESHOLD, key=_brightness) - 1
+
+
+def to_svg_color(color: str) -> tuple[str, RGBColor]:
+	"""
+	Convert a Shields.io API color to the fill Shields.io renders for it.
+
+	Args:
+		color: The color, as sent to the Shields.io API (a named color slug, a hex code without
+			the leading '#' or a CSS named color).
+
+	Raises:
+		ValueError: If the color is not supported.
+
+	Returns:
+		The SVG fill value and its RGB components.
+	"""
+	if color in ShieldsIONamedColor.slugs():
+		hex_color = HexColor(next(named for named in ShieldsIONamedColor if named.slug == color).hex)
+		return hex_color.hex, hex_color.to_rgb()
+
+	if HexColor.is_valid_hex_code(color):
+		hex_color = HexColor(color.lower())
+		return hex_color.hex, hex_color.to_rgb()
+
+	css_name = color.replace("-", "_").upper()
+
+	if css_name in CSSNamedColor.names:
+		return color.lower(), HexColor(CSSNamedColor[css_name].hex).to_rgb()
+
+	raise ValueError(f"Unsupported color: {color}")
+
+
+def text_colors_for_background(rgb: RGBColor) -> tuple[str, str]:
+	"""
+	Pick the text and text shadow colors Shields.io uses over a background.
+
+	Args:
+		rgb: The background color.
+
+	Returns:
+		The text color and the text shadow color.
+	"""
+	if _brightness(sum(component * weight for component, weight in zip(rgb, YIQ_WEIGHTS, strict=True))) <= (
+		BRIGHTNESS_THRESHOLD
+	):
+		return LIGHT_TEXT, LIGHT_TEXT_SHADOW
+
+	return DARK_TEXT, DARK_TEXT_SHADOW
+
+
+def _background_rects(soup: BeautifulSoup) -> list[Tag]:
+	for group in soup.find_all("g"):
+		rects = [
+			rect for rect in group.find_all("rect", recursive=False) if not rect.get("fill", "url(").startswith("url(")
+		]
+
+		if rects:
+			return rects
+
+	return []
+
+
+def recolor_badge(svg_str: str, label_color: Optional[str], color: Optional[str]) -> str:
+	"""
+	Rewrite the colors of a badge rendered by Shields.io.
+
+	Sets the fill of the label and message backgrounds, and the fill of the texts laid over
+	them, the same way Shields.io does. Layout does not depend on colors, so the result
+	matches what Shields.io would render for the new colors. Social badges do not use
+	colors, and are returned unchanged.
+
+	Args:
+		svg_str: The SVG rendered by Shields.io.
+		label_color: The new label color, as sent to the Shields.io API. None for the default.
+		color: The new message color, as sent to the Shields.io API.
+
+	Raises:
+		ValueError: If the SVG content cannot be parsed.
+
+	Returns:
+		The recolored SVG content.
+	"""
+	try:
+		soup = BeautifulSoup(svg_str, "lxml-xml")
+	except Exception as e:
+		raise ValueError(f"Invalid SVG content: {svg_str}") from e
+
+	if soup.find("style"):
+		return svg_str
+
+	rects = _background_rects(soup)
+
+	if not rects:
+		raise ValueError(f"No badge background found in: {svg_str}")
+
+	# Badges without a label, like some for-the-badge renders, only have the message background
+	label_rect, message_rect = (rects[0], rects[1]) if len(rects) > 1 else (None, rects[0])
+	boundary = float(message_rect.get("x", 0))
+
+	label_fill, label_rgb = to_svg_color(label_color or DEFAULT_LABEL_COLOR.removeprefix("#"))
+	message_fill, message_rgb = to_svg_color(color) if color else (message_rect["fill"], None)
+
+	if label_rect is not None:
+		label_rect["fill"] = label_fill
+
+	message_rect["fill"] = message_fill
+
+	for text in soup.find_all("text"):
+		# Texts are laid out in tenths of a pixel, through a scale transform of one tenth
+		in_label = label_rect is not None and float(text.get("x", 0)) / 10 < boundary
+		rgb = label_rgb if in_label else message_rgb
+
+		if rgb is None:
+			continue
+
+		text_color, shadow_color = text_colors_for_background(rgb)
+		text["fill"] = shadow_color if text.has_attr("fill-opacity") else text_color
+
+	return str(soup)
+
+
+class VariantDeriver:
+	"""
+	Renders badges from one upstream render per base badge, deriving color variants locally.
+
+	Badges that only differ by their label and message colors share a base: the first of
+	them is fetched from Shields.io (see `base`), and the others are derived from that
+	response through `recolor_badge` (see `derive`). Fonts and the TRUE_FLAT style are
+	already applied locally by the badges.
+
+	A reservoir sample of the derived badges is kept, so that `verify` can compare them
+	against real fetches.
+
+	Attributes:
+		fetch: Function downloading the raw SVG of a URL.
+		sample_size: Number of derived badges kept for verification.
+		derived: Number of badges derived locally.
+	"""
+
+	def __init__(  # noqa: D107
+		self,
+		fetch: Callable[[str], str] = SVG.fetch,
+		sample_size: int = 0,
+		max_results: int = 1024,
+		seed: Optional[int] = None,
+	) -> None:
+		self.fetch = fetch
+		self.sample_size = sample_size
+		self.derived = 0
+		self.__flight: SingleFlight[ShieldsIOBadgeSpec, tuple[ShieldsIOBadgeSpec, str]] = SingleFlight(max_results)
+		self.__lock = Lock()
+		self.__random = Random(seed)  # noqa: S311
+		self.__sample: list[tuple[ShieldsIOBadgeSpec, str]] = []
+
+	@property
+	def calls(self) -> int:
+		"""Number of upstream fetches."""
+		return self.__flight.calls
+
+	@staticmethod
+	def base_key(spec: ShieldsIOBadgeSpec) -> ShieldsIOBadgeSpec:
+		"""
+		Get the key shared by every color variant of a badge.
+
+		Args:
+			spec: The badge spec.
+
+		Returns:
+			The spec without its label and message colors.
+		"""
+		return replace(spec, color=None, label_color=None)
+
+	def base(self, spec: ShieldsIOBadgeSpec) -> tuple[ShieldsIOBadgeSpec, str]:
+		"""
+		Get the base render of a badge, fetching it unless a variant of the badge was already fetched.
+
+		Args:
+			spec: The badge spec.
+
+		Returns:
+			The spec of the fetched variant and its SVG content.
+		"""
+		return self.__flight.do(self.base_key(spec), lambda: (spec, self.fetch(spec.url)))
+
+	def derive(self, base: tuple[ShieldsIOBadgeSpec, str], spec: ShieldsIOBadgeSpec) -> str:
+		"""
+		Render a badge from the base render of one of its variants, without fetching it.
+
+		Args:
+			base: The spec and SVG content of the base render, as returned by `base`.
+			spec: The badge spec, sharing its `base_key` with the base spec.
+
+		Returns:
+			The SVG content, as Shields.io renders it for `spec`.
+		"""
+		base_spec, base_svg = base
+
+		if base_spec == spec:
+			return base_svg
+
+		svg_str = recolor_badge(base_svg, spec.label_color, spec.color)
+
+		with self.__lock:
+			self.derived += 1
+
+			# Reservoir sampling over every derived badge
+			if len(self.__sample) < self.sample_size:
+				self.__sample.append((spec, svg_str))
+
+			elif (index := self.__random.randrange(self.derived)) < self.sample_size:
+				self.__sample[index] = (spec, svg_str)
+
+		return svg_str
+
+	def render(self, spec: ShieldsIOBadgeSpec) -> str:
+		"""
+		Render a badge, fetching its base or deriving it from an already fetched base.
+
+		Args:
+			spec: The badge spec.
+
+		Returns:
+			The SVG content, as Shields.io renders it for `spec`.
+		"""
+		return self.derive(self.base(spec), spec)
+
+	@staticmethod
+	def __normalize(svg_str: str) -> str:
+		return str(BeautifulSoup(svg_str, "lxml-xml"))
+
+	def verify(self) -> list[ShieldsIOBadgeSpec]:
+		"""
+		Compare the sampled derived badges against real fetches.
+
+		Returns:
+			The specs whose derived render differs from Shields.io.
+		"""
+		mismatches = [
+			spec
+			for spec, svg_str in self.__sample
+			if self.__normalize(svg_str) != self.__normalize(self.fetch(spec.url))
+		]
+
+		for spec in mismatches:
+			logger.warning(f"Derived badge differs from Shields.io: {spec.url}")
+
+		logger.info(f"Verified {len(self.__sample)} derived badges, {len(mismatches)} differ from Shields.io.")
+
+		return mismatches
@@ -0,0 +1,18 @@
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.http import require_GET
+
+from shieldsio_plus.util.metrics import registry
+
+
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:  # noqa: ARG001
+	"""
+	Expose the service metrics in the Prometheus text format.
+
+	Args:
+		request: The incoming request.
+
+	Returns:
+		The metrics exposition.
+	"""
+	return HttpResponse(registry.expose(), content_type="text/plain; version=0.0.4; charset=utf-8")